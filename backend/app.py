@@ -1,7 +1,8 @@
 from app import create_app, db
+from config import DevelopmentConfig
 from app.models import *
 
-app = create_app()
+app = create_app(DevelopmentConfig)
 
 if __name__ == '__main__':
     with app.app_context():
@@ -1,22 +1,45 @@
-from flask import Flask
+from flask import Flask, jsonify
 from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from flask_migrate import Migrate
 from config import Config
+from app.utils.engine_profiles import configure_engine_profile, install_profile
+from app.utils.metrics import Metrics
+from app.utils.query_budget import QueryBudget
+from app.utils.search import attach_search_indexes
+from app.utils.serialization import FastJSONProvider
 
 db = SQLAlchemy()
 jwt = JWTManager()
 migrate = Migrate()
+query_budget = QueryBudget()
+metrics = Metrics()
 
-def create_app():
+# create_all()/drop_all() also manage the FTS search tables on SQLite
+attach_search_indexes(db.metadata)
+
+def create_app(config_class=Config):
     app = Flask(__name__)
-    app.config.from_object(Config)
+    app.config.from_object(config_class)
+    app.json = FastJSONProvider(app)
     
     # Initialize extensions
+    profile = configure_engine_profile(app)
     db.init_app(app)
+    with app.app_context():
+        engines = list(db.engines.values())
+    for engine in engines:
+        install_profile(engine, profile)
     jwt.init_app(app)
+    from app.utils.current_user import PasswordChangeRequired, load_current_user
+    jwt.user_lookup_loader(load_current_user)
+    app.register_error_handler(PasswordChangeRequired, lambda e: (
+        jsonify({'error': 'Change your password to continue', 'must_change_password': True}), 403
+    ))
     migrate.init_app(app, db)
+    query_budget.init_app(app)
+    metrics.init_app(app, engines)
     CORS(app)
     
     # Register blueprints
@@ -26,6 +49,8 @@ def create_app():
     from app.routes.attendance import attendance_bp
     from app.routes.grades import grades_bp
     from app.routes.fees import fees_bp
+    from app.routes.dashboard import dashboard_bp
+    from app.routes.jobs import jobs_bp
     
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(students_bp, url_prefix='/api/students')
@@ -33,5 +58,16 @@ def create_app():
     app.register_blueprint(attendance_bp, url_prefix='/api/attendance')
     app.register_blueprint(grades_bp, url_prefix='/api/grades')
     app.register_blueprint(fees_bp, url_prefix='/api/fees')
+    app.register_blueprint(dashboard_bp, url_prefix='/api/dashboard')
+    app.register_blueprint(jobs_bp, url_prefix='/api/jobs')
+    
+    from app.cli import register_commands
+    register_commands(app)
+    
+    from app.scheduler import Scheduler
+    Scheduler(app)
+    
+    from app.jobs import ReportJobs
+    ReportJobs(app)
     
     return app
\ No newline at end of file
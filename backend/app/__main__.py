@@ -0,0 +1,97 @@
+"""
+Production entry point: `python -m app serve`.
+
+Runs the API under gunicorn's pre-forking server. The app is created once
+in the master (preload) and forked into the workers; each worker drops the
+database connections it inherited. The schema is not created at boot; run
+`flask --app app:create_app db upgrade` when deploying instead.
+
+Signals are gunicorn's: HUP starts fresh workers and retires the old ones
+gracefully, TTIN/TTOU add or remove a worker, TERM shuts down gracefully.
+With the app preloaded, new code needs a full restart (or USR2).
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+from app import create_app, db
+
+
+def build_options(config, args):
+    """gunicorn settings from Config, overridden by command line arguments."""
+    options = {
+        'bind': args.bind or config['SERVER_BIND'],
+        'workers': args.workers or config['SERVER_WORKERS'],
+        'threads': args.threads or config['SERVER_THREADS'],
+        'timeout': config['SERVER_TIMEOUT'],
+        'max_requests': config['SERVER_MAX_REQUESTS'] if args.max_requests is None else args.max_requests,
+        'max_requests_jitter': config['SERVER_MAX_REQUESTS_JITTER'],
+        'preload_app': True,
+        'accesslog': '-' if args.access_log else None,
+        'post_fork': post_fork,
+        'child_exit': child_exit,
+    }
+    return {key: value for key, value in options.items() if value is not None}
+
+
+def post_fork(server, worker):
+    # Pooled connections opened in the master must not be shared across processes
+    with server.app.application.app_context():
+        db.engine.dispose(close=False)
+
+
+def child_exit(server, worker):
+    # Drop the dead worker's live gauges from the shared metrics directory
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
+
+
+def serve(args):
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        sys.exit('gunicorn is required for `serve`: pip install gunicorn')
+
+    # Workers write metrics to files here so /api/metrics can add them up;
+    # it has to be set before prometheus_client is first imported
+    os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', tempfile.mkdtemp(prefix='edumanage-metrics-'))
+
+    class Server(BaseApplication):
+        def __init__(self, application, options):
+            self.application = application
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return self.application
+
+    application = create_app()
+    Server(application, build_options(application.config, args)).run()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m app', description='EduManage Pro backend')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    serve_parser = commands.add_parser('serve', help='Run the API on a multi-worker WSGI server')
+    serve_parser.add_argument('--bind', help='host:port to listen on (SERVER_BIND)')
+    serve_parser.add_argument('--workers', type=int, help='worker processes (SERVER_WORKERS)')
+    serve_parser.add_argument('--threads', type=int, help='threads per worker (SERVER_THREADS)')
+    serve_parser.add_argument('--max-requests', type=int,
+                              help='recycle a worker after this many requests, 0 to disable (SERVER_MAX_REQUESTS)')
+    serve_parser.add_argument('--access-log', action='store_true', help='log each request to stdout')
+
+    args = parser.parse_args(argv)
+    if args.command == 'serve':
+        serve(args)
+
+
+if __name__ == '__main__':
+    main()
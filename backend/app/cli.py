@@ -0,0 +1,96 @@
+"""
+Flask CLI commands, available as `flask --app app:create_app <command>`.
+"""
+
+import os
+from datetime import datetime
+
+import click
+from sqlalchemy import inspect, text
+
+from app import db
+
+
+def register_commands(app):
+    @app.cli.command('rebuild-grade-summaries')
+    def rebuild_grade_summaries():
+        """Recompute the materialized grade summaries from the grades table."""
+        from app.models.grade_summary import GradeSummary
+        
+        GradeSummary.rebuild()
+        db.session.commit()
+        click.echo(f'Rebuilt {GradeSummary.query.count()} grade summary rows.')
+    
+    @app.cli.command('rebuild-attendance-summaries')
+    def rebuild_attendance_summaries():
+        """Recompute the monthly attendance summaries from the attendance table."""
+        from app.models.attendance_summary import AttendanceSummary
+        
+        AttendanceSummary.rebuild()
+        db.session.commit()
+        click.echo(f'Rebuilt {AttendanceSummary.query.count()} attendance summary rows.')
+    
+    @app.cli.command('dedupe-attendance')
+    @click.option('--delete', is_flag=True, help='Delete the duplicates instead of listing them.')
+    def dedupe_attendance(delete):
+        """List (or delete) attendance records repeating a student's day, keeping the latest."""
+        # Plain SQL: migration 0002 points here before the later tables exist
+        duplicates = text(
+            'SELECT id, student_id, date, status FROM attendance WHERE id NOT IN '
+            '(SELECT MAX(id) FROM attendance GROUP BY student_id, date) ORDER BY student_id, date, id'
+        )
+        rows = db.session.execute(duplicates).all()
+        for row in rows:
+            click.echo(f'attendance {row.id}: student {row.student_id} on {row.date} ({row.status})')
+        if not delete:
+            click.echo(f'{len(rows)} duplicate attendance records; rerun with --delete to remove them.')
+            return
+        
+        db.session.execute(text(
+            'DELETE FROM attendance WHERE id NOT IN '
+            '(SELECT MAX(id) FROM attendance GROUP BY student_id, date)'
+        ))
+        if rows and inspect(db.engine).has_table('attendance_summaries'):
+            from app.models.attendance_summary import AttendanceSummary
+            AttendanceSummary.rebuild()
+        db.session.commit()
+        click.echo(f'Deleted {len(rows)} duplicate attendance records.')
+    
+    @app.cli.command('rebuild-search-index')
+    def rebuild_search_index():
+        """Create (if missing) and repopulate the student/staff FTS search index."""
+        from app.utils.search import create_search_indexes
+        
+        with db.engine.begin() as connection:
+            if connection.dialect.name != 'sqlite':
+                click.echo('Full-text search index is SQLite-only; searches use LIKE filters.')
+                return
+            create_search_indexes(connection)
+        click.echo('Rebuilt the student and staff search index.')
+    
+    @app.cli.command('sweep-overdue-fees')
+    @click.option('--date', 'as_of', help='Treat this day (YYYY-MM-DD) as today.')
+    def sweep_overdue_fees(as_of):
+        """Mark past-due fees overdue and apply the configured late-fee policy."""
+        from app.models.job_lock import JobLock
+        from app.scheduler import sweep_overdue_fees as sweep
+        
+        owner = f'cli:{os.getpid()}'
+        if not JobLock.acquire('sweep-overdue-fees', owner, 600):
+            raise click.ClickException('Another process is sweeping overdue fees.')
+        
+        try:
+            result = sweep(app, today=datetime.strptime(as_of, '%Y-%m-%d').date() if as_of else None)
+        finally:
+            JobLock.release('sweep-overdue-fees', owner)
+        
+        click.echo(f"Marked {result['marked_overdue']} fees overdue, "
+                   f"applied {result['late_fees_applied']} late fees.")
+    
+    @app.cli.command('purge-report-jobs')
+    def purge_report_jobs():
+        """Delete background report jobs whose results have expired."""
+        from app.scheduler import purge_report_jobs as purge
+        
+        result = purge(app)
+        click.echo(f"Purged {result['purged']} expired report jobs.")
\ No newline at end of file
@@ -0,0 +1,149 @@
+"""
+Background report jobs.
+
+Report endpoints given `?async=true` queue a ReportJob instead of building
+the report in the request: the response is a 202 with the job and a Location
+to poll (`GET /api/jobs/<id>`). Jobs run on a bounded thread pool in the
+process that accepted them (REPORT_JOB_WORKERS threads, at most
+REPORT_JOB_QUEUE_LIMIT waiting), and their state and result live in the
+report_jobs table, so any worker can answer a poll. Results are kept for
+REPORT_JOB_RESULT_TTL seconds. A submit identical to a queued or running job
+returns that job rather than building the same report twice.
+
+A job lives only as long as its process. Every REPORT_JOB_HEARTBEAT_INTERVAL
+seconds the process touches the jobs it holds; once a job has gone
+REPORT_JOB_TIMEOUT seconds without that heartbeat (its worker was recycled or
+killed), polls report it failed and an identical submit starts it afresh.
+
+Report builders register with `@report_builder(kind)`. They take the
+report's parameters as keyword arguments plus a `progress` callback taking a
+fraction done, and return the report as a JSON-serializable dict.
+"""
+
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app, jsonify, url_for
+from flask_jwt_extended import current_user
+
+from app import db
+
+logger = logging.getLogger(__name__)
+
+# kind -> builder function
+REPORTS = {}
+
+
+def report_builder(kind):
+    def decorator(func):
+        REPORTS[kind] = func
+        return func
+    return decorator
+
+
+class QueueFull(Exception):
+    pass
+
+
+class ReportJobs:
+    def __init__(self, app=None):
+        self._pid = None
+        self._executor = None
+        self._held = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        app.extensions['report_jobs'] = self
+
+    def enqueue(self, job_id):
+        """Run job `job_id` on this process's pool; raises QueueFull when it is saturated."""
+        config = self.app.config
+        with self._lock:
+            # Threads do not survive fork(), so each process builds its own pool
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._held = set()
+                self._executor = ThreadPoolExecutor(
+                    max_workers=config['REPORT_JOB_WORKERS'], thread_name_prefix='report-job'
+                )
+                threading.Thread(target=self._heartbeat_loop, name='report-job-heartbeat', daemon=True).start()
+            if len(self._held) >= config['REPORT_JOB_WORKERS'] + config['REPORT_JOB_QUEUE_LIMIT']:
+                raise QueueFull()
+            self._held.add(job_id)
+            self._executor.submit(self._run, job_id)
+
+    def _run(self, job_id):
+        from app.models.report_job import ReportJob
+
+        ttl = self.app.config['REPORT_JOB_RESULT_TTL']
+        with self.app.app_context():
+            try:
+                job = db.session.get(ReportJob, job_id)
+                builder, params = REPORTS[job.kind], json.loads(job.params)
+                ReportJob.start(job_id)
+                result = builder(**params, progress=lambda fraction: ReportJob.set_progress(job_id, fraction))
+                ReportJob.finish(job_id, self.app.json.dumps(result), ttl)
+            except Exception as e:
+                db.session.rollback()
+                logger.exception('Report job %s failed', job_id)
+                ReportJob.fail(job_id, str(e), ttl)
+            finally:
+                db.session.remove()
+                with self._lock:
+                    self._held.discard(job_id)
+
+    def _heartbeat_loop(self):
+        from app.models.report_job import ReportJob
+
+        # Queued jobs and builders that rarely report progress stay alive too
+        while not self._stop.wait(self.app.config['REPORT_JOB_HEARTBEAT_INTERVAL']):
+            with self._lock:
+                job_ids = list(self._held)
+            if not job_ids:
+                continue
+            with self.app.app_context():
+                try:
+                    ReportJob.heartbeat(job_ids)
+                except Exception:
+                    db.session.rollback()
+                    logger.exception('Report job heartbeat failed')
+                finally:
+                    db.session.remove()
+
+    def stop(self):
+        self._stop.set()
+
+
+def submit_report(kind, params):
+    """
+    Queue (or join) a `kind` report job from a route; returns the 202
+    response, or a 503 when this process cannot take more jobs.
+    """
+    from app.models.report_job import ReportJob
+
+    jobs = current_app.extensions['report_jobs']
+    config = jobs.app.config
+    job, created = ReportJob.submit(
+        kind, params, created_by=current_user.id,
+        timeout=config['REPORT_JOB_TIMEOUT'], ttl=config['REPORT_JOB_RESULT_TTL']
+    )
+    if created:
+        try:
+            jobs.enqueue(job.id)
+        except QueueFull:
+            ReportJob.fail(job.id, 'Too many report jobs running', 0)
+            response = jsonify({'error': 'Too many report jobs running, try again shortly'})
+            response.headers['Retry-After'] = '5'
+            return response, 503
+
+    response = jsonify({'job': job.to_dict(), 'created': created})
+    response.headers['Location'] = url_for('jobs.get_job', job_id=job.id)
+    return response, 202
+
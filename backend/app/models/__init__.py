@@ -6,5 +6,9 @@ from .grade import Grade
 from .fee import Fee
 from .subject import Subject
 from .class_model import Class
+from .grade_summary import GradeSummary
+from .attendance_summary import AttendanceSummary
+from .job_lock import JobLock
+from .report_job import ReportJob
 
-__all__ = ['User', 'Student', 'Staff', 'Attendance', 'Grade', 'Fee', 'Subject', 'Class']
\ No newline at end of file
+__all__ = ['User', 'Student', 'Staff', 'Attendance', 'Grade', 'Fee', 'Subject', 'Class', 'GradeSummary', 'AttendanceSummary', 'JobLock', 'ReportJob']
\ No newline at end of file
@@ -1,8 +1,15 @@
 from app import db
+from app.utils.serialization import SerializerMixin
 from datetime import datetime
 
-class Attendance(db.Model):
+class Attendance(SerializerMixin, db.Model):
     __tablename__ = 'attendance'
+    __table_args__ = (
+        # One record per student per day; check-in/out and bulk marking look rows up by it
+        db.Index('uq_attendance_student_date', 'student_id', 'date', unique=True),
+        # Date-range reports: covers the status count per student without touching the table
+        db.Index('ix_attendance_date_student_status', 'date', 'student_id', 'status'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     student_id = db.Column(db.Integer, db.ForeignKey('students.id'), nullable=False)
@@ -18,18 +25,17 @@ class Attendance(db.Model):
     # Relationships
     marked_by_user = db.relationship('User', foreign_keys=[marked_by])
     
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'student_id': self.student_id,
-            'student_name': self.student.full_name if self.student else None,
-            'date': self.date.isoformat() if self.date else None,
-            'status': self.status,
-            'check_in_time': self.check_in_time.isoformat() if self.check_in_time else None,
-            'check_out_time': self.check_out_time.isoformat() if self.check_out_time else None,
-            'notes': self.notes,
-            'marked_by': self.marked_by,
-            'marked_by_name': self.marked_by_user.username if self.marked_by_user else None,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
\ No newline at end of file
+    serialize_fields = {
+        'id': 'id',
+        'student_id': 'student_id',
+        'student_name': 'student.full_name',
+        'date': 'date',
+        'status': 'status',
+        'check_in_time': 'check_in_time',
+        'check_out_time': 'check_out_time',
+        'notes': 'notes',
+        'marked_by': 'marked_by',
+        'marked_by_name': 'marked_by_user.username',
+        'created_at': 'created_at',
+        'updated_at': 'updated_at'
+    }
\ No newline at end of file
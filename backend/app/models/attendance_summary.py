@@ -0,0 +1,101 @@
+from app import db
+from app.models.attendance import Attendance
+from app.utils.upsert import insert_for
+from datetime import datetime
+from sqlalchemy import Date, case, cast, func, insert, literal
+
+SUMMARY_STATUSES = ('present', 'absent', 'late', 'excused')
+
+class AttendanceSummary(db.Model):
+    """
+    Per-student monthly attendance counts.
+    
+    One row per (student_id, month), where month is the first day of the
+    month. Maintained incrementally by the attendance routes through
+    `apply_changes`; `rebuild` recomputes it from the attendance table.
+    Per-class figures are rollups of these rows grouped by class.
+    """
+    __tablename__ = 'attendance_summaries'
+    __table_args__ = (
+        db.Index('uq_attendance_summaries_student_month', 'student_id', 'month', unique=True),
+        db.Index('ix_attendance_summaries_month', 'month', 'student_id'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    student_id = db.Column(db.Integer, db.ForeignKey('students.id'), nullable=False)
+    month = db.Column(db.Date, nullable=False)
+    total_days = db.Column(db.Integer, nullable=False, default=0)
+    present_days = db.Column(db.Integer, nullable=False, default=0)
+    absent_days = db.Column(db.Integer, nullable=False, default=0)
+    late_days = db.Column(db.Integer, nullable=False, default=0)
+    excused_days = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    @classmethod
+    def apply_changes(cls, changes):
+        """
+        Apply attendance changes given as (student_id, date, old_status,
+        new_status) tuples; old_status is None for a newly created record.
+        """
+        deltas = {}
+        for student_id, day, old_status, new_status in changes:
+            if old_status == new_status:
+                continue
+            delta = deltas.setdefault((student_id, day.replace(day=1)), dict.fromkeys(SUMMARY_STATUSES, 0))
+            if old_status is None:
+                delta['total'] = delta.get('total', 0) + 1
+            elif old_status in delta:
+                delta[old_status] -= 1
+            if new_status in delta:
+                delta[new_status] += 1
+        
+        if not deltas:
+            return
+        
+        rows = [{
+            'student_id': student_id,
+            'month': month,
+            'total_days': delta.get('total', 0),
+            **{f'{status}_days': delta[status] for status in SUMMARY_STATUSES},
+            'updated_at': datetime.utcnow()
+        } for (student_id, month), delta in deltas.items()]
+        
+        counters = ['total_days'] + [f'{status}_days' for status in SUMMARY_STATUSES]
+        insert_stmt = insert_for(db.session)
+        if insert_stmt is not None:
+            stmt = insert_stmt(cls)
+            set_ = {name: getattr(cls, name) + getattr(stmt.excluded, name) for name in counters}
+            set_['updated_at'] = stmt.excluded.updated_at
+            stmt = stmt.on_conflict_do_update(index_elements=[cls.student_id, cls.month], set_=set_)
+            db.session.execute(stmt, rows)
+            return
+        
+        for row in rows:
+            summary = cls.query.filter_by(student_id=row['student_id'], month=row['month']).first()
+            if summary is None:
+                db.session.add(cls(**row))
+            else:
+                for name in counters:
+                    setattr(summary, name, getattr(summary, name) + row[name])
+    
+    @classmethod
+    def rebuild(cls):
+        """Recompute every summary row from the attendance table."""
+        month = month_start(Attendance.date)
+        db.session.query(cls).delete(synchronize_session=False)
+        db.session.execute(insert(cls).from_select(
+            ['student_id', 'month', 'total_days'] + [f'{status}_days' for status in SUMMARY_STATUSES] + ['updated_at'],
+            db.select(
+                Attendance.student_id,
+                month,
+                func.count(Attendance.id),
+                *[func.sum(case((Attendance.status == status, 1), else_=0)) for status in SUMMARY_STATUSES],
+                literal(datetime.utcnow())
+            ).group_by(Attendance.student_id, month)
+        ))
+
+def month_start(column):
+    """SQL expression truncating a date column to the first day of its month."""
+    if db.session.get_bind().dialect.name == 'sqlite':
+        return func.date(column, 'start of month')
+    return cast(func.date_trunc('month', column), Date)
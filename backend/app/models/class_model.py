@@ -17,7 +17,7 @@ class Class(db.Model):
     # Relationships
     students = db.relationship('Student', backref='class_enrolled', lazy='dynamic')
     
-    def to_dict(self):
+    def to_dict(self, student_count=None):
         return {
             'id': self.id,
             'name': self.name,
@@ -26,7 +26,7 @@ class Class(db.Model):
             'academic_year': self.academic_year,
             'capacity': self.capacity,
             'is_active': self.is_active,
-            'student_count': self.students.count(),
+            'student_count': self.students.count() if student_count is None else student_count,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
\ No newline at end of file
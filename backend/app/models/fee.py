@@ -1,8 +1,21 @@
 from app import db
-from datetime import datetime
+from app.utils.serialization import SerializerMixin
+from datetime import datetime, timedelta
+from decimal import Decimal
+from sqlalchemy import func
+from sqlalchemy.ext.hybrid import hybrid_property
 
-class Fee(db.Model):
+class Fee(SerializerMixin, db.Model):
     __tablename__ = 'fees'
+    __table_args__ = (
+        # Overdue lookups; the amounts are included so totals can be read from the index
+        db.Index('ix_fees_status_due_date', 'status', 'due_date',
+                 postgresql_include=['amount', 'paid_amount', 'late_fee', 'discount']),
+        db.Index('ix_fees_payment_date', 'payment_date'),
+        # Sort/seek key for the fee list
+        db.Index('ix_fees_due_date', 'due_date', 'id'),
+        db.Index('ix_fees_student_id', 'student_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     student_id = db.Column(db.Integer, db.ForeignKey('students.id'), nullable=False)
@@ -17,6 +30,9 @@ class Fee(db.Model):
     semester = db.Column(db.String(20))
     academic_year = db.Column(db.String(20))
     late_fee = db.Column(db.Decimal(10, 2), default=0)
+    # Set once a late fee has been decided, by the sweep or by staff; a later
+    # waiver (late_fee back to 0) must not be charged again
+    late_fee_applied_at = db.Column(db.DateTime)
     discount = db.Column(db.Decimal(10, 2), default=0)
     notes = db.Column(db.Text)
     collected_by = db.Column(db.Integer, db.ForeignKey('user.id'))
@@ -26,10 +42,15 @@ class Fee(db.Model):
     # Relationships
     collector = db.relationship('User', foreign_keys=[collected_by])
     
-    @property
+    @hybrid_property
     def balance_amount(self):
         return float(self.amount + self.late_fee - self.discount - self.paid_amount)
     
+    @balance_amount.expression
+    def balance_amount(cls):
+        return (cls.amount + func.coalesce(cls.late_fee, 0)
+                - func.coalesce(cls.discount, 0) - func.coalesce(cls.paid_amount, 0))
+    
     def update_status(self):
         if self.paid_amount >= (self.amount + self.late_fee - self.discount):
             self.status = 'paid'
@@ -40,28 +61,67 @@ class Fee(db.Model):
         else:
             self.status = 'pending'
     
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'student_id': self.student_id,
-            'student_name': self.student.full_name if self.student else None,
-            'student_student_id': self.student.student_id if self.student else None,
-            'fee_type': self.fee_type,
-            'amount': float(self.amount) if self.amount else None,
-            'due_date': self.due_date.isoformat() if self.due_date else None,
-            'paid_amount': float(self.paid_amount) if self.paid_amount else None,
-            'payment_date': self.payment_date.isoformat() if self.payment_date else None,
-            'payment_method': self.payment_method,
-            'transaction_id': self.transaction_id,
-            'status': self.status,
-            'semester': self.semester,
-            'academic_year': self.academic_year,
-            'late_fee': float(self.late_fee) if self.late_fee else None,
-            'discount': float(self.discount) if self.discount else None,
-            'balance_amount': self.balance_amount,
-            'notes': self.notes,
-            'collected_by': self.collected_by,
-            'collector_name': self.collector.username if self.collector else None,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
\ No newline at end of file
+    @classmethod
+    def sweep_overdue(cls, today=None, late_fee_policy='none', late_fee_amount=0,
+                      late_fee_percent=0, grace_days=0):
+        """
+        Bring fees up to date with the calendar in two set-based UPDATEs:
+        unpaid fees past their due date become 'overdue' (as update_status
+        would decide), then the late-fee policy is applied once to every
+        fee still owing `grace_days` after its due date whose late fee has
+        not been decided yet. Returns the row counts; the caller commits.
+        """
+        today = today or datetime.utcnow().date()
+        now = datetime.utcnow()
+        
+        marked_overdue = cls.query.filter(
+            cls.status == 'pending',
+            cls.due_date < today
+        ).update({'status': 'overdue', 'updated_at': now}, synchronize_session=False)
+        
+        if late_fee_policy == 'flat':
+            late_fee = Decimal(str(late_fee_amount))
+        elif late_fee_policy == 'percent':
+            late_fee = func.round(cls.amount * Decimal(str(late_fee_percent)) / 100, 2)
+        elif late_fee_policy == 'none':
+            late_fee = None
+        else:
+            raise ValueError(f'Unknown late fee policy: {late_fee_policy}')
+        
+        late_fees_applied = 0
+        if late_fee is not None:
+            late_fees_applied = cls.query.filter(
+                cls.status.in_(['partial', 'overdue']),
+                cls.due_date < today - timedelta(days=grace_days),
+                cls.late_fee_applied_at.is_(None)
+            ).update({'late_fee': late_fee, 'late_fee_applied_at': now, 'updated_at': now},
+                     synchronize_session=False)
+        
+        return {'marked_overdue': marked_overdue, 'late_fees_applied': late_fees_applied}
+    
+    serialize_fields = {
+        'id': 'id',
+        'student_id': 'student_id',
+        'student_name': 'student.full_name',
+        'student_student_id': 'student.student_id',
+        'fee_type': 'fee_type',
+        'amount': ('amount', 'decimal'),
+        'due_date': 'due_date',
+        'paid_amount': ('paid_amount', 'decimal'),
+        'payment_date': 'payment_date',
+        'payment_method': 'payment_method',
+        'transaction_id': 'transaction_id',
+        'status': 'status',
+        'semester': 'semester',
+        'academic_year': 'academic_year',
+        'late_fee': ('late_fee', 'decimal'),
+        'discount': ('discount', 'decimal'),
+        'balance_amount': 'balance_amount',
+        'notes': 'notes',
+        'collected_by': 'collected_by',
+        'collector_name': 'collector.username',
+        'created_at': 'created_at',
+        'updated_at': 'updated_at'
+    }
+    
+    serialize_depends = {'balance_amount': ('amount', 'late_fee', 'discount', 'paid_amount')}
\ No newline at end of file
@@ -1,8 +1,29 @@
 from app import db
+from app.utils.serialization import SerializerMixin
 from datetime import datetime
 
-class Grade(db.Model):
+# 4.0 scale used for GPA
+GRADE_POINTS = {
+    'A+': 4.0, 'A': 4.0, 'B+': 3.5, 'B': 3.0,
+    'C+': 2.5, 'C': 2.0, 'D': 1.0, 'F': 0.0
+}
+
+# Lowest percentage earning each letter, best first; anything below is an F
+GRADE_THRESHOLDS = ((90, 'A+'), (80, 'A'), (70, 'B+'), (60, 'B'), (50, 'C'), (40, 'D'))
+
+def grade_letter_for(percentage):
+    for minimum, letter in GRADE_THRESHOLDS:
+        if percentage >= minimum:
+            return letter
+    return 'F'
+
+class Grade(SerializerMixin, db.Model):
     __tablename__ = 'grades'
+    __table_args__ = (
+        db.Index('ix_grades_student_term', 'student_id', 'semester', 'academic_year'),
+        # Sort/seek key for the grade list
+        db.Index('ix_grades_date_assessed', 'date_assessed', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     student_id = db.Column(db.Integer, db.ForeignKey('students.id'), nullable=False)
@@ -33,43 +54,29 @@ class Grade(db.Model):
         if self.percentage is None:
             self.calculate_percentage()
         
-        if self.percentage >= 90:
-            self.grade_letter = 'A+'
-        elif self.percentage >= 80:
-            self.grade_letter = 'A'
-        elif self.percentage >= 70:
-            self.grade_letter = 'B+'
-        elif self.percentage >= 60:
-            self.grade_letter = 'B'
-        elif self.percentage >= 50:
-            self.grade_letter = 'C'
-        elif self.percentage >= 40:
-            self.grade_letter = 'D'
-        else:
-            self.grade_letter = 'F'
+        self.grade_letter = grade_letter_for(self.percentage)
         
         return self.grade_letter
     
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'student_id': self.student_id,
-            'student_name': self.student.full_name if self.student else None,
-            'subject_id': self.subject_id,
-            'subject_name': self.subject.name if self.subject else None,
-            'subject_code': self.subject.code if self.subject else None,
-            'assessment_type': self.assessment_type,
-            'assessment_name': self.assessment_name,
-            'marks_obtained': float(self.marks_obtained) if self.marks_obtained else None,
-            'total_marks': float(self.total_marks) if self.total_marks else None,
-            'percentage': float(self.percentage) if self.percentage else None,
-            'grade_letter': self.grade_letter,
-            'semester': self.semester,
-            'academic_year': self.academic_year,
-            'date_assessed': self.date_assessed.isoformat() if self.date_assessed else None,
-            'teacher_id': self.teacher_id,
-            'teacher_name': self.teacher.username if self.teacher else None,
-            'comments': self.comments,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
\ No newline at end of file
+    serialize_fields = {
+        'id': 'id',
+        'student_id': 'student_id',
+        'student_name': 'student.full_name',
+        'subject_id': 'subject_id',
+        'subject_name': 'subject.name',
+        'subject_code': 'subject.code',
+        'assessment_type': 'assessment_type',
+        'assessment_name': 'assessment_name',
+        'marks_obtained': ('marks_obtained', 'decimal'),
+        'total_marks': ('total_marks', 'decimal'),
+        'percentage': ('percentage', 'decimal'),
+        'grade_letter': 'grade_letter',
+        'semester': 'semester',
+        'academic_year': 'academic_year',
+        'date_assessed': 'date_assessed',
+        'teacher_id': 'teacher_id',
+        'teacher_name': 'teacher.username',
+        'comments': 'comments',
+        'created_at': 'created_at',
+        'updated_at': 'updated_at'
+    }
\ No newline at end of file
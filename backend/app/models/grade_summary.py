@@ -0,0 +1,170 @@
+from app import db
+from app.models.grade import GRADE_POINTS, Grade
+from app.models.subject import Subject
+from app.utils.upsert import insert_for
+from datetime import datetime
+from sqlalchemy import case, func, insert, literal, tuple_
+
+class GradeSummary(db.Model):
+    """
+    Materialized per-student, per-term, per-subject grade aggregates.
+    
+    Kept up to date incrementally by the grade routes through
+    `apply_changes`; `rebuild` recomputes the whole table from `grades`.
+    Terms without a semester or academic year are stored under ''.
+    """
+    __tablename__ = 'grade_summaries'
+    __table_args__ = (
+        db.Index('uq_grade_summaries_key', 'student_id', 'semester', 'academic_year', 'subject_id', unique=True),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    student_id = db.Column(db.Integer, db.ForeignKey('students.id'), nullable=False)
+    subject_id = db.Column(db.Integer, db.ForeignKey('subjects.id'), nullable=False)
+    semester = db.Column(db.String(20), nullable=False, default='')
+    academic_year = db.Column(db.String(20), nullable=False, default='')
+    assessment_count = db.Column(db.Integer, nullable=False, default=0)
+    percentage_sum = db.Column(db.Numeric(12, 2), nullable=False, default=0)
+    credit_sum = db.Column(db.Integer, nullable=False, default=0)
+    grade_points_sum = db.Column(db.Numeric(12, 2), nullable=False, default=0)  # sum of points * credits
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Relationships
+    subject = db.relationship('Subject')
+    
+    @staticmethod
+    def snapshot(grade):
+        """The fields of a grade that contribute to its summary row."""
+        return {
+            'student_id': grade.student_id,
+            'subject_id': grade.subject_id,
+            'semester': grade.semester or '',
+            'academic_year': grade.academic_year or '',
+            'percentage': float(grade.percentage or 0),
+            'grade_letter': grade.grade_letter
+        }
+    
+    @classmethod
+    def apply_changes(cls, added=(), removed=(), credits=None):
+        """
+        Add the contributions of the `added` grade snapshots and subtract
+        those of the `removed` ones, in one batched upsert. `credits` maps
+        subject id to credits for callers that already loaded them.
+        """
+        changes = [(1, snap) for snap in added] + [(-1, snap) for snap in removed]
+        if not changes:
+            return
+        
+        if credits is None:
+            subject_ids = {snap['subject_id'] for _, snap in changes}
+            credits = dict(db.session.query(Subject.id, Subject.credits).filter(Subject.id.in_(subject_ids)))
+        
+        deltas = {}
+        for sign, snap in changes:
+            key = (snap['student_id'], snap['semester'], snap['academic_year'], snap['subject_id'])
+            subject_credits = credits.get(snap['subject_id']) or 0
+            delta = deltas.setdefault(key, [0, 0.0, 0, 0.0])
+            delta[0] += sign
+            delta[1] += sign * snap['percentage']
+            delta[2] += sign * subject_credits
+            delta[3] += sign * GRADE_POINTS.get(snap['grade_letter'], 0) * subject_credits
+        
+        rows = [{
+            'student_id': student_id,
+            'semester': semester,
+            'academic_year': academic_year,
+            'subject_id': subject_id,
+            'assessment_count': count,
+            'percentage_sum': percentage_sum,
+            'credit_sum': credit_sum,
+            'grade_points_sum': grade_points_sum,
+            'updated_at': datetime.utcnow()
+        } for (student_id, semester, academic_year, subject_id), (count, percentage_sum, credit_sum, grade_points_sum)
+            in deltas.items()]
+        
+        insert_stmt = insert_for(db.session)
+        if insert_stmt is not None:
+            stmt = insert_stmt(cls)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[cls.student_id, cls.semester, cls.academic_year, cls.subject_id],
+                set_={
+                    'assessment_count': cls.assessment_count + stmt.excluded.assessment_count,
+                    'percentage_sum': cls.percentage_sum + stmt.excluded.percentage_sum,
+                    'credit_sum': cls.credit_sum + stmt.excluded.credit_sum,
+                    'grade_points_sum': cls.grade_points_sum + stmt.excluded.grade_points_sum,
+                    'updated_at': stmt.excluded.updated_at
+                }
+            )
+            db.session.execute(stmt, rows)
+        else:
+            for row in rows:
+                summary = cls.query.filter_by(
+                    student_id=row['student_id'], semester=row['semester'],
+                    academic_year=row['academic_year'], subject_id=row['subject_id']
+                ).first()
+                if summary is None:
+                    db.session.add(cls(**row))
+                else:
+                    summary.assessment_count += row['assessment_count']
+                    summary.percentage_sum = float(summary.percentage_sum) + row['percentage_sum']
+                    summary.credit_sum += row['credit_sum']
+                    summary.grade_points_sum = float(summary.grade_points_sum) + row['grade_points_sum']
+        
+        # Rows whose last assessment went away. Only keys that lost an assessment
+        # can be empty, and matching them on the unique key avoids a table scan
+        emptied = [key for key, delta in deltas.items() if delta[0] < 0]
+        if emptied:
+            db.session.query(cls).filter(
+                tuple_(cls.student_id, cls.semester, cls.academic_year, cls.subject_id).in_(emptied),
+                cls.assessment_count <= 0
+            ).delete(synchronize_session=False)
+    
+    @classmethod
+    def rebuild(cls):
+        """Recompute every summary row from the grades table."""
+        db.session.query(cls).delete(synchronize_session=False)
+        db.session.execute(insert(cls).from_select(
+            ['student_id', 'semester', 'academic_year', 'subject_id', 'assessment_count',
+             'percentage_sum', 'credit_sum', 'grade_points_sum', 'updated_at'],
+            summary_select()
+        ))
+
+    @property
+    def average_percentage(self):
+        return float(self.percentage_sum) / self.assessment_count if self.assessment_count else 0
+    
+    def to_dict(self):
+        return {
+            'student_id': self.student_id,
+            'subject_id': self.subject_id,
+            'subject_name': self.subject.name if self.subject else None,
+            'semester': self.semester or None,
+            'academic_year': self.academic_year or None,
+            'assessment_count': self.assessment_count,
+            'average_percentage': round(self.average_percentage, 2),
+            'credits': self.credit_sum,
+            'gpa': round(float(self.grade_points_sum) / self.credit_sum, 2) if self.credit_sum else 0
+        }
+
+def summary_select():
+    """SELECT computing the grade_summaries rows from grades."""
+    credits = func.coalesce(Subject.credits, 0)
+    points = case(
+        *[(Grade.grade_letter == letter, value) for letter, value in GRADE_POINTS.items()],
+        else_=0
+    )
+    semester = func.coalesce(Grade.semester, '')
+    academic_year = func.coalesce(Grade.academic_year, '')
+    return db.select(
+        Grade.student_id,
+        semester,
+        academic_year,
+        Grade.subject_id,
+        func.count(Grade.id),
+        func.coalesce(func.sum(Grade.percentage), 0),
+        func.sum(credits),
+        func.sum(points * credits),
+        literal(datetime.utcnow())
+    ).join(Subject, Grade.subject_id == Subject.id).group_by(
+        Grade.student_id, semester, academic_year, Grade.subject_id
+    )
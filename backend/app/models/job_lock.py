@@ -0,0 +1,47 @@
+from app import db
+from datetime import datetime, timedelta
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+
+class JobLock(db.Model):
+    """Time-limited lease that lets one process at a time run a background job."""
+    __tablename__ = 'job_locks'
+    
+    name = db.Column(db.String(100), primary_key=True)
+    owner = db.Column(db.String(100), nullable=False)
+    locked_until = db.Column(db.DateTime, nullable=False)
+    
+    @classmethod
+    def acquire(cls, name, owner, seconds):
+        """
+        Take (or renew) the lease on `name` for `seconds`. Returns False if
+        another owner holds an unexpired lease. Commits the session.
+        """
+        now = datetime.utcnow()
+        until = now + timedelta(seconds=seconds)
+        
+        taken = cls.query.filter(
+            cls.name == name,
+            or_(cls.locked_until < now, cls.owner == owner)
+        ).update({'owner': owner, 'locked_until': until}, synchronize_session=False)
+        
+        if not taken:
+            if db.session.get(cls, name) is not None:
+                db.session.rollback()
+                return False
+            db.session.add(cls(name=name, owner=owner, locked_until=until))
+        
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Another process created the row first
+            db.session.rollback()
+            return False
+        return True
+    
+    @classmethod
+    def release(cls, name, owner):
+        cls.query.filter_by(name=name, owner=owner).update(
+            {'locked_until': datetime.utcnow()}, synchronize_session=False
+        )
+        db.session.commit()
@@ -0,0 +1,159 @@
+from app import db
+from datetime import datetime, timedelta
+from sqlalchemy.exc import IntegrityError
+import hashlib
+import json
+import uuid
+
+class ReportJob(db.Model):
+    """
+    A report run in the background (see app/jobs.py).
+    
+    `params` is the report's normalized parameters as JSON. While the job is
+    queued or running, `active_key` holds a hash of its kind and params; the
+    column is unique, so an identical submit finds the running job instead of
+    starting another one. Finished jobs clear it and keep their result until
+    `expires_at`. The process running a job bumps `updated_at` as a heartbeat;
+    an unfinished job whose heartbeat stops was lost with its process.
+    """
+    __tablename__ = 'report_jobs'
+    __table_args__ = (
+        db.Index('ix_report_jobs_expires_at', 'expires_at'),
+    )
+    
+    id = db.Column(db.String(32), primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)
+    params = db.Column(db.Text, nullable=False)
+    active_key = db.Column(db.String(40), unique=True)
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued, running, done, failed
+    progress = db.Column(db.Integer, nullable=False, default=0)
+    result = db.Column(db.Text)
+    error = db.Column(db.Text)
+    created_by = db.Column(db.Integer, db.ForeignKey('user.id'))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    expires_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    @classmethod
+    def submit(cls, kind, params, created_by=None, timeout=60, ttl=0):
+        """
+        Queue a `kind` report with `params` unless an identical one is
+        already queued or running. Returns (job, created). Jobs without a
+        heartbeat for `timeout` seconds are presumed dead (their process
+        exited), no longer block new submits, and are kept failed for `ttl`
+        seconds. Commits the session.
+        """
+        params_json = json.dumps(params, sort_keys=True)
+        key = hashlib.sha1(f'{kind}:{params_json}'.encode()).hexdigest()
+        now = datetime.utcnow()
+        
+        cls.fail_stale(timeout, ttl, cls.active_key == key)
+        
+        existing = cls.query.filter_by(active_key=key).first()
+        if existing is not None:
+            db.session.commit()
+            return existing, False
+        
+        job = cls(id=uuid.uuid4().hex, kind=kind, params=params_json, active_key=key,
+                  status='queued', progress=0, created_by=created_by, created_at=now, updated_at=now)
+        db.session.add(job)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Another process queued the same report first
+            db.session.rollback()
+            existing = cls.query.filter_by(active_key=key).first()
+            if existing is None:
+                raise
+            return existing, False
+        return job, True
+    
+    @classmethod
+    def fail_stale(cls, timeout, ttl, *criteria):
+        """
+        Fail the unfinished jobs matching `criteria` whose heartbeat is older
+        than `timeout` seconds, keeping them for `ttl` seconds. Returns how
+        many; the caller commits.
+        """
+        now = datetime.utcnow()
+        return cls.query.filter(
+            cls.active_key.isnot(None),
+            cls.updated_at < now - timedelta(seconds=timeout),
+            *criteria
+        ).update({
+            'status': 'failed',
+            'error': 'The worker running this report stopped',
+            'active_key': None,
+            'finished_at': now,
+            'expires_at': now + timedelta(seconds=ttl),
+            'updated_at': now
+        }, synchronize_session=False)
+    
+    @classmethod
+    def heartbeat(cls, job_ids):
+        """Mark the unfinished jobs in `job_ids` as still alive. Commits the session."""
+        cls.query.filter(
+            cls.id.in_(job_ids),
+            cls.active_key.isnot(None)
+        ).update({'updated_at': datetime.utcnow()}, synchronize_session=False)
+        db.session.commit()
+    
+    @classmethod
+    def start(cls, job_id):
+        cls._update(job_id, status='running', started_at=datetime.utcnow())
+    
+    @classmethod
+    def set_progress(cls, job_id, fraction):
+        cls._update(job_id, progress=max(0, min(100, int(fraction * 100))))
+    
+    @classmethod
+    def finish(cls, job_id, result_json, ttl):
+        now = datetime.utcnow()
+        cls._update(job_id, status='done', progress=100, result=result_json, active_key=None,
+                    finished_at=now, expires_at=now + timedelta(seconds=ttl))
+    
+    @classmethod
+    def fail(cls, job_id, error, ttl):
+        now = datetime.utcnow()
+        cls._update(job_id, status='failed', error=error, active_key=None,
+                    finished_at=now, expires_at=now + timedelta(seconds=ttl))
+    
+    @classmethod
+    def purge_expired(cls, now=None):
+        """Delete finished jobs past their expiry; returns how many. Commits the session."""
+        deleted = cls.query.filter(
+            cls.expires_at < (now or datetime.utcnow())
+        ).delete(synchronize_session=False)
+        db.session.commit()
+        return deleted
+    
+    @classmethod
+    def _update(cls, job_id, **values):
+        cls.query.filter_by(id=job_id).update({**values, 'updated_at': datetime.utcnow()},
+                                              synchronize_session=False)
+        db.session.commit()
+    
+    def is_stale(self, timeout):
+        """Whether this unfinished job has gone `timeout` seconds without a heartbeat."""
+        return (self.active_key is not None and self.updated_at is not None
+                and self.updated_at < datetime.utcnow() - timedelta(seconds=timeout))
+    
+    @property
+    def is_expired(self):
+        return self.expires_at is not None and self.expires_at < datetime.utcnow()
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'params': json.loads(self.params),
+            'status': self.status,
+            'progress': self.progress,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'expires_at': self.expires_at.isoformat() if self.expires_at else None
+        }
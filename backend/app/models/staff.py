@@ -1,7 +1,8 @@
 from app import db
+from app.utils.serialization import SerializerMixin
 from datetime import datetime
 
-class Staff(db.Model):
+class Staff(SerializerMixin, db.Model):
     __tablename__ = 'staff'
     
     id = db.Column(db.Integer, primary_key=True)
@@ -28,27 +29,28 @@ class Staff(db.Model):
     def full_name(self):
         return f"{self.first_name} {self.last_name}"
     
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'user_id': self.user_id,
-            'staff_id': self.staff_id,
-            'first_name': self.first_name,
-            'last_name': self.last_name,
-            'full_name': self.full_name,
-            'date_of_birth': self.date_of_birth.isoformat() if self.date_of_birth else None,
-            'gender': self.gender,
-            'phone': self.phone,
-            'address': self.address,
-            'position': self.position,
-            'department': self.department,
-            'salary': float(self.salary) if self.salary else None,
-            'hire_date': self.hire_date.isoformat() if self.hire_date else None,
-            'qualification': self.qualification,
-            'emergency_contact': self.emergency_contact,
-            'emergency_phone': self.emergency_phone,
-            'is_active': self.is_active,
-            'email': self.user.email if self.user else None,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
\ No newline at end of file
+    serialize_fields = {
+        'id': 'id',
+        'user_id': 'user_id',
+        'staff_id': 'staff_id',
+        'first_name': 'first_name',
+        'last_name': 'last_name',
+        'full_name': 'full_name',
+        'date_of_birth': 'date_of_birth',
+        'gender': 'gender',
+        'phone': 'phone',
+        'address': 'address',
+        'position': 'position',
+        'department': 'department',
+        'salary': ('salary', 'decimal'),
+        'hire_date': 'hire_date',
+        'qualification': 'qualification',
+        'emergency_contact': 'emergency_contact',
+        'emergency_phone': 'emergency_phone',
+        'is_active': 'is_active',
+        'email': 'user.email',
+        'created_at': 'created_at',
+        'updated_at': 'updated_at'
+    }
+    
+    serialize_depends = {'full_name': ('first_name', 'last_name')}
\ No newline at end of file
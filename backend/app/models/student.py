@@ -1,7 +1,8 @@
 from app import db
+from app.utils.serialization import SerializerMixin
 from datetime import datetime
 
-class Student(db.Model):
+class Student(SerializerMixin, db.Model):
     __tablename__ = 'students'
     
     id = db.Column(db.Integer, primary_key=True)
@@ -13,7 +14,7 @@ class Student(db.Model):
     gender = db.Column(db.String(10), nullable=False)
     phone = db.Column(db.String(20))
     address = db.Column(db.Text)
-    class_id = db.Column(db.Integer, db.ForeignKey('classes.id'))
+    class_id = db.Column(db.Integer, db.ForeignKey('classes.id'), index=True)
     parent_name = db.Column(db.String(100))
     parent_phone = db.Column(db.String(20))
     parent_email = db.Column(db.String(120))
@@ -31,26 +32,27 @@ class Student(db.Model):
     def full_name(self):
         return f"{self.first_name} {self.last_name}"
     
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'user_id': self.user_id,
-            'student_id': self.student_id,
-            'first_name': self.first_name,
-            'last_name': self.last_name,
-            'full_name': self.full_name,
-            'date_of_birth': self.date_of_birth.isoformat() if self.date_of_birth else None,
-            'gender': self.gender,
-            'phone': self.phone,
-            'address': self.address,
-            'class_id': self.class_id,
-            'class_name': self.class_enrolled.name if self.class_enrolled else None,
-            'parent_name': self.parent_name,
-            'parent_phone': self.parent_phone,
-            'parent_email': self.parent_email,
-            'admission_date': self.admission_date.isoformat() if self.admission_date else None,
-            'is_active': self.is_active,
-            'email': self.user.email if self.user else None,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
\ No newline at end of file
+    serialize_fields = {
+        'id': 'id',
+        'user_id': 'user_id',
+        'student_id': 'student_id',
+        'first_name': 'first_name',
+        'last_name': 'last_name',
+        'full_name': 'full_name',
+        'date_of_birth': 'date_of_birth',
+        'gender': 'gender',
+        'phone': 'phone',
+        'address': 'address',
+        'class_id': 'class_id',
+        'class_name': 'class_enrolled.name',
+        'parent_name': 'parent_name',
+        'parent_phone': 'parent_phone',
+        'parent_email': 'parent_email',
+        'admission_date': 'admission_date',
+        'is_active': 'is_active',
+        'email': 'user.email',
+        'created_at': 'created_at',
+        'updated_at': 'updated_at'
+    }
+    
+    serialize_depends = {'full_name': ('first_name', 'last_name')}
\ No newline at end of file
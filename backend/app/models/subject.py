@@ -1,7 +1,8 @@
 from app import db
+from app.utils.serialization import SerializerMixin
 from datetime import datetime
 
-class Subject(db.Model):
+class Subject(SerializerMixin, db.Model):
     __tablename__ = 'subjects'
     
     id = db.Column(db.Integer, primary_key=True)
@@ -16,14 +17,13 @@ class Subject(db.Model):
     # Relationships
     grades = db.relationship('Grade', backref='subject', lazy='dynamic')
     
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'name': self.name,
-            'code': self.code,
-            'description': self.description,
-            'credits': self.credits,
-            'is_active': self.is_active,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
\ No newline at end of file
+    serialize_fields = {
+        'id': 'id',
+        'name': 'name',
+        'code': 'code',
+        'description': 'description',
+        'credits': 'credits',
+        'is_active': 'is_active',
+        'created_at': 'created_at',
+        'updated_at': 'updated_at'
+    }
\ No newline at end of file
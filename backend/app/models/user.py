@@ -1,14 +1,17 @@
 from app import db
+from app.utils.serialization import SerializerMixin
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
+from app.utils.passwords import default_password_hash
 
-class User(db.Model):
+class User(SerializerMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
     password_hash = db.Column(db.String(255), nullable=False)
     role = db.Column(db.String(20), nullable=False, default='student')  # student, teacher, admin, staff
     is_active = db.Column(db.Boolean, default=True)
+    must_change_password = db.Column(db.Boolean, nullable=False, default=False, server_default=db.false())
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -18,17 +21,23 @@ class User(db.Model):
     
     def set_password(self, password):
         self.password_hash = generate_password_hash(password)
+        self.must_change_password = False
+    
+    def set_default_password(self, password):
+        # Shared precomputed hash; the user is asked to pick their own at next login
+        self.password_hash = default_password_hash(password)
+        self.must_change_password = True
     
     def check_password(self, password):
         return check_password_hash(self.password_hash, password)
     
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'username': self.username,
-            'email': self.email,
-            'role': self.role,
-            'is_active': self.is_active,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
\ No newline at end of file
+    serialize_fields = {
+        'id': 'id',
+        'username': 'username',
+        'email': 'email',
+        'role': 'role',
+        'is_active': 'is_active',
+        'must_change_password': 'must_change_password',
+        'created_at': 'created_at',
+        'updated_at': 'updated_at'
+    }
\ No newline at end of file
@@ -1,11 +1,18 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required, current_user
 from app import db
 from app.models.attendance import Attendance
 from app.models.student import Student
 from app.models.class_model import Class
-from datetime import datetime, date, time
-from sqlalchemy import func
+from app.models.attendance_summary import AttendanceSummary, SUMMARY_STATUSES
+from datetime import datetime, date, time, timedelta
+from sqlalchemy import and_, case, func, or_
+from sqlalchemy.orm import contains_eager, joinedload
+from app.jobs import report_builder, submit_report
+from app.utils.export import InvalidExport, export_response
+from app.utils.pagination import InvalidCursor, paginate_query
+from app.utils.serialization import InvalidFields, requested_fields
+from app.utils.upsert import insert_for
 
 attendance_bp = Blueprint('attendance', __name__)
 
@@ -13,42 +20,63 @@ attendance_bp = Blueprint('attendance', __name__)
 @jwt_required()
 def get_attendance():
     try:
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 10, type=int)
-        student_id = request.args.get('student_id', type=int)
-        class_id = request.args.get('class_id', type=int)
-        date_str = request.args.get('date')
-        status = request.args.get('status')
+        fields = requested_fields(Attendance)
+        query = _filtered_attendance(fields)
         
-        query = Attendance.query.join(Student)
-        
-        if student_id:
-            query = query.filter(Attendance.student_id == student_id)
-        
-        if class_id:
-            query = query.filter(Student.class_id == class_id)
-        
-        if date_str:
-            attendance_date = datetime.strptime(date_str, '%Y-%m-%d').date()
-            query = query.filter(Attendance.date == attendance_date)
-        
-        if status:
-            query = query.filter(Attendance.status == status)
-        
-        attendance_records = query.paginate(
-            page=page, per_page=per_page, error_out=False
-        )
+        attendance_records = paginate_query(query, (Attendance.date, Attendance.id))
         
         return jsonify({
-            'attendance': [record.to_dict() for record in attendance_records.items],
-            'total': attendance_records.total,
-            'pages': attendance_records.pages,
-            'current_page': page
+            'attendance': [record.to_dict(fields) for record in attendance_records.items],
+            **attendance_records.meta()
         }), 200
     
+    except (InvalidCursor, InvalidFields) as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@attendance_bp.route('/export', methods=['GET'])
+@jwt_required()
+def export_attendance():
+    """Every record matching the list filters, streamed as CSV or NDJSON."""
+    try:
+        fields = requested_fields(Attendance)
+        query = _filtered_attendance(fields).order_by(Attendance.id)
+        return export_response(query, Attendance, fields, 'attendance')
+    
+    except (InvalidExport, InvalidFields) as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def _filtered_attendance(fields):
+    """The list query with its ?student_id=, ?class_id=, ?date= and ?status= filters."""
+    student_id = request.args.get('student_id', type=int)
+    class_id = request.args.get('class_id', type=int)
+    date_str = request.args.get('date')
+    status = request.args.get('status')
+    
+    # Attendance.to_dict touches student.full_name and marked_by_user.username
+    query = Attendance.query.join(Student).options(*Attendance.load_options(fields, eager=(
+        (contains_eager, Attendance.student),
+        (joinedload, Attendance.marked_by_user)
+    ), always=('date',)))
+    
+    if student_id:
+        query = query.filter(Attendance.student_id == student_id)
+    
+    if class_id:
+        query = query.filter(Student.class_id == class_id)
+    
+    if date_str:
+        attendance_date = datetime.strptime(date_str, '%Y-%m-%d').date()
+        query = query.filter(Attendance.date == attendance_date)
+    
+    if status:
+        query = query.filter(Attendance.status == status)
+    
+    return query
+
 @attendance_bp.route('/check-in', methods=['POST'])
 @jwt_required()
 def check_in():
@@ -60,7 +88,7 @@ def check_in():
         status = data.get('status', 'present')
         notes = data.get('notes', '')
         
-        user_id = get_jwt_identity()
+        user_id = current_user.id
         
         # Parse date and time
         attendance_date = datetime.strptime(attendance_date, '%Y-%m-%d').date()
@@ -74,6 +102,7 @@ def check_in():
         
         if existing_attendance:
             # Update existing record
+            previous_status = existing_attendance.status
             existing_attendance.status = status
             existing_attendance.check_in_time = check_in_time
             existing_attendance.notes = notes
@@ -81,6 +110,7 @@ def check_in():
             record = existing_attendance
         else:
             # Create new attendance record
+            previous_status = None
             record = Attendance(
                 student_id=student_id,
                 date=attendance_date,
@@ -91,6 +121,7 @@ def check_in():
             )
             db.session.add(record)
         
+        AttendanceSummary.apply_changes([(record.student_id, attendance_date, previous_status, status)])
         db.session.commit()
         
         return jsonify({
@@ -111,7 +142,7 @@ def check_out():
         attendance_date = data.get('date', date.today().isoformat())
         check_out_time = data.get('check_out_time', datetime.now().time().isoformat())
         
-        user_id = get_jwt_identity()
+        user_id = current_user.id
         
         # Parse date and time
         attendance_date = datetime.strptime(attendance_date, '%Y-%m-%d').date()
@@ -149,94 +180,110 @@ def bulk_mark_attendance():
         class_id = data.get('class_id')
         attendance_records = data.get('attendance', [])
         
-        user_id = get_jwt_identity()
+        user_id = current_user.id
         attendance_date = datetime.strptime(attendance_date, '%Y-%m-%d').date()
         
         if not class_id and not attendance_records:
             return jsonify({'error': 'Either class_id or attendance records are required'}), 400
         
-        processed_records = []
+        # Submitted records keyed by student; the last entry for a student wins
+        submitted = {record.get('student_id'): record for record in attendance_records}
         
+        # Roster and the day's existing statuses in one query
         if class_id:
-            # Mark attendance for entire class
-            students = Student.query.filter_by(class_id=class_id, is_active=True).all()
-            
-            for student in students:
-                # Find student's attendance record in the provided data
-                student_attendance = next(
-                    (record for record in attendance_records if record.get('student_id') == student.id),
-                    {'status': 'present'}
-                )
-                
-                existing_record = Attendance.query.filter_by(
-                    student_id=student.id,
-                    date=attendance_date
-                ).first()
-                
-                if existing_record:
-                    existing_record.status = student_attendance.get('status', 'present')
-                    existing_record.notes = student_attendance.get('notes', '')
-                    existing_record.marked_by = user_id
-                    record = existing_record
-                else:
-                    record = Attendance(
-                        student_id=student.id,
-                        date=attendance_date,
-                        status=student_attendance.get('status', 'present'),
-                        notes=student_attendance.get('notes', ''),
-                        marked_by=user_id
-                    )
-                    db.session.add(record)
-                
-                processed_records.append(record.to_dict())
-        
+            # Mark attendance for entire class; students without a record are present
+            previous_statuses = dict(db.session.query(Student.id, Attendance.status).outerjoin(
+                Attendance, and_(Attendance.student_id == Student.id, Attendance.date == attendance_date)
+            ).filter(Student.class_id == class_id, Student.is_active == True))
+            student_ids = list(previous_statuses)
         else:
-            # Mark attendance for individual records
-            for attendance_data in attendance_records:
-                student_id = attendance_data.get('student_id')
-                status = attendance_data.get('status', 'present')
-                notes = attendance_data.get('notes', '')
-                
-                existing_record = Attendance.query.filter_by(
-                    student_id=student_id,
-                    date=attendance_date
-                ).first()
-                
-                if existing_record:
-                    existing_record.status = status
-                    existing_record.notes = notes
-                    existing_record.marked_by = user_id
-                    record = existing_record
-                else:
-                    record = Attendance(
-                        student_id=student_id,
-                        date=attendance_date,
-                        status=status,
-                        notes=notes,
-                        marked_by=user_id
-                    )
-                    db.session.add(record)
-                
-                processed_records.append(record.to_dict())
+            student_ids = list(submitted)
+            previous_statuses = dict(db.session.query(Attendance.student_id, Attendance.status).filter(
+                Attendance.date == attendance_date,
+                Attendance.student_id.in_(student_ids)
+            ))
+        
+        rows = []
+        for student_id in student_ids:
+            record = submitted.get(student_id, {})
+            rows.append({
+                'student_id': student_id,
+                'date': attendance_date,
+                'status': record.get('status', 'present'),
+                'notes': record.get('notes', ''),
+                'marked_by': user_id
+            })
         
+        _upsert_attendance(rows)
+        AttendanceSummary.apply_changes([
+            (row['student_id'], attendance_date, previous_statuses.get(row['student_id']), row['status'])
+            for row in rows
+        ])
         db.session.commit()
         
+        processed_records = Attendance.query.join(Student).options(
+            contains_eager(Attendance.student),
+            joinedload(Attendance.marked_by_user)
+        ).filter(
+            Attendance.date == attendance_date,
+            Attendance.student_id.in_(student_ids)
+        ).populate_existing().all() if student_ids else []
+        
         return jsonify({
             'message': f'Attendance marked for {len(processed_records)} students',
-            'attendance': processed_records
+            'attendance': [record.to_dict() for record in processed_records]
         }), 201
     
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+def _upsert_attendance(rows):
+    """Insert or update one attendance row per (student_id, date) in a single batch."""
+    if not rows:
+        return
+    
+    insert = insert_for(db.session)
+    if insert is not None:
+        stmt = insert(Attendance)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Attendance.student_id, Attendance.date],
+            set_={
+                'status': stmt.excluded.status,
+                'notes': stmt.excluded.notes,
+                'marked_by': stmt.excluded.marked_by,
+                'updated_at': datetime.utcnow()
+            }
+        )
+        db.session.execute(stmt, rows)
+        return
+    
+    # No ON CONFLICT support: fetch the day's existing rows once and merge through the ORM
+    attendance_date = rows[0]['date']
+    existing = {
+        record.student_id: record
+        for record in Attendance.query.filter(
+            Attendance.date == attendance_date,
+            Attendance.student_id.in_([row['student_id'] for row in rows])
+        )
+    }
+    for row in rows:
+        record = existing.get(row['student_id'])
+        if record:
+            record.status = row['status']
+            record.notes = row['notes']
+            record.marked_by = row['marked_by']
+        else:
+            db.session.add(Attendance(**row))
+
 @attendance_bp.route('/<int:attendance_id>', methods=['PUT'])
 @jwt_required()
 def update_attendance(attendance_id):
     try:
         record = Attendance.query.get_or_404(attendance_id)
         data = request.get_json()
-        user_id = get_jwt_identity()
+        user_id = current_user.id
+        previous_status = record.status
         
         # Update fields
         if 'status' in data:
@@ -250,6 +297,7 @@ def update_attendance(attendance_id):
         
         record.marked_by = user_id
         
+        AttendanceSummary.apply_changes([(record.student_id, record.date, previous_status, record.status)])
         db.session.commit()
         
         return jsonify({
@@ -267,60 +315,113 @@ def attendance_report():
     try:
         start_date = request.args.get('start_date')
         end_date = request.args.get('end_date')
-        class_id = request.args.get('class_id', type=int)
-        student_id = request.args.get('student_id', type=int)
         
         if not start_date or not end_date:
             return jsonify({'error': 'Start date and end date are required'}), 400
         
-        start_date = datetime.strptime(start_date, '%Y-%m-%d').date()
-        end_date = datetime.strptime(end_date, '%Y-%m-%d').date()
+        params = {
+            'start_date': datetime.strptime(start_date, '%Y-%m-%d').date().isoformat(),
+            'end_date': datetime.strptime(end_date, '%Y-%m-%d').date().isoformat(),
+            'class_id': request.args.get('class_id', type=int),
+            'student_id': request.args.get('student_id', type=int)
+        }
         
-        query = db.session.query(
-            Student.id,
-            Student.first_name,
-            Student.last_name,
-            Student.student_id,
-            func.count(Attendance.id).label('total_days'),
-            func.sum(func.case([(Attendance.status == 'present', 1)], else_=0)).label('present_days'),
-            func.sum(func.case([(Attendance.status == 'absent', 1)], else_=0)).label('absent_days'),
-            func.sum(func.case([(Attendance.status == 'late', 1)], else_=0)).label('late_days')
-        ).join(
-            Attendance, Student.id == Attendance.student_id
-        ).filter(
-            Attendance.date.between(start_date, end_date)
-        )
-        
-        if class_id:
-            query = query.filter(Student.class_id == class_id)
-        
-        if student_id:
-            query = query.filter(Student.id == student_id)
-        
-        results = query.group_by(Student.id).all()
+        if request.args.get('async', 'false').lower() == 'true':
+            return submit_report('attendance', params)
         
-        report_data = []
+        return jsonify(build_attendance_report(**params)), 200
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@report_builder('attendance')
+def build_attendance_report(start_date, end_date, class_id=None, student_id=None, progress=None):
+    """Per-student attendance counts and percentage between two ISO dates."""
+    start_date = date.fromisoformat(start_date)
+    end_date = date.fromisoformat(end_date)
+    
+    # Whole months inside the range come from the monthly summaries; only
+    # the partial months at either end are aggregated from raw rows
+    first_full_month = start_date if start_date.day == 1 else _next_month(start_date)
+    last_full_month = end_date.replace(day=1)
+    if _next_month(end_date) - timedelta(days=1) != end_date:
+        last_full_month = _previous_month(last_full_month)
+    
+    counters = ['total_days'] + [f'{status}_days' for status in SUMMARY_STATUSES]
+    totals = {}
+    
+    def accumulate(results):
         for result in results:
-            attendance_percentage = (result.present_days / result.total_days * 100) if result.total_days > 0 else 0
-            
-            report_data.append({
+            entry = totals.setdefault(result.id, {
                 'student_id': result.id,
                 'student_name': f"{result.first_name} {result.last_name}",
                 'student_number': result.student_id,
-                'total_days': result.total_days,
-                'present_days': result.present_days,
-                'absent_days': result.absent_days,
-                'late_days': result.late_days,
-                'attendance_percentage': round(attendance_percentage, 2)
+                **dict.fromkeys(counters, 0)
             })
-        
-        return jsonify({
-            'report': report_data,
-            'period': {
-                'start_date': start_date.isoformat(),
-                'end_date': end_date.isoformat()
-            }
-        }), 200
+            for name in counters:
+                entry[name] += int(getattr(result, name) or 0)
     
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
\ No newline at end of file
+    student_columns = (Student.id, Student.first_name, Student.last_name, Student.student_id)
+    raw_ranges = [(start_date, end_date)]
+    
+    if first_full_month <= last_full_month:
+        summary_query = db.session.query(
+            *student_columns,
+            *[func.sum(getattr(AttendanceSummary, name)).label(name) for name in counters]
+        ).join(
+            AttendanceSummary, Student.id == AttendanceSummary.student_id
+        ).filter(
+            AttendanceSummary.month.between(first_full_month, last_full_month)
+        )
+        accumulate(_filter_report_query(summary_query, class_id, student_id).group_by(Student.id))
+        
+        raw_ranges = [
+            (start_date, first_full_month - timedelta(days=1)),
+            (_next_month(last_full_month), end_date)
+        ]
+        if progress:
+            progress(0.5)
+    
+    raw_ranges = [(low, high) for low, high in raw_ranges if low <= high]
+    if raw_ranges:
+        raw_query = db.session.query(
+            *student_columns,
+            func.count(Attendance.id).label('total_days'),
+            *[func.sum(case((Attendance.status == status, 1), else_=0)).label(f'{status}_days')
+              for status in SUMMARY_STATUSES]
+        ).join(
+            Attendance, Student.id == Attendance.student_id
+        ).filter(
+            or_(*[Attendance.date.between(low, high) for low, high in raw_ranges])
+        )
+        accumulate(_filter_report_query(raw_query, class_id, student_id).group_by(Student.id))
+    
+    report_data = []
+    for entry in totals.values():
+        if not entry['total_days']:
+            continue
+        entry['attendance_percentage'] = round(entry['present_days'] / entry['total_days'] * 100, 2)
+        report_data.append(entry)
+    
+    return {
+        'report': report_data,
+        'period': {
+            'start_date': start_date.isoformat(),
+            'end_date': end_date.isoformat()
+        }
+    }
+
+def _filter_report_query(query, class_id, student_id):
+    if class_id:
+        query = query.filter(Student.class_id == class_id)
+    
+    if student_id:
+        query = query.filter(Student.id == student_id)
+    
+    return query
+
+def _next_month(day):
+    return (day.replace(day=1) + timedelta(days=32)).replace(day=1)
+
+def _previous_month(day):
+    return (day.replace(day=1) - timedelta(days=1)).replace(day=1)
\ No newline at end of file
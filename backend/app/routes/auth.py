@@ -1,9 +1,10 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
+from flask_jwt_extended import create_access_token, jwt_required, current_user
 from app import db
 from app.models.user import User
 from app.models.student import Student
 from app.models.staff import Staff
+from app.utils.current_user import remember_user
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -20,19 +21,18 @@ def login():
         user = User.query.filter_by(username=username).first()
         
         if user and user.check_password(password) and user.is_active:
-            access_token = create_access_token(identity=user.id)
+            # JWT subjects must be strings; load_current_user turns it back into the id
+            access_token = create_access_token(identity=str(user.id))
             
-            # Get additional profile info based on role
-            profile = None
-            if user.role == 'student' and user.student:
-                profile = user.student.to_dict()
-            elif user.role in ['teacher', 'admin', 'staff'] and user.staff:
-                profile = user.staff.to_dict()
+            # Warm the current-user cache with the profile the client is about to ask for
+            record = remember_user(user)
             
             return jsonify({
                 'access_token': access_token,
-                'user': user.to_dict(),
-                'profile': profile
+                'user': record.user,
+                'profile': record.profile,
+                # Until then every other protected route answers 403
+                'must_change_password': user.must_change_password
             }), 200
         
         return jsonify({'error': 'Invalid credentials'}), 401
@@ -76,22 +76,14 @@ def register():
 @jwt_required()
 def get_profile():
     try:
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
-        
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
-        
-        profile = None
-        if user.role == 'student' and user.student:
-            profile = user.student.to_dict()
-        elif user.role in ['teacher', 'admin', 'staff'] and user.staff:
-            profile = user.staff.to_dict()
-        
-        return jsonify({
-            'user': user.to_dict(),
-            'profile': profile
-        }), 200
+        # Resolved (and cached) by the JWT user lookup; missing users never get here
+        response = jsonify({
+            'user': current_user.user,
+            'profile': current_user.profile
+        })
+        response.set_etag(current_user.etag)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response.make_conditional(request)
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -100,8 +92,7 @@ def get_profile():
 @jwt_required()
 def change_password():
     try:
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = db.session.get(User, current_user.id)
         
         if not user:
             return jsonify({'error': 'User not found'}), 404
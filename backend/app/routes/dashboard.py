@@ -0,0 +1,131 @@
+from flask import Blueprint, current_app, jsonify
+from flask_jwt_extended import jwt_required, current_user
+from app import db
+from app.models.student import Student
+from app.models.staff import Staff
+from app.models.attendance import Attendance
+from app.models.fee import Fee
+from app.models.grade_summary import GradeSummary
+from app.utils.cache import TTLCache, invalidate_on_commit
+from datetime import date, datetime
+from sqlalchemy import case, func, select
+
+dashboard_bp = Blueprint('dashboard', __name__)
+
+# Headline sections shown to each role
+ROLE_SECTIONS = {
+    'admin': ('students', 'staff', 'attendance_today', 'fees', 'grades'),
+    'staff': ('students', 'staff', 'attendance_today', 'fees'),
+    'teacher': ('students', 'attendance_today', 'grades'),
+}
+
+OUTSTANDING_STATUSES = ('pending', 'partial', 'overdue')
+
+_summary_cache = TTLCache(ttl=30, maxsize=16)
+invalidate_on_commit(_summary_cache, Student, Staff, Attendance, Fee, GradeSummary)
+
+@dashboard_bp.route('/summary', methods=['GET'])
+@jwt_required()
+def get_summary():
+    try:
+        user = current_user
+        
+        if user.role == 'student':
+            return jsonify(_student_summary(user)), 200
+        
+        sections = ROLE_SECTIONS.get(user.role, ())
+        # Today is part of the key so the cached attendance never spans midnight
+        key = (user.role, date.today())
+        summary = _summary_cache.get(key)
+        if summary is None:
+            summary = _build_summary(sections)
+            _summary_cache.set(key, summary, ttl=current_app.config['DASHBOARD_CACHE_TTL'])
+        
+        return jsonify({'role': user.role, **summary}), 200
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def _build_summary(sections):
+    summary = {'generated_at': datetime.utcnow().isoformat()}
+    today = date.today()
+    
+    # Counts that are single scalars share one statement
+    scalars = {}
+    if 'students' in sections:
+        scalars['students'] = select(func.count(Student.id)).where(Student.is_active == True).scalar_subquery()
+    if 'staff' in sections:
+        scalars['staff'] = select(func.count(Staff.id)).where(Staff.is_active == True).scalar_subquery()
+    if 'grades' in sections:
+        scalars['percentage_sum'] = select(func.sum(GradeSummary.percentage_sum)).scalar_subquery()
+        scalars['assessments'] = select(func.sum(GradeSummary.assessment_count)).scalar_subquery()
+    
+    if scalars:
+        row = db.session.query(*[value.label(name) for name, value in scalars.items()]).one()
+        if 'students' in sections:
+            summary['students'] = {'active': row.students}
+        if 'staff' in sections:
+            summary['staff'] = {'active': row.staff}
+        if 'grades' in sections:
+            average = float(row.percentage_sum) / row.assessments if row.assessments else 0
+            summary['grades'] = {'average_percentage': round(average, 2), 'assessments': row.assessments or 0}
+    
+    if 'attendance_today' in sections:
+        counts = dict(db.session.query(Attendance.status, func.count(Attendance.id)).filter(
+            Attendance.date == today
+        ).group_by(Attendance.status))
+        summary['attendance_today'] = {
+            'date': today.isoformat(),
+            'marked': sum(counts.values()),
+            'present': counts.get('present', 0),
+            'absent': counts.get('absent', 0),
+            'late': counts.get('late', 0),
+            'excused': counts.get('excused', 0)
+        }
+    
+    if 'fees' in sections:
+        outstanding = Fee.status.in_(OUTSTANDING_STATUSES)
+        overdue = outstanding & (Fee.due_date < today)
+        row = db.session.query(
+            func.sum(case((Fee.status == 'pending', 1), else_=0)).label('pending_count'),
+            func.sum(case((outstanding, 1), else_=0)).label('outstanding_count'),
+            func.sum(case((outstanding, Fee.balance_amount), else_=0)).label('outstanding_amount'),
+            func.sum(case((overdue, 1), else_=0)).label('overdue_count'),
+            func.sum(case((overdue, Fee.balance_amount), else_=0)).label('overdue_amount')
+        ).one()
+        summary['fees'] = {
+            'pending_count': row.pending_count or 0,
+            'outstanding_count': row.outstanding_count or 0,
+            'outstanding_amount': float(row.outstanding_amount or 0),
+            'overdue_count': row.overdue_count or 0,
+            'overdue_amount': float(row.overdue_amount or 0)
+        }
+    
+    return summary
+
+def _student_summary(user):
+    """A student's own headline numbers; cheap indexed reads, not cached."""
+    student = user.profile
+    if not student:
+        return {'role': user.role}
+    
+    fees = db.session.query(
+        func.count(Fee.id).label('count'),
+        func.sum(Fee.balance_amount).label('balance')
+    ).filter(Fee.student_id == student['id'], Fee.status.in_(OUTSTANDING_STATUSES)).one()
+    grades = db.session.query(
+        func.sum(GradeSummary.grade_points_sum).label('points'),
+        func.sum(GradeSummary.credit_sum).label('credits')
+    ).filter(GradeSummary.student_id == student['id']).one()
+    
+    return {
+        'role': user.role,
+        'generated_at': datetime.utcnow().isoformat(),
+        'fees': {
+            'outstanding_count': fees.count,
+            'outstanding_amount': float(fees.balance or 0)
+        },
+        'grades': {
+            'gpa': round(float(grades.points) / grades.credits, 2) if grades.credits else 0
+        }
+    }
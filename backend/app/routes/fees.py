@@ -1,11 +1,17 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required, current_user
 from app import db
 from app.models.fee import Fee
 from app.models.student import Student
 from datetime import datetime, date
 from decimal import Decimal
+from types import SimpleNamespace
 from sqlalchemy import func
+from sqlalchemy.orm import contains_eager, joinedload
+from app.jobs import report_builder, submit_report
+from app.utils.export import InvalidExport, export_response
+from app.utils.pagination import InvalidCursor, paginate_query
+from app.utils.serialization import InvalidFields, requested_fields
 
 fees_bp = Blueprint('fees', __name__)
 
@@ -13,49 +19,73 @@ fees_bp = Blueprint('fees', __name__)
 @jwt_required()
 def get_fees():
     try:
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 10, type=int)
-        student_id = request.args.get('student_id', type=int)
-        class_id = request.args.get('class_id', type=int)
-        fee_type = request.args.get('fee_type')
-        status = request.args.get('status')
-        semester = request.args.get('semester')
-        academic_year = request.args.get('academic_year')
-        
-        query = Fee.query.join(Student)
-        
-        if student_id:
-            query = query.filter(Fee.student_id == student_id)
-        
-        if class_id:
-            query = query.filter(Student.class_id == class_id)
-        
-        if fee_type:
-            query = query.filter(Fee.fee_type == fee_type)
-        
-        if status:
-            query = query.filter(Fee.status == status)
+        fields = requested_fields(Fee)
+        query = _filtered_fees(fields)
         
-        if semester:
-            query = query.filter(Fee.semester == semester)
-        
-        if academic_year:
-            query = query.filter(Fee.academic_year == academic_year)
-        
-        fees = query.order_by(Fee.due_date.desc()).paginate(
-            page=page, per_page=per_page, error_out=False
+        fees = paginate_query(
+            query.order_by(Fee.due_date.desc()),
+            (Fee.due_date, Fee.id)
         )
         
         return jsonify({
-            'fees': [fee.to_dict() for fee in fees.items],
-            'total': fees.total,
-            'pages': fees.pages,
-            'current_page': page
+            'fees': [fee.to_dict(fields) for fee in fees.items],
+            **fees.meta()
         }), 200
     
+    except (InvalidCursor, InvalidFields) as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@fees_bp.route('/export', methods=['GET'])
+@jwt_required()
+def export_fees():
+    """Every fee matching the list filters, streamed as CSV or NDJSON."""
+    try:
+        fields = requested_fields(Fee)
+        query = _filtered_fees(fields).order_by(Fee.id)
+        return export_response(query, Fee, fields, 'fees')
+    
+    except (InvalidExport, InvalidFields) as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def _filtered_fees(fields):
+    """The list query with its ?student_id=, ?class_id=, ?fee_type=, ?status= and term filters."""
+    student_id = request.args.get('student_id', type=int)
+    class_id = request.args.get('class_id', type=int)
+    fee_type = request.args.get('fee_type')
+    status = request.args.get('status')
+    semester = request.args.get('semester')
+    academic_year = request.args.get('academic_year')
+    
+    # Fee.to_dict touches student.full_name/student_id and collector.username
+    query = Fee.query.join(Student).options(*Fee.load_options(fields, eager=(
+        (contains_eager, Fee.student),
+        (joinedload, Fee.collector)
+    ), always=('due_date',)))
+    
+    if student_id:
+        query = query.filter(Fee.student_id == student_id)
+    
+    if class_id:
+        query = query.filter(Student.class_id == class_id)
+    
+    if fee_type:
+        query = query.filter(Fee.fee_type == fee_type)
+    
+    if status:
+        query = query.filter(Fee.status == status)
+    
+    if semester:
+        query = query.filter(Fee.semester == semester)
+    
+    if academic_year:
+        query = query.filter(Fee.academic_year == academic_year)
+    
+    return query
+
 @fees_bp.route('/<int:fee_id>', methods=['GET'])
 @jwt_required()
 def get_fee(fee_id):
@@ -71,7 +101,7 @@ def get_fee(fee_id):
 def create_fee():
     try:
         data = request.get_json()
-        user_id = get_jwt_identity()
+        user_id = current_user.id
         
         fee = Fee(
             student_id=data.get('student_id'),
@@ -84,6 +114,8 @@ def create_fee():
             discount=Decimal(str(data.get('discount', 0))),
             notes=data.get('notes', '')
         )
+        if fee.late_fee:
+            fee.late_fee_applied_at = datetime.utcnow()
         
         fee.update_status()
         
@@ -116,6 +148,7 @@ def update_fee(fee_id):
         
         if 'late_fee' in data:
             fee.late_fee = Decimal(str(data['late_fee']))
+            fee.late_fee_applied_at = datetime.utcnow()
         
         if 'discount' in data:
             fee.discount = Decimal(str(data['discount']))
@@ -150,7 +183,7 @@ def record_payment(fee_id):
     try:
         fee = Fee.query.get_or_404(fee_id)
         data = request.get_json()
-        user_id = get_jwt_identity()
+        user_id = current_user.id
         
         payment_amount = Decimal(str(data.get('payment_amount')))
         payment_method = data.get('payment_method')
@@ -190,7 +223,7 @@ def bulk_create_fees():
     try:
         data = request.get_json()
         fees_data = data.get('fees', [])
-        user_id = get_jwt_identity()
+        user_id = current_user.id
         
         created_fees = []
         errors = []
@@ -208,6 +241,8 @@ def bulk_create_fees():
                     discount=Decimal(str(fee_data.get('discount', 0))),
                     notes=fee_data.get('notes', '')
                 )
+                if fee.late_fee:
+                    fee.late_fee_applied_at = datetime.utcnow()
                 
                 fee.update_status()
                 
@@ -238,6 +273,7 @@ def student_fee_summary(student_id):
     try:
         semester = request.args.get('semester')
         academic_year = request.args.get('academic_year')
+        include_fees = request.args.get('include_fees', 'false').lower() == 'true'
         
         query = Fee.query.filter_by(student_id=student_id)
         
@@ -247,54 +283,60 @@ def student_fee_summary(student_id):
         if academic_year:
             query = query.filter(Fee.academic_year == academic_year)
         
-        fees = query.all()
-        
-        # Calculate summary statistics
-        total_amount = sum(fee.amount for fee in fees)
-        total_paid = sum(fee.paid_amount for fee in fees)
-        total_discount = sum(fee.discount for fee in fees)
-        total_late_fee = sum(fee.late_fee for fee in fees)
-        total_balance = sum(fee.balance_amount for fee in fees)
-        
-        # Group by status
+        breakdown = _fee_breakdown(query)
+        
+        # Roll the (fee_type, status) groups up into the summaries
+        summary = {
+            'total_fees': 0,
+            'total_amount': 0,
+            'total_paid': 0,
+            'total_discount': 0,
+            'total_late_fee': 0,
+            'total_balance': 0
+        }
         status_summary = {}
-        for fee in fees:
-            status = fee.status
-            if status not in status_summary:
-                status_summary[status] = {'count': 0, 'amount': 0}
-            status_summary[status]['count'] += 1
-            status_summary[status]['amount'] += float(fee.amount)
-        
-        # Group by fee type
         fee_type_summary = {}
-        for fee in fees:
-            fee_type = fee.fee_type
-            if fee_type not in fee_type_summary:
-                fee_type_summary[fee_type] = {'count': 0, 'amount': 0, 'paid': 0, 'balance': 0}
-            fee_type_summary[fee_type]['count'] += 1
-            fee_type_summary[fee_type]['amount'] += float(fee.amount)
-            fee_type_summary[fee_type]['paid'] += float(fee.paid_amount or 0)
-            fee_type_summary[fee_type]['balance'] += fee.balance_amount
-        
-        return jsonify({
+        for row in breakdown:
+            summary['total_fees'] += row.count
+            summary['total_amount'] += row.amount
+            summary['total_paid'] += row.paid
+            summary['total_discount'] += row.discount
+            summary['total_late_fee'] += row.late_fee
+            summary['total_balance'] += row.balance
+            
+            by_status = status_summary.setdefault(row.status, {'count': 0, 'amount': 0})
+            by_status['count'] += row.count
+            by_status['amount'] += row.amount
+            
+            by_type = fee_type_summary.setdefault(row.fee_type, {'count': 0, 'amount': 0, 'paid': 0, 'balance': 0})
+            by_type['count'] += row.count
+            by_type['amount'] += row.amount
+            by_type['paid'] += row.paid
+            by_type['balance'] += row.balance
+        
+        response = {
             'student_id': student_id,
-            'fees': [fee.to_dict() for fee in fees],
-            'summary': {
-                'total_fees': len(fees),
-                'total_amount': float(total_amount),
-                'total_paid': float(total_paid),
-                'total_discount': float(total_discount),
-                'total_late_fee': float(total_late_fee),
-                'total_balance': float(total_balance)
-            },
+            'summary': summary,
             'status_summary': status_summary,
             'fee_type_summary': fee_type_summary,
             'filters': {
                 'semester': semester,
                 'academic_year': academic_year
             }
-        }), 200
+        }
+        
+        if include_fees:
+            fees = paginate_query(
+                query.options(joinedload(Fee.student), joinedload(Fee.collector)).order_by(Fee.due_date.desc()),
+                (Fee.due_date, Fee.id)
+            )
+            response['fees'] = [fee.to_dict() for fee in fees.items]
+            response['pagination'] = fees.meta()
+        
+        return jsonify(response), 200
     
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -302,105 +344,164 @@ def student_fee_summary(student_id):
 @jwt_required()
 def fee_collection_report():
     try:
-        start_date = request.args.get('start_date')
-        end_date = request.args.get('end_date')
-        class_id = request.args.get('class_id', type=int)
-        fee_type = request.args.get('fee_type')
-        status = request.args.get('status')
-        
-        query = Fee.query.join(Student)
-        
-        if start_date and end_date:
-            start_date = datetime.strptime(start_date, '%Y-%m-%d').date()
-            end_date = datetime.strptime(end_date, '%Y-%m-%d').date()
-            query = query.filter(Fee.payment_date.between(start_date, end_date))
-        
-        if class_id:
-            query = query.filter(Student.class_id == class_id)
-        
-        if fee_type:
-            query = query.filter(Fee.fee_type == fee_type)
-        
-        if status:
-            query = query.filter(Fee.status == status)
-        
-        fees = query.all()
-        
-        # Calculate report statistics
-        total_fees = len(fees)
-        total_amount_due = sum(fee.amount for fee in fees)
-        total_collected = sum(fee.paid_amount or 0 for fee in fees)
-        total_outstanding = sum(fee.balance_amount for fee in fees)
-        
-        # Collection by fee type
-        fee_type_collection = {}
-        for fee in fees:
-            fee_type = fee.fee_type
-            if fee_type not in fee_type_collection:
-                fee_type_collection[fee_type] = {
-                    'count': 0,
-                    'amount_due': 0,
-                    'collected': 0,
-                    'outstanding': 0
-                }
-            fee_type_collection[fee_type]['count'] += 1
-            fee_type_collection[fee_type]['amount_due'] += float(fee.amount)
-            fee_type_collection[fee_type]['collected'] += float(fee.paid_amount or 0)
-            fee_type_collection[fee_type]['outstanding'] += fee.balance_amount
-        
-        # Collection by status
-        status_collection = {}
-        for fee in fees:
-            status = fee.status
-            if status not in status_collection:
-                status_collection[status] = {'count': 0, 'amount': 0}
-            status_collection[status]['count'] += 1
-            status_collection[status]['amount'] += float(fee.amount)
-        
-        return jsonify({
-            'report': [fee.to_dict() for fee in fees],
-            'summary': {
-                'total_fees': total_fees,
-                'total_amount_due': float(total_amount_due),
-                'total_collected': float(total_collected),
-                'total_outstanding': float(total_outstanding),
-                'collection_percentage': round((total_collected / total_amount_due * 100), 2) if total_amount_due > 0 else 0
-            },
-            'fee_type_collection': fee_type_collection,
-            'status_collection': status_collection,
-            'filters': {
-                'start_date': start_date.isoformat() if start_date else None,
-                'end_date': end_date.isoformat() if end_date else None,
-                'class_id': class_id,
-                'fee_type': fee_type,
-                'status': status
-            }
-        }), 200
+        params = _fee_report_params(request.args)
+        include_fees = request.args.get('include_fees', 'false').lower() == 'true'
+        
+        # Whole-year runs can go to the background; the per-fee rows stay synchronous
+        if request.args.get('async', 'false').lower() == 'true':
+            return submit_report('fees', params)
+        
+        response = build_fee_report(**params)
+        
+        # Per-fee detail is opt-in and paginated
+        if include_fees:
+            fees = paginate_query(
+                _fee_report_query(**params).options(
+                    contains_eager(Fee.student), joinedload(Fee.collector)
+                ).order_by(Fee.due_date.desc()),
+                (Fee.due_date, Fee.id)
+            )
+            response['report'] = [fee.to_dict() for fee in fees.items]
+            response['pagination'] = fees.meta()
+        
+        return jsonify(response), 200
     
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def _fee_report_params(args):
+    start_date = args.get('start_date')
+    end_date = args.get('end_date')
+    if start_date and end_date:
+        start_date = datetime.strptime(start_date, '%Y-%m-%d').date().isoformat()
+        end_date = datetime.strptime(end_date, '%Y-%m-%d').date().isoformat()
+    else:
+        start_date = end_date = None
+    
+    return {
+        'start_date': start_date,
+        'end_date': end_date,
+        'class_id': args.get('class_id', type=int),
+        'fee_type': args.get('fee_type'),
+        'status': args.get('status')
+    }
+
+def _fee_report_query(start_date=None, end_date=None, class_id=None, fee_type=None, status=None):
+    query = Fee.query.join(Student)
+    
+    if start_date and end_date:
+        query = query.filter(Fee.payment_date.between(date.fromisoformat(start_date), date.fromisoformat(end_date)))
+    
+    if class_id:
+        query = query.filter(Student.class_id == class_id)
+    
+    if fee_type:
+        query = query.filter(Fee.fee_type == fee_type)
+    
+    if status:
+        query = query.filter(Fee.status == status)
+    
+    return query
+
+@report_builder('fees')
+def build_fee_report(progress=None, **params):
+    """Fee collection totals, by fee type and by status, for the report filters."""
+    breakdown = _fee_breakdown(_fee_report_query(**params))
+    
+    total_fees = 0
+    total_amount_due = 0
+    total_collected = 0
+    total_outstanding = 0
+    fee_type_collection = {}
+    status_collection = {}
+    for row in breakdown:
+        total_fees += row.count
+        total_amount_due += row.amount
+        total_collected += row.paid
+        total_outstanding += row.balance
+        
+        by_type = fee_type_collection.setdefault(row.fee_type, {
+            'count': 0,
+            'amount_due': 0,
+            'collected': 0,
+            'outstanding': 0
+        })
+        by_type['count'] += row.count
+        by_type['amount_due'] += row.amount
+        by_type['collected'] += row.paid
+        by_type['outstanding'] += row.balance
+        
+        by_status = status_collection.setdefault(row.status, {'count': 0, 'amount': 0})
+        by_status['count'] += row.count
+        by_status['amount'] += row.amount
+    
+    return {
+        'summary': {
+            'total_fees': total_fees,
+            'total_amount_due': total_amount_due,
+            'total_collected': total_collected,
+            'total_outstanding': total_outstanding,
+            'collection_percentage': round((total_collected / total_amount_due * 100), 2) if total_amount_due > 0 else 0
+        },
+        'fee_type_collection': fee_type_collection,
+        'status_collection': status_collection,
+        'filters': params
+    }
+
+def _fee_breakdown(query):
+    """
+    Aggregate the fees matched by `query` per (fee_type, status) in a
+    single GROUP BY. Report totals are rolled up from these few rows
+    instead of loading every fee.
+    """
+    rows = query.with_entities(
+        Fee.fee_type,
+        Fee.status,
+        func.count(Fee.id).label('count'),
+        func.sum(Fee.amount).label('amount'),
+        func.sum(func.coalesce(Fee.paid_amount, 0)).label('paid'),
+        func.sum(func.coalesce(Fee.discount, 0)).label('discount'),
+        func.sum(func.coalesce(Fee.late_fee, 0)).label('late_fee'),
+        func.sum(Fee.balance_amount).label('balance')
+    ).order_by(None).group_by(Fee.fee_type, Fee.status).all()
+    
+    return [
+        SimpleNamespace(
+            fee_type=row.fee_type,
+            status=row.status,
+            count=row.count,
+            amount=float(row.amount or 0),
+            paid=float(row.paid or 0),
+            discount=float(row.discount or 0),
+            late_fee=float(row.late_fee or 0),
+            balance=float(row.balance or 0)
+        )
+        for row in rows
+    ]
+
 @fees_bp.route('/overdue', methods=['GET'])
 @jwt_required()
 def get_overdue_fees():
     try:
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 10, type=int)
-        
-        # Get fees where due date has passed and status is not paid
-        overdue_fees = Fee.query.filter(
+        # Fees past their due date that are not paid; the sweeper marks
+        # them 'overdue', but fees it has not reached yet still count
+        query = Fee.query.filter(
             Fee.due_date < date.today(),
-            Fee.status.in_(['pending', 'partial'])
-        ).join(Student).paginate(
-            page=page, per_page=per_page, error_out=False
+            Fee.status.in_(['pending', 'partial', 'overdue'])
+        ).join(Student).options(
+            contains_eager(Fee.student),
+            joinedload(Fee.collector)
         )
+        overdue_fees = paginate_query(query, (Fee.due_date, Fee.id), descending=False)
         
         return jsonify({
             'overdue_fees': [fee.to_dict() for fee in overdue_fees.items],
-            'total': overdue_fees.total,
-            'pages': overdue_fees.pages,
-            'current_page': page
+            **overdue_fees.meta()
         }), 200
     
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
\ No newline at end of file
@@ -1,58 +1,96 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required, current_user
 from app import db
-from app.models.grade import Grade
+from app.models.grade import Grade, grade_letter_for
 from app.models.student import Student
 from app.models.subject import Subject
-from datetime import datetime
+from app.models.grade_summary import GradeSummary
+from datetime import date, datetime
 from decimal import Decimal
-from sqlalchemy import func
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import contains_eager, joinedload
+from app.utils.cache import VersionedCache, invalidate_on_commit
+from app.jobs import report_builder, submit_report
+from app.utils.export import InvalidExport, export_response
+from app.utils.pagination import InvalidCursor, paginate_query
+from app.utils.reference_data import reference_response
+from app.utils.serialization import InvalidFields, requested_fields
 
 grades_bp = Blueprint('grades', __name__)
 
+BULK_GRADE_REQUIRED = ('student_id', 'subject_id', 'assessment_type', 'assessment_name', 'marks_obtained', 'total_marks')
+
+_subjects_cache = VersionedCache()
+invalidate_on_commit(_subjects_cache, Subject)
+
 @grades_bp.route('/', methods=['GET'])
 @jwt_required()
 def get_grades():
     try:
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 10, type=int)
-        student_id = request.args.get('student_id', type=int)
-        subject_id = request.args.get('subject_id', type=int)
-        assessment_type = request.args.get('assessment_type')
-        semester = request.args.get('semester')
-        academic_year = request.args.get('academic_year')
-        
-        query = Grade.query.join(Student).join(Subject)
+        fields = requested_fields(Grade)
+        query = _filtered_grades(fields)
         
-        if student_id:
-            query = query.filter(Grade.student_id == student_id)
-        
-        if subject_id:
-            query = query.filter(Grade.subject_id == subject_id)
-        
-        if assessment_type:
-            query = query.filter(Grade.assessment_type == assessment_type)
-        
-        if semester:
-            query = query.filter(Grade.semester == semester)
-        
-        if academic_year:
-            query = query.filter(Grade.academic_year == academic_year)
-        
-        grades = query.order_by(Grade.date_assessed.desc()).paginate(
-            page=page, per_page=per_page, error_out=False
+        grades = paginate_query(
+            query.order_by(Grade.date_assessed.desc()),
+            (func.coalesce(Grade.date_assessed, date.min), Grade.id)
         )
         
         return jsonify({
-            'grades': [grade.to_dict() for grade in grades.items],
-            'total': grades.total,
-            'pages': grades.pages,
-            'current_page': page
+            'grades': [grade.to_dict(fields) for grade in grades.items],
+            **grades.meta()
         }), 200
     
+    except (InvalidCursor, InvalidFields) as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@grades_bp.route('/export', methods=['GET'])
+@jwt_required()
+def export_grades():
+    """Every grade matching the list filters, streamed as CSV or NDJSON."""
+    try:
+        fields = requested_fields(Grade)
+        query = _filtered_grades(fields).order_by(Grade.id)
+        return export_response(query, Grade, fields, 'grades')
+    
+    except (InvalidExport, InvalidFields) as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def _filtered_grades(fields):
+    """The list query with its ?student_id=, ?subject_id=, ?assessment_type= and term filters."""
+    student_id = request.args.get('student_id', type=int)
+    subject_id = request.args.get('subject_id', type=int)
+    assessment_type = request.args.get('assessment_type')
+    semester = request.args.get('semester')
+    academic_year = request.args.get('academic_year')
+    
+    # Grade.to_dict touches student.full_name, subject.name/code and teacher.username
+    query = Grade.query.join(Student).join(Subject).options(*Grade.load_options(fields, eager=(
+        (contains_eager, Grade.student),
+        (contains_eager, Grade.subject),
+        (joinedload, Grade.teacher)
+    ), always=('date_assessed',)))
+    
+    if student_id:
+        query = query.filter(Grade.student_id == student_id)
+    
+    if subject_id:
+        query = query.filter(Grade.subject_id == subject_id)
+    
+    if assessment_type:
+        query = query.filter(Grade.assessment_type == assessment_type)
+    
+    if semester:
+        query = query.filter(Grade.semester == semester)
+    
+    if academic_year:
+        query = query.filter(Grade.academic_year == academic_year)
+    
+    return query
+
 @grades_bp.route('/<int:grade_id>', methods=['GET'])
 @jwt_required()
 def get_grade(grade_id):
@@ -68,7 +106,7 @@ def get_grade(grade_id):
 def create_grade():
     try:
         data = request.get_json()
-        user_id = get_jwt_identity()
+        user_id = current_user.id
         
         grade = Grade(
             student_id=data.get('student_id'),
@@ -91,6 +129,7 @@ def create_grade():
         grade.calculate_grade_letter()
         
         db.session.add(grade)
+        GradeSummary.apply_changes(added=[GradeSummary.snapshot(grade)])
         db.session.commit()
         
         return jsonify({'message': 'Grade created successfully', 'grade': grade.to_dict()}), 201
@@ -105,7 +144,8 @@ def update_grade(grade_id):
     try:
         grade = Grade.query.get_or_404(grade_id)
         data = request.get_json()
-        user_id = get_jwt_identity()
+        user_id = current_user.id
+        previous = GradeSummary.snapshot(grade)
         
         # Update fields
         for field in ['assessment_type', 'assessment_name', 'semester', 'academic_year', 'comments']:
@@ -127,6 +167,7 @@ def update_grade(grade_id):
         grade.calculate_percentage()
         grade.calculate_grade_letter()
         
+        GradeSummary.apply_changes(added=[GradeSummary.snapshot(grade)], removed=[previous])
         db.session.commit()
         
         return jsonify({'message': 'Grade updated successfully', 'grade': grade.to_dict()}), 200
@@ -140,6 +181,7 @@ def update_grade(grade_id):
 def delete_grade(grade_id):
     try:
         grade = Grade.query.get_or_404(grade_id)
+        GradeSummary.apply_changes(removed=[GradeSummary.snapshot(grade)])
         db.session.delete(grade)
         db.session.commit()
         
@@ -153,8 +195,9 @@ def delete_grade(grade_id):
 @jwt_required()
 def get_subjects():
     try:
-        subjects = Subject.query.filter_by(is_active=True).all()
-        return jsonify([subject.to_dict() for subject in subjects]), 200
+        return reference_response(_subjects_cache, 'subjects', lambda: [
+            subject.to_dict() for subject in Subject.query.filter_by(is_active=True).all()
+        ])
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -184,56 +227,123 @@ def create_subject():
 @grades_bp.route('/bulk-create', methods=['POST'])
 @jwt_required()
 def bulk_create_grades():
+    """
+    Create many grades at once, all or nothing. Rows are parsed and their
+    students and subjects checked in two IN queries, then inserted with a
+    single executemany; the response lists compact per-row results.
+    """
     try:
         data = request.get_json()
         grades_data = data.get('grades', [])
-        user_id = get_jwt_identity()
+        user_id = current_user.id
         
-        created_grades = []
+        rows = []
         errors = []
-        
         for idx, grade_data in enumerate(grades_data):
             try:
-                grade = Grade(
-                    student_id=grade_data.get('student_id'),
-                    subject_id=grade_data.get('subject_id'),
-                    assessment_type=grade_data.get('assessment_type'),
-                    assessment_name=grade_data.get('assessment_name'),
-                    marks_obtained=Decimal(str(grade_data.get('marks_obtained'))),
-                    total_marks=Decimal(str(grade_data.get('total_marks'))),
-                    semester=grade_data.get('semester'),
-                    academic_year=grade_data.get('academic_year'),
-                    teacher_id=user_id,
-                    comments=grade_data.get('comments', '')
-                )
-                
-                if 'date_assessed' in grade_data:
-                    grade.date_assessed = datetime.strptime(grade_data['date_assessed'], '%Y-%m-%d').date()
-                
-                grade.calculate_percentage()
-                grade.calculate_grade_letter()
-                
-                db.session.add(grade)
-                created_grades.append(grade.to_dict())
-                
+                rows.append((idx + 1, _bulk_grade_row(grade_data, user_id)))
             except Exception as e:
                 errors.append({'row': idx + 1, 'error': str(e)})
         
-        if not errors:
-            db.session.commit()
-        else:
-            db.session.rollback()
+        # Every referenced student and subject, checked in two queries
+        student_ids = {row['student_id'] for _, row in rows}
+        subject_ids = {row['subject_id'] for _, row in rows}
+        known_students = set(db.session.execute(
+            select(Student.id).where(Student.id.in_(student_ids))
+        ).scalars()) if student_ids else set()
+        credits = dict(db.session.execute(
+            select(Subject.id, Subject.credits).where(Subject.id.in_(subject_ids))
+        ).all()) if subject_ids else {}
+        
+        for number, row in rows:
+            if row['student_id'] not in known_students:
+                errors.append({'row': number, 'error': f"Student {row['student_id']} does not exist"})
+            elif row['subject_id'] not in credits:
+                errors.append({'row': number, 'error': f"Subject {row['subject_id']} does not exist"})
+        
+        if errors:
+            errors.sort(key=lambda error: error['row'])
+            return jsonify({
+                'message': 'No grades were created',
+                'created_grades': [],
+                'errors': errors
+            }), 400
+        
+        values = [row for _, row in rows]
+        ids = _insert_grades(values)
+        GradeSummary.apply_changes(added=[{
+            'student_id': row['student_id'],
+            'subject_id': row['subject_id'],
+            'semester': row['semester'] or '',
+            'academic_year': row['academic_year'] or '',
+            'percentage': float(row['percentage']),
+            'grade_letter': row['grade_letter']
+        } for row in values], credits=credits)
+        db.session.commit()
         
         return jsonify({
-            'message': f'Created {len(created_grades)} grades successfully',
-            'created_grades': created_grades,
-            'errors': errors
-        }), 201 if not errors else 400
+            'message': f'Created {len(values)} grades successfully',
+            'created_grades': [{
+                'row': number,
+                'id': grade_id,
+                'student_id': row['student_id'],
+                'subject_id': row['subject_id'],
+                'percentage': round(float(row['percentage']), 2),
+                'grade_letter': row['grade_letter']
+            } for (number, row), grade_id in zip(rows, ids)],
+            'errors': []
+        }), 201
     
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+def _bulk_grade_row(grade_data, teacher_id):
+    """Insert values for one submitted grade; raises ValueError describing a bad row."""
+    missing = [name for name in BULK_GRADE_REQUIRED if grade_data.get(name) in (None, '')]
+    if missing:
+        raise ValueError(f"Missing {', '.join(missing)}")
+    
+    marks_obtained = Decimal(str(grade_data['marks_obtained']))
+    total_marks = Decimal(str(grade_data['total_marks']))
+    if total_marks <= 0:
+        raise ValueError('total_marks must be greater than 0')
+    percentage = marks_obtained / total_marks * 100
+    
+    row = {
+        'student_id': int(grade_data['student_id']),
+        'subject_id': int(grade_data['subject_id']),
+        'assessment_type': grade_data['assessment_type'],
+        'assessment_name': grade_data['assessment_name'],
+        'marks_obtained': marks_obtained,
+        'total_marks': total_marks,
+        'percentage': percentage,
+        'grade_letter': grade_letter_for(percentage),
+        'semester': grade_data.get('semester'),
+        'academic_year': grade_data.get('academic_year'),
+        'teacher_id': teacher_id,
+        'comments': grade_data.get('comments', '')
+    }
+    if grade_data.get('date_assessed'):
+        row['date_assessed'] = datetime.strptime(grade_data['date_assessed'], '%Y-%m-%d').date()
+    return row
+
+def _insert_grades(rows):
+    """Insert `rows`, batched where the database can say which id went to which row; returns their new ids in order."""
+    if not rows:
+        return []
+    
+    # An executemany needs the same keys in every row, so fill in the column's default date here
+    today = datetime.utcnow().date()
+    for row in rows:
+        row.setdefault('date_assessed', today)
+    
+    if db.session.get_bind().dialect.insert_executemany_returning_sort_by_parameter_order:
+        stmt = insert(Grade).returning(Grade.id, sort_by_parameter_order=True)
+        return db.session.scalars(stmt, rows).all()
+    # One plain insert per row elsewhere: MySQL has no RETURNING, but the driver reports each new id
+    return [db.session.execute(insert(Grade.__table__), row).inserted_primary_key[0] for row in rows]
+
 @grades_bp.route('/student/<int:student_id>/report', methods=['GET'])
 @jwt_required()
 def student_grade_report(student_id):
@@ -241,48 +351,47 @@ def student_grade_report(student_id):
         semester = request.args.get('semester')
         academic_year = request.args.get('academic_year')
         
-        query = Grade.query.filter_by(student_id=student_id).join(Subject)
+        query = Grade.query.filter_by(student_id=student_id).join(Subject).options(
+            contains_eager(Grade.subject),
+            joinedload(Grade.student),
+            joinedload(Grade.teacher)
+        )
+        summaries = GradeSummary.query.filter_by(student_id=student_id).options(
+            joinedload(GradeSummary.subject)
+        )
         
         if semester:
             query = query.filter(Grade.semester == semester)
+            summaries = summaries.filter(GradeSummary.semester == semester)
         
         if academic_year:
             query = query.filter(Grade.academic_year == academic_year)
+            summaries = summaries.filter(GradeSummary.academic_year == academic_year)
         
-        grades = query.all()
-        
-        # Calculate overall statistics
-        if grades:
-            total_percentage = sum(float(grade.percentage) for grade in grades if grade.percentage)
-            average_percentage = total_percentage / len(grades)
-            
-            # Calculate GPA (assuming 4.0 scale)
-            grade_points = {
-                'A+': 4.0, 'A': 4.0, 'B+': 3.5, 'B': 3.0,
-                'C+': 2.5, 'C': 2.0, 'D': 1.0, 'F': 0.0
-            }
-            
-            total_credits = sum(grade.subject.credits for grade in grades)
-            weighted_points = sum(grade_points.get(grade.grade_letter, 0) * grade.subject.credits for grade in grades)
-            gpa = weighted_points / total_credits if total_credits > 0 else 0
-        else:
-            average_percentage = 0
-            gpa = 0
+        grades = [grade.to_dict() for grade in query.all()]
+        summaries = summaries.all()
+        
+        # Overall statistics come from the materialized per-subject aggregates
+        total_assessments = sum(summary.assessment_count for summary in summaries)
+        percentage_sum = sum(float(summary.percentage_sum) for summary in summaries)
+        total_credits = sum(summary.credit_sum for summary in summaries)
+        weighted_points = sum(float(summary.grade_points_sum) for summary in summaries)
+        
+        average_percentage = percentage_sum / total_assessments if total_assessments > 0 else 0
+        gpa = weighted_points / total_credits if total_credits > 0 else 0
         
         # Group grades by subject
         subject_grades = {}
         for grade in grades:
-            subject_name = grade.subject.name
-            if subject_name not in subject_grades:
-                subject_grades[subject_name] = []
-            subject_grades[subject_name].append(grade.to_dict())
+            subject_grades.setdefault(grade['subject_name'], []).append(grade)
         
         return jsonify({
             'student_id': student_id,
-            'grades': [grade.to_dict() for grade in grades],
+            'grades': grades,
             'subject_grades': subject_grades,
+            'subject_summaries': [summary.to_dict() for summary in summaries],
             'statistics': {
-                'total_assessments': len(grades),
+                'total_assessments': total_assessments,
                 'average_percentage': round(average_percentage, 2),
                 'gpa': round(gpa, 2)
             },
@@ -299,53 +408,70 @@ def student_grade_report(student_id):
 @jwt_required()
 def class_grade_report(class_id):
     try:
-        semester = request.args.get('semester')
-        academic_year = request.args.get('academic_year')
-        subject_id = request.args.get('subject_id', type=int)
-        
-        query = db.session.query(
-            Student.id,
-            Student.first_name,
-            Student.last_name,
-            Student.student_id,
-            func.avg(Grade.percentage).label('average_percentage'),
-            func.count(Grade.id).label('total_assessments')
-        ).join(
-            Grade, Student.id == Grade.student_id
-        ).filter(
-            Student.class_id == class_id
-        )
-        
-        if semester:
-            query = query.filter(Grade.semester == semester)
-        
-        if academic_year:
-            query = query.filter(Grade.academic_year == academic_year)
-        
-        if subject_id:
-            query = query.filter(Grade.subject_id == subject_id)
-        
-        results = query.group_by(Student.id).all()
+        params = {
+            'class_id': class_id,
+            'semester': request.args.get('semester'),
+            'academic_year': request.args.get('academic_year'),
+            'subject_id': request.args.get('subject_id', type=int)
+        }
         
-        report_data = []
-        for result in results:
-            report_data.append({
-                'student_id': result.id,
-                'student_name': f"{result.first_name} {result.last_name}",
-                'student_number': result.student_id,
-                'average_percentage': round(float(result.average_percentage), 2) if result.average_percentage else 0,
-                'total_assessments': result.total_assessments
-            })
+        if request.args.get('async', 'false').lower() == 'true':
+            return submit_report('class-grades', params)
         
-        return jsonify({
-            'class_id': class_id,
-            'report': report_data,
-            'filters': {
-                'semester': semester,
-                'academic_year': academic_year,
-                'subject_id': subject_id
-            }
-        }), 200
+        return jsonify(build_class_grade_report(**params)), 200
     
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
\ No newline at end of file
+        return jsonify({'error': str(e)}), 500
+
+@report_builder('class-grades')
+def build_class_grade_report(class_id, semester=None, academic_year=None, subject_id=None, progress=None):
+    """Per-student average and GPA for a class."""
+    # One indexed read over the materialized aggregates
+    query = db.session.query(
+        Student.id,
+        Student.first_name,
+        Student.last_name,
+        Student.student_id,
+        func.sum(GradeSummary.percentage_sum).label('percentage_sum'),
+        func.sum(GradeSummary.assessment_count).label('total_assessments'),
+        func.sum(GradeSummary.grade_points_sum).label('grade_points_sum'),
+        func.sum(GradeSummary.credit_sum).label('credit_sum')
+    ).join(
+        GradeSummary, Student.id == GradeSummary.student_id
+    ).filter(
+        Student.class_id == class_id
+    )
+    
+    if semester:
+        query = query.filter(GradeSummary.semester == semester)
+    
+    if academic_year:
+        query = query.filter(GradeSummary.academic_year == academic_year)
+    
+    if subject_id:
+        query = query.filter(GradeSummary.subject_id == subject_id)
+    
+    results = query.group_by(Student.id).all()
+    
+    report_data = []
+    for result in results:
+        average_percentage = float(result.percentage_sum) / result.total_assessments if result.total_assessments else 0
+        gpa = float(result.grade_points_sum) / result.credit_sum if result.credit_sum else 0
+        report_data.append({
+            'student_id': result.id,
+            'student_name': f"{result.first_name} {result.last_name}",
+            'student_number': result.student_id,
+            'average_percentage': round(average_percentage, 2),
+            'total_assessments': result.total_assessments,
+            'gpa': round(gpa, 2)
+        })
+    
+    return {
+        'class_id': class_id,
+        'report': report_data,
+        'filters': {
+            'semester': semester,
+            'academic_year': academic_year,
+            'subject_id': subject_id
+        }
+    }
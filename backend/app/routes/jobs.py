@@ -0,0 +1,36 @@
+from flask import Blueprint, current_app, jsonify
+from flask_jwt_extended import jwt_required
+from app import db
+from app.models.report_job import ReportJob
+import json
+
+jobs_bp = Blueprint('jobs', __name__)
+
+@jobs_bp.route('/<job_id>', methods=['GET'])
+@jwt_required()
+def get_job(job_id):
+    try:
+        job = db.session.get(ReportJob, job_id)
+        
+        # A job whose worker died would otherwise look queued or running forever
+        config = current_app.config
+        if job and job.is_stale(config['REPORT_JOB_TIMEOUT']):
+            ReportJob.fail_stale(config['REPORT_JOB_TIMEOUT'], config['REPORT_JOB_RESULT_TTL'], ReportJob.id == job_id)
+            db.session.commit()
+            db.session.refresh(job)
+        
+        if not job or job.is_expired:
+            return jsonify({'error': 'Job not found or expired'}), 404
+        
+        response = {'job': job.to_dict()}
+        if job.status == 'done':
+            response['result'] = json.loads(job.result)
+        
+        response = jsonify(response)
+        if job.status in ('queued', 'running'):
+            # Hint for pollers
+            response.headers['Retry-After'] = '1'
+        return response, 200
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
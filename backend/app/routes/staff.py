@@ -1,13 +1,25 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required
 from app import db
 from app.models.user import User
 from app.models.staff import Staff
 from datetime import datetime
 from decimal import Decimal
+from sqlalchemy.orm import joinedload
+from app.utils.cache import VersionedCache, invalidate_on_commit
+from app.utils.reference_data import reference_response
+from app.utils.search import TYPEAHEAD_MAX_LIMIT, apply_search
+from app.utils.serialization import InvalidFields, requested_fields
 
 staff_bp = Blueprint('staff', __name__)
 
+# LIKE filters used for ?search= where the FTS index is unavailable
+SEARCH_FALLBACK_COLUMNS = (Staff.first_name, Staff.last_name, Staff.staff_id)
+
+# Positions, departments and teachers; teachers carry the user's email
+_staff_cache = VersionedCache()
+invalidate_on_commit(_staff_cache, Staff, User)
+
 @staff_bp.route('/', methods=['GET'])
 @jwt_required()
 def get_staff():
@@ -18,14 +30,15 @@ def get_staff():
         position = request.args.get('position', '')
         department = request.args.get('department', '')
         
-        query = Staff.query
+        fields = requested_fields(Staff)
+        
+        # Staff.to_dict touches user.email
+        query = Staff.query.options(*Staff.load_options(fields, eager=(
+            (joinedload, Staff.user),
+        )))
         
         if search:
-            query = query.filter(
-                (Staff.first_name.contains(search)) |
-                (Staff.last_name.contains(search)) |
-                (Staff.staff_id.contains(search))
-            )
+            query = apply_search(query, Staff, search, SEARCH_FALLBACK_COLUMNS)
         
         if position:
             query = query.filter_by(position=position)
@@ -38,12 +51,39 @@ def get_staff():
         )
         
         return jsonify({
-            'staff': [staff.to_dict() for staff in staff_members.items],
+            'staff': [staff.to_dict(fields) for staff in staff_members.items],
             'total': staff_members.total,
             'pages': staff_members.pages,
             'current_page': page
         }), 200
     
+    except InvalidFields as e:
+        return jsonify({'error': str(e)}), 400
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@staff_bp.route('/search', methods=['GET'])
+@jwt_required()
+def search_staff():
+    """Typeahead: the best matches for ?q=, with just enough fields to label them."""
+    try:
+        term = request.args.get('q', '').strip()
+        limit = min(request.args.get('limit', 10, type=int), TYPEAHEAD_MAX_LIMIT)
+        
+        if not term:
+            return jsonify([]), 200
+        
+        query = db.session.query(Staff.id, Staff.staff_id, Staff.first_name, Staff.last_name, Staff.position)
+        rows = apply_search(query, Staff, term, SEARCH_FALLBACK_COLUMNS, limit=limit).all()
+        
+        return jsonify([{
+            'id': row.id,
+            'staff_id': row.staff_id,
+            'full_name': f'{row.first_name} {row.last_name}',
+            'position': row.position
+        } for row in rows]), 200
+    
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -69,7 +109,10 @@ def create_staff():
             email=data.get('email'),
             role=data.get('role', 'staff')
         )
-        user.set_password(data.get('password', 'staff123'))
+        if data.get('password'):
+            user.set_password(data['password'])
+        else:
+            user.set_default_password('staff123')
         
         db.session.add(user)
         db.session.flush()
@@ -162,8 +205,9 @@ def delete_staff(staff_id):
 @jwt_required()
 def get_positions():
     try:
-        positions = db.session.query(Staff.position).distinct().all()
-        return jsonify([pos[0] for pos in positions if pos[0]]), 200
+        return reference_response(_staff_cache, 'positions', lambda: [
+            pos[0] for pos in db.session.query(Staff.position).distinct().all() if pos[0]
+        ])
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -172,8 +216,9 @@ def get_positions():
 @jwt_required()
 def get_departments():
     try:
-        departments = db.session.query(Staff.department).distinct().all()
-        return jsonify([dept[0] for dept in departments if dept[0]]), 200
+        return reference_response(_staff_cache, 'departments', lambda: [
+            dept[0] for dept in db.session.query(Staff.department).distinct().all() if dept[0]
+        ])
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -182,8 +227,13 @@ def get_departments():
 @jwt_required()
 def get_teachers():
     try:
-        teachers = Staff.query.filter(Staff.position.like('%teacher%')).filter_by(is_active=True).all()
-        return jsonify([teacher.to_dict() for teacher in teachers]), 200
+        return reference_response(_staff_cache, 'teachers', _build_teachers)
     
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
\ No newline at end of file
+        return jsonify({'error': str(e)}), 500
+
+def _build_teachers():
+    teachers = Staff.query.options(joinedload(Staff.user)).filter(
+        Staff.position.like('%teacher%')
+    ).filter_by(is_active=True).all()
+    return [teacher.to_dict() for teacher in teachers]
\ No newline at end of file
@@ -1,45 +1,111 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import Blueprint, current_app, request, jsonify
+from flask_jwt_extended import jwt_required
 from app import db
 from app.models.user import User
 from app.models.student import Student
 from app.models.class_model import Class
 from datetime import datetime
+from sqlalchemy import func, insert
+from sqlalchemy.orm import joinedload
+from app.utils.cache import VersionedCache, invalidate_on_commit
+from app.utils.export import InvalidExport, export_response
+from app.utils.passwords import default_password_hash, hash_passwords
+from app.utils.reference_data import reference_response
+from app.utils.search import TYPEAHEAD_MAX_LIMIT, apply_search
+from app.utils.serialization import InvalidFields, requested_fields
+import csv
+import io
+import json
 
 students_bp = Blueprint('students', __name__)
 
+# LIKE filters used for ?search= where the FTS index is unavailable
+SEARCH_FALLBACK_COLUMNS = (Student.first_name, Student.last_name, Student.student_id)
+
+_classes_cache = VersionedCache()
+invalidate_on_commit(_classes_cache, Class, Student)
+
 @students_bp.route('/', methods=['GET'])
 @jwt_required()
 def get_students():
     try:
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 10, type=int)
-        search = request.args.get('search', '')
-        class_id = request.args.get('class_id', type=int)
-        
-        query = Student.query
-        
-        if search:
-            query = query.filter(
-                (Student.first_name.contains(search)) |
-                (Student.last_name.contains(search)) |
-                (Student.student_id.contains(search))
-            )
         
-        if class_id:
-            query = query.filter_by(class_id=class_id)
+        fields = requested_fields(Student)
+        query = _filtered_students(fields)
         
         students = query.paginate(
             page=page, per_page=per_page, error_out=False
         )
         
         return jsonify({
-            'students': [student.to_dict() for student in students.items],
+            'students': [student.to_dict(fields) for student in students.items],
             'total': students.total,
             'pages': students.pages,
             'current_page': page
         }), 200
     
+    except InvalidFields as e:
+        return jsonify({'error': str(e)}), 400
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@students_bp.route('/export', methods=['GET'])
+@jwt_required()
+def export_students():
+    """Every student matching the list filters, streamed as CSV or NDJSON."""
+    try:
+        fields = requested_fields(Student)
+        query = _filtered_students(fields).order_by(Student.id)
+        return export_response(query, Student, fields, 'students')
+    
+    except (InvalidExport, InvalidFields) as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def _filtered_students(fields):
+    """The list query with its ?search= and ?class_id= filters."""
+    search = request.args.get('search', '')
+    class_id = request.args.get('class_id', type=int)
+    
+    # Student.to_dict touches user.email and class_enrolled.name
+    query = Student.query.options(*Student.load_options(fields, eager=(
+        (joinedload, Student.user),
+        (joinedload, Student.class_enrolled)
+    )))
+    
+    if search:
+        query = apply_search(query, Student, search, SEARCH_FALLBACK_COLUMNS)
+    
+    if class_id:
+        query = query.filter_by(class_id=class_id)
+    
+    return query
+
+@students_bp.route('/search', methods=['GET'])
+@jwt_required()
+def search_students():
+    """Typeahead: the best matches for ?q=, with just enough fields to label them."""
+    try:
+        term = request.args.get('q', '').strip()
+        limit = min(request.args.get('limit', 10, type=int), TYPEAHEAD_MAX_LIMIT)
+        
+        if not term:
+            return jsonify([]), 200
+        
+        query = db.session.query(Student.id, Student.student_id, Student.first_name, Student.last_name, Student.class_id)
+        rows = apply_search(query, Student, term, SEARCH_FALLBACK_COLUMNS, limit=limit).all()
+        
+        return jsonify([{
+            'id': row.id,
+            'student_id': row.student_id,
+            'full_name': f'{row.first_name} {row.last_name}',
+            'class_id': row.class_id
+        } for row in rows]), 200
+    
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -65,7 +131,10 @@ def create_student():
             email=data.get('email'),
             role='student'
         )
-        user.set_password(data.get('password', 'student123'))
+        if data.get('password'):
+            user.set_password(data['password'])
+        else:
+            user.set_default_password('student123')
         
         db.session.add(user)
         db.session.flush()  # Get user ID
@@ -144,12 +213,18 @@ def delete_student(student_id):
 @jwt_required()
 def get_classes():
     try:
-        classes = Class.query.filter_by(is_active=True).all()
-        return jsonify([cls.to_dict() for cls in classes]), 200
+        return reference_response(_classes_cache, 'classes', _build_classes)
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def _build_classes():
+    # Student counts come from the same grouped query as the classes
+    classes = db.session.query(Class, func.count(Student.id)).outerjoin(
+        Student, Student.class_id == Class.id
+    ).filter(Class.is_active == True).group_by(Class.id).order_by(Class.id).all()
+    return [cls.to_dict(student_count=count) for cls, count in classes]
+
 @students_bp.route('/bulk-import', methods=['POST'])
 @jwt_required()
 def bulk_import_students():
@@ -160,6 +235,13 @@ def bulk_import_students():
         created_students = []
         errors = []
         
+        # Hash the explicit passwords up front, in parallel
+        password_rows = [idx for idx, student_data in enumerate(students_data) if student_data.get('password')]
+        password_hashes = dict(zip(
+            password_rows,
+            hash_passwords(students_data[idx]['password'] for idx in password_rows)
+        ))
+        
         for idx, student_data in enumerate(students_data):
             try:
                 # Create user account
@@ -168,7 +250,10 @@ def bulk_import_students():
                     email=student_data.get('email'),
                     role='student'
                 )
-                user.set_password(student_data.get('password', 'student123'))
+                if idx in password_hashes:
+                    user.password_hash = password_hashes[idx]
+                else:
+                    user.set_default_password('student123')
                 
                 db.session.add(user)
                 db.session.flush()
@@ -208,4 +293,180 @@ def bulk_import_students():
     
     except Exception as e:
         db.session.rollback()
-        return jsonify({'error': str(e)}), 500
\ No newline at end of file
+        return jsonify({'error': str(e)}), 500
+
+IMPORT_REQUIRED_FIELDS = ['username', 'email', 'student_id', 'first_name', 'last_name', 'date_of_birth', 'gender']
+IMPORT_OPTIONAL_FIELDS = ['phone', 'address', 'parent_name', 'parent_phone', 'parent_email']
+
+@students_bp.route('/import', methods=['POST'])
+@jwt_required()
+def import_students():
+    """
+    Streaming student import.
+    
+    The body is CSV (text/csv, header row required) or NDJSON
+    (application/x-ndjson, one object per line). Rows are parsed
+    incrementally and imported in chunks, each validated with a few set
+    queries and committed on its own, so memory stays flat however large
+    the file is and a bad row only rejects itself. Errors are reported by
+    line number in the file, including lines that cannot be parsed.
+    """
+    chunk_size = max(1, request.args.get(
+        'chunk_size', current_app.config['STUDENT_IMPORT_CHUNK_SIZE'], type=int
+    ))
+    imported = 0
+    errors = []
+    try:
+        chunk = []
+        for line_number, row, error in _read_import_rows(request.stream, request.mimetype):
+            if error:
+                errors.append({'row': line_number, 'errors': [error]})
+                continue
+            chunk.append((line_number, row))
+            if len(chunk) >= chunk_size:
+                imported += _import_chunk(chunk, errors)
+                chunk = []
+        if chunk:
+            imported += _import_chunk(chunk, errors)
+        
+        return jsonify({
+            'message': f'Imported {imported} students successfully',
+            **_import_report(imported, errors)
+        }), 201 if imported else 400
+    
+    except ValueError as e:
+        # The body stopped decoding; earlier chunks are already committed
+        db.session.rollback()
+        return jsonify({'error': f'Malformed import file: {e}', **_import_report(imported, errors)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e), **_import_report(imported, errors)}), 500
+
+def _import_report(imported, errors):
+    return {
+        'imported': imported,
+        'failed': len(errors),
+        'errors': sorted(errors, key=lambda error: error['row'])
+    }
+
+def _read_import_rows(stream, mimetype):
+    """Yield (line_number, row, error) per record; unparseable records carry an error instead of a row."""
+    text = io.TextIOWrapper(io.BufferedReader(stream), encoding='utf-8-sig', newline='')
+    if mimetype in ('text/csv', 'application/csv'):
+        reader = csv.DictReader(text)
+        while True:
+            try:
+                row = next(reader)
+            except StopIteration:
+                return
+            except csv.Error as e:
+                # DictReader only copies line_num forward after a successful read
+                yield reader.reader.line_num, None, f'Malformed CSV: {e}'
+                continue
+            yield reader.line_num, row, None
+    else:
+        for line_number, line in enumerate(text, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                yield line_number, None, f'Malformed JSON: {e}'
+                continue
+            if isinstance(row, dict):
+                yield line_number, row, None
+            else:
+                yield line_number, None, 'Expected a JSON object'
+
+def _import_chunk(chunk, errors):
+    """Validate and insert one chunk of (line_number, row) pairs; returns the number imported."""
+    candidates = []
+    for row_number, row in chunk:
+        row = {key: (value.strip() if isinstance(value, str) else value) or None for key, value in row.items()}
+        missing = [field for field in IMPORT_REQUIRED_FIELDS if not row.get(field)]
+        if missing:
+            errors.append({'row': row_number, 'errors': [f'Missing {", ".join(missing)}']})
+            continue
+        try:
+            row['date_of_birth'] = datetime.strptime(row['date_of_birth'], '%Y-%m-%d').date()
+            row['class_id'] = int(row['class_id']) if row.get('class_id') else None
+        except (TypeError, ValueError) as e:
+            errors.append({'row': row_number, 'errors': [str(e)]})
+            continue
+        candidates.append((row_number, row))
+    
+    if not candidates:
+        return 0
+    
+    # One set query per unique key, covering the whole chunk
+    usernames = {row['username'] for _, row in candidates}
+    emails = {row['email'] for _, row in candidates}
+    student_ids = {row['student_id'] for _, row in candidates}
+    class_ids = {row['class_id'] for _, row in candidates if row['class_id']}
+    
+    taken_usernames = {value for (value,) in db.session.query(User.username).filter(User.username.in_(usernames))}
+    taken_emails = {value for (value,) in db.session.query(User.email).filter(User.email.in_(emails))}
+    taken_student_ids = {value for (value,) in db.session.query(Student.student_id).filter(Student.student_id.in_(student_ids))}
+    known_class_ids = {value for (value,) in db.session.query(Class.id).filter(Class.id.in_(class_ids))} if class_ids else set()
+    
+    valid = []
+    for row_number, row in candidates:
+        row_errors = []
+        if row['username'] in taken_usernames:
+            row_errors.append(f'Username {row["username"]} already exists')
+        if row['email'] in taken_emails:
+            row_errors.append(f'Email {row["email"]} already exists')
+        if row['student_id'] in taken_student_ids:
+            row_errors.append(f'Student ID {row["student_id"]} already exists')
+        if row['class_id'] and row['class_id'] not in known_class_ids:
+            row_errors.append(f'Class {row["class_id"]} does not exist')
+        
+        if row_errors:
+            errors.append({'row': row_number, 'errors': row_errors})
+            continue
+        
+        # Later duplicates inside the same file are rejected like existing ones
+        taken_usernames.add(row['username'])
+        taken_emails.add(row['email'])
+        taken_student_ids.add(row['student_id'])
+        valid.append((row_number, row))
+    
+    if not valid:
+        return 0
+    
+    password_rows = [row for _, row in valid if row.get('password')]
+    for row, password_hash in zip(password_rows, hash_passwords(row['password'] for row in password_rows)):
+        row['password_hash'] = password_hash
+    default_hash = default_password_hash('student123')
+    
+    try:
+        user_ids = dict(db.session.execute(
+            insert(User).returning(User.username, User.id),
+            [{
+                'username': row['username'],
+                'email': row['email'],
+                'password_hash': row.get('password_hash', default_hash),
+                'must_change_password': 'password_hash' not in row,
+                'role': 'student'
+            } for _, row in valid]
+        ).all())
+        
+        # render_nulls keeps rows with and without optional values in one executemany
+        db.session.execute(insert(Student).execution_options(render_nulls=True), [{
+            'user_id': user_ids[row['username']],
+            'student_id': row['student_id'],
+            'first_name': row['first_name'],
+            'last_name': row['last_name'],
+            'date_of_birth': row['date_of_birth'],
+            'gender': row['gender'],
+            'class_id': row['class_id'],
+            **{field: row.get(field) for field in IMPORT_OPTIONAL_FIELDS}
+        } for _, row in valid])
+        
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        errors.extend({'row': row_number, 'errors': [f'Chunk rejected: {e}']} for row_number, _ in valid)
+        return 0
+    
+    return len(valid)
@@ -0,0 +1,103 @@
+"""
+Periodic background jobs run inside the web processes.
+
+Each process starts a daemon thread on its first request (so it also works
+behind pre-forking servers), and every run takes a JobLock lease first, so
+however many workers there are a job runs about once per interval.
+"""
+
+import logging
+import os
+import socket
+import threading
+
+from app import db
+
+logger = logging.getLogger(__name__)
+
+
+def sweep_overdue_fees(app, today=None):
+    """Run Fee.sweep_overdue with the configured late-fee policy and commit."""
+    from app.models.fee import Fee
+
+    config = app.config
+    result = Fee.sweep_overdue(
+        today=today,
+        late_fee_policy=config['LATE_FEE_POLICY'],
+        late_fee_amount=config['LATE_FEE_AMOUNT'],
+        late_fee_percent=config['LATE_FEE_PERCENT'],
+        grace_days=config['LATE_FEE_GRACE_DAYS']
+    )
+    db.session.commit()
+    return result
+
+
+def purge_report_jobs(app):
+    """Delete report jobs whose results have expired."""
+    from app.models.report_job import ReportJob
+
+    return {'purged': ReportJob.purge_expired()}
+
+
+# name -> (config key holding the interval in seconds, job function)
+JOBS = {
+    'sweep-overdue-fees': ('OVERDUE_SWEEP_INTERVAL', sweep_overdue_fees),
+    'purge-report-jobs': ('REPORT_JOB_PURGE_INTERVAL', purge_report_jobs),
+}
+
+
+def run_locked(app, name, lease_seconds, owner=None):
+    """
+    Run job `name` if its lease can be taken. Returns the job's result, or
+    None when another process holds the lease.
+    """
+    from app.models.job_lock import JobLock
+
+    owner = owner or f'{socket.gethostname()}:{os.getpid()}'
+    if not JobLock.acquire(name, owner, lease_seconds):
+        return None
+    return JOBS[name][1](app)
+
+
+class Scheduler:
+    def __init__(self, app=None):
+        self._started_pid = None
+        self._start_lock = threading.Lock()
+        self._stop = threading.Event()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.jobs = {name: app.config[key] for name, (key, _) in JOBS.items() if app.config[key] > 0}
+        app.extensions['scheduler'] = self
+        if self.jobs:
+            app.before_request(self._ensure_started)
+
+    def _ensure_started(self):
+        # Threads do not survive fork(), so track the process that started them
+        if self._started_pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._started_pid == os.getpid():
+                return
+            self._started_pid = os.getpid()
+            for name, interval in self.jobs.items():
+                thread = threading.Thread(target=self._loop, args=(name, interval), name=f'job-{name}', daemon=True)
+                thread.start()
+
+    def _loop(self, name, interval):
+        owner = f'{socket.gethostname()}:{os.getpid()}'
+        while not self._stop.wait(interval):
+            with self.app.app_context():
+                try:
+                    # The lease lasts one interval: other workers skip until it lapses
+                    result = run_locked(self.app, name, interval, owner)
+                    if result is not None:
+                        logger.info('Job %s ran: %s', name, result)
+                except Exception:
+                    db.session.rollback()
+                    logger.exception('Job %s failed', name)
+
+    def stop(self):
+        self._stop.set()
@@ -0,0 +1,150 @@
+"""
+Small in-process caches shared by the API, and write-driven invalidation.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries expire after a time-to-live.
+
+    Entries are evicted least-recently-used first once `maxsize` is
+    reached. The cache is per process; with several workers each one
+    keeps its own copy, so the TTL bounds how stale a value can get.
+    """
+
+    def __init__(self, ttl=60, maxsize=1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._store(key, value, ttl)
+
+    def get_or_set(self, key, factory, ttl=None):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = factory()
+            self.set(key, value, ttl)
+        return value
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def _store(self, key, value, ttl):
+        # Caller holds self._lock
+        self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+
+class VersionedCache(TTLCache):
+    """
+    TTLCache whose version moves forward on every clear().
+
+    get_or_set() only stores a freshly built value if no clear() happened
+    while it was being built, so a reader racing a committing writer
+    cannot put pre-commit data back. The version is per process, so it is
+    no good as an ETag.
+    """
+
+    def __init__(self, ttl=3600, maxsize=64):
+        super().__init__(ttl=ttl, maxsize=maxsize)
+        self.version = 1
+
+    def get_or_set(self, key, factory, ttl=None):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            version = self.version
+            value = factory()
+            self.set_if_version(key, value, version, ttl)
+        return value
+
+    def set_if_version(self, key, value, version, ttl=None):
+        """Store `value` unless clear() ran since `version` was read."""
+        with self._lock:
+            if version == self.version:
+                self._store(key, value, ttl)
+
+    def clear(self):
+        with self._lock:
+            self.version += 1
+            self._data.clear()
+
+
+# Caches cleared when a commit writes one of their models: [(cache, (Model, ...))]
+_invalidations = []
+
+
+def invalidate_on_commit(cache, *models):
+    """
+    Clear `cache` whenever a committed transaction inserted, updated or
+    deleted rows of any of `models`, through the ORM unit of work or an
+    ORM-enabled insert()/update()/delete() statement.
+    """
+    _invalidations.append((cache, models))
+
+
+def _changed_models(session):
+    return session.info.setdefault('changed_models', set())
+
+
+@event.listens_for(Session, 'after_flush')
+def _record_flushed_models(session, flush_context):
+    changed = _changed_models(session)
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        changed.add(type(instance))
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _record_executed_models(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None:
+            _changed_models(orm_execute_state.session).add(mapper.class_)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_caches(session):
+    changed = session.info.pop('changed_models', None)
+    if not changed:
+        return
+    for cache, models in _invalidations:
+        if any(issubclass(changed_model, model) for changed_model in changed for model in models):
+            cache.clear()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_changes(session):
+    session.info.pop('changed_models', None)
@@ -0,0 +1,98 @@
+"""
+Current-user resolution for JWT-protected requests.
+
+`load_current_user` is the JWT user lookup, so every `@jwt_required()`
+request resolves its token's identity to a `CurrentUser`: the user's id,
+role and serialized user and profile (student or staff record). Routes read
+it through flask_jwt_extended's `current_user`.
+
+Records are kept in a per-process LRU/TTL cache keyed on the user id, so a
+warm request authenticates with a single primary-key read of the account's
+state. Commits that write users, students, staff or classes clear the
+cache; other worker processes pick up profile changes within
+CURRENT_USER_CACHE_TTL seconds. Account state is never served from the
+cache: missing and deactivated users resolve to None, which the JWT
+extension turns into a 401, on every worker at once. Accounts still on a
+default password may only reach PASSWORD_CHANGE_ENDPOINTS; anything else
+raises PasswordChangeRequired, a 403.
+"""
+
+import hashlib
+import json
+from collections import namedtuple
+
+from flask import current_app, request
+from sqlalchemy.orm import joinedload
+
+from app import db
+from app.models.class_model import Class
+from app.models.staff import Staff
+from app.models.student import Student
+from app.models.user import User
+from app.utils.cache import VersionedCache, invalidate_on_commit
+
+# `user` and `profile` are the serialized dicts /auth/profile returns; `etag` fingerprints them
+CurrentUser = namedtuple('CurrentUser', 'id role user profile etag')
+
+# What an account flagged must_change_password may still do
+PASSWORD_CHANGE_ENDPOINTS = {'auth.change_password', 'auth.get_profile'}
+
+_current_users = VersionedCache(ttl=60, maxsize=4096)
+invalidate_on_commit(_current_users, User, Student, Staff, Class)
+
+
+class PasswordChangeRequired(Exception):
+    pass
+
+
+def build_current_user(user):
+    """CurrentUser for a loaded User (its profile relationships are read)."""
+    profile = None
+    if user.role == 'student' and user.student:
+        profile = user.student.to_dict()
+    elif user.role in ['teacher', 'admin', 'staff'] and user.staff:
+        profile = user.staff.to_dict()
+
+    user_data = user.to_dict()
+    fingerprint = json.dumps([user_data, profile], sort_keys=True, default=str)
+    etag = hashlib.sha1(fingerprint.encode()).hexdigest()
+    return CurrentUser(user.id, user.role, user_data, profile, etag)
+
+
+def remember_user(user):
+    """Build `user`'s CurrentUser and cache it (e.g. right after login)."""
+    record = build_current_user(user)
+    _current_users.set(record.id, record, ttl=current_app.config['CURRENT_USER_CACHE_TTL'])
+    return record
+
+
+def load_current_user(jwt_header, jwt_data):
+    try:
+        user_id = int(jwt_data[current_app.config['JWT_IDENTITY_CLAIM']])
+    except (TypeError, ValueError):
+        return None
+
+    record = _current_users.get(user_id)
+    if record is not None:
+        state = db.session.query(
+            User.is_active, User.role, User.must_change_password
+        ).filter(User.id == user_id).first()
+        if state is None or not state.is_active:
+            return None
+        if state.role != record.role or state.must_change_password != record.user['must_change_password']:
+            record = None
+    if record is None:
+        version = _current_users.version
+        # One statement for the user, its profile and everything the profile serializes
+        user = db.session.get(User, user_id, options=[
+            joinedload(User.student).joinedload(Student.class_enrolled),
+            joinedload(User.staff)
+        ])
+        if user is None or not user.is_active:
+            return None
+        record = build_current_user(user)
+        # A commit that cleared the cache meanwhile may have changed this user
+        _current_users.set_if_version(user_id, record, version, ttl=current_app.config['CURRENT_USER_CACHE_TTL'])
+    if record.user['must_change_password'] and request.endpoint not in PASSWORD_CHANGE_ENDPOINTS:
+        raise PasswordChangeRequired()
+    return record
@@ -0,0 +1,160 @@
+"""
+Prometheus metrics for requests, SQL, serialization and the connection pool.
+
+Per route template (not raw path, so cardinality stays bounded) it records
+request latency and status counts, the number of SQL statements and the
+time spent in them, and the time spent encoding the response. Pool gauges
+track checked-out and open connections. Everything is served in the
+Prometheus text format at METRICS_PATH.
+
+prometheus_client is optional and imported on first use. With several
+worker processes, set PROMETHEUS_MULTIPROC_DIR (`python -m app serve` does)
+and the endpoint aggregates every worker's samples.
+"""
+
+import os
+import time
+
+from flask import Response, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_instruments = None
+
+
+def _get_instruments():
+    """Create the metric objects once per process; None without prometheus_client."""
+    global _instruments
+    if _instruments is None:
+        try:
+            from prometheus_client import Counter, Gauge, Histogram
+        except ImportError:
+            _instruments = False
+            return None
+
+        labels = ['method', 'endpoint']
+        _instruments = {
+            'latency': Histogram(
+                'edumanage_http_request_duration_seconds', 'Request latency', labels,
+                buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+            ),
+            'requests': Counter('edumanage_http_requests_total', 'Requests by status', labels + ['status']),
+            'sql_per_request': Histogram(
+                'edumanage_sql_statements_per_request', 'SQL statements per request', labels,
+                buckets=(1, 2, 3, 5, 8, 13, 21, 34, 55, 100, 250)
+            ),
+            'sql_statements': Counter('edumanage_sql_statements_total', 'SQL statements executed', labels),
+            'sql_seconds': Counter('edumanage_sql_duration_seconds_total', 'Time spent in SQL', labels),
+            'serialization': Histogram(
+                'edumanage_serialization_duration_seconds', 'Time spent encoding responses', labels,
+                buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25)
+            ),
+            'pool_checked_out': Gauge(
+                'edumanage_db_pool_checked_out', 'Connections in use', multiprocess_mode='livesum'
+            ),
+            'pool_open': Gauge(
+                'edumanage_db_pool_open', 'Connections open', multiprocess_mode='livesum'
+            ),
+        }
+    return _instruments or None
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and '_metrics_sql' in g:
+        conn.info.setdefault('metrics_started', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get('metrics_started')
+    if started and has_request_context() and '_metrics_sql' in g:
+        g._metrics_sql[0] += 1
+        g._metrics_sql[1] += time.perf_counter() - started.pop()
+
+
+def _instrument_pool(engine, instruments):
+    checked_out, open_connections = instruments['pool_checked_out'], instruments['pool_open']
+    event.listen(engine, 'checkout', lambda *args: checked_out.inc())
+    event.listen(engine, 'checkin', lambda *args: checked_out.dec())
+    event.listen(engine, 'connect', lambda *args: open_connections.inc())
+    event.listen(engine, 'close', lambda *args: open_connections.dec())
+
+
+class Metrics:
+    """
+    Flask extension exporting Prometheus metrics.
+
+    Configuration:
+        METRICS_ENABLED   record and expose metrics (needs prometheus_client)
+        METRICS_PATH      URL of the text exposition endpoint
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app, engines=()):
+        app.config.setdefault('METRICS_ENABLED', True)
+        app.config.setdefault('METRICS_PATH', '/api/metrics')
+
+        instruments = _get_instruments() if app.config['METRICS_ENABLED'] else None
+        if instruments is None:
+            return
+        self.instruments = instruments
+
+        if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+            event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        for engine in engines:
+            _instrument_pool(engine, instruments)
+
+        # Time response encoding by wrapping the JSON provider jsonify() goes through
+        encode = app.json.response
+
+        def timed_response(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return encode(*args, **kwargs)
+            finally:
+                if has_request_context():
+                    g._metrics_serialize = g.get('_metrics_serialize', 0) + time.perf_counter() - started
+
+        app.json.response = timed_response
+
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        app.add_url_rule(app.config['METRICS_PATH'], 'metrics', self.export)
+
+    def _start_request(self):
+        g._metrics_started = time.perf_counter()
+        g._metrics_sql = [0, 0.0]
+
+    def _finish_request(self, response):
+        started = g.pop('_metrics_started', None)
+        if started is None or request.endpoint == 'metrics':
+            return response
+
+        instruments = self.instruments
+        endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+        labels = (request.method, endpoint)
+        statements, sql_seconds = g.pop('_metrics_sql', (0, 0.0))
+
+        instruments['latency'].labels(*labels).observe(time.perf_counter() - started)
+        instruments['requests'].labels(*labels, str(response.status_code)).inc()
+        instruments['sql_per_request'].labels(*labels).observe(statements)
+        instruments['sql_statements'].labels(*labels).inc(statements)
+        instruments['sql_seconds'].labels(*labels).inc(sql_seconds)
+        if '_metrics_serialize' in g:
+            instruments['serialization'].labels(*labels).observe(g.pop('_metrics_serialize'))
+        return response
+
+    def export(self):
+        from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, generate_latest
+
+        if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+            from prometheus_client import multiprocess
+
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+        else:
+            registry = REGISTRY
+        return Response(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
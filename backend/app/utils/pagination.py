@@ -0,0 +1,154 @@
+"""
+Offset and keyset (cursor) pagination for list endpoints.
+
+Offset mode is the classic `?page=&per_page=` behaviour. Passing
+`?cursor=` (empty for the first page) switches to keyset mode: rows are
+ordered by an indexed key such as `(Fee.due_date, Fee.id)` and each page
+seeks past the last key of the previous one, so page 500 costs the same
+as page 1. `next_cursor` in the response is the value to send back.
+
+`?total=` controls the row count: `exact` runs COUNT(*) on every call,
+`cached` serves a count cached for PAGINATION_COUNT_CACHE_TTL seconds and
+`none` skips it. Offset mode defaults to `exact`, cursor mode to `none`.
+
+Cursor pages hold at most MAX_PER_PAGE rows; offset pages are not capped.
+Both report the `per_page` actually used.
+"""
+
+import base64
+import json
+from datetime import date, datetime
+from math import ceil
+
+from flask import current_app, request
+from sqlalchemy import and_, or_
+
+from app.utils.cache import TTLCache
+
+MAX_PER_PAGE = 100
+TOTAL_MODES = ('exact', 'cached', 'none')
+
+_count_cache = TTLCache(ttl=60, maxsize=512)
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(values):
+    payload = [value.isoformat() if isinstance(value, (date, datetime)) else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, columns):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(payload, list) or len(payload) != len(columns):
+            raise ValueError
+        values = []
+        for column, value in zip(columns, payload):
+            python_type = column.type.python_type
+            if value is not None and python_type in (date, datetime):
+                value = python_type.fromisoformat(value)
+            values.append(value)
+        return values
+    except (ValueError, TypeError):
+        raise InvalidCursor('Invalid pagination cursor')
+
+
+def _seek_condition(columns, values, descending):
+    """(a, b) < (x, y) expanded to a < x OR (a = x AND b < y)."""
+    clauses = []
+    for idx, (column, value) in enumerate(zip(columns, values)):
+        equal = [prev == prev_value for prev, prev_value in zip(columns[:idx], values[:idx])]
+        compare = column < value if descending else column > value
+        clauses.append(and_(*equal, compare))
+    return or_(*clauses)
+
+
+def count_query(query, mode):
+    if mode == 'none':
+        return None
+    count = query.order_by(None)
+    if mode == 'exact':
+        return count.count()
+    
+    compiled = count.statement.compile()
+    key = (str(compiled), repr(sorted(compiled.params.items())))
+    ttl = current_app.config.get('PAGINATION_COUNT_CACHE_TTL', 60)
+    return _count_cache.get_or_set(key, count.count, ttl=ttl)
+
+
+class Page:
+    def __init__(self, items, per_page, total=None, page=None, next_cursor=None):
+        self.items = items
+        self.per_page = per_page
+        self.total = total
+        self.page = page
+        self.next_cursor = next_cursor
+
+    @property
+    def pages(self):
+        if not self.total:
+            return 0
+        return ceil(self.total / self.per_page)
+
+    def meta(self):
+        """Pagination fields merged into the list response."""
+        if self.page is not None:
+            return {
+                'total': self.total,
+                'pages': self.pages,
+                'current_page': self.page,
+                'per_page': self.per_page
+            }
+        return {
+            'total': self.total,
+            'next_cursor': self.next_cursor,
+            'per_page': self.per_page
+        }
+
+
+def paginate_query(query, key_columns, descending=True):
+    """
+    Paginate `query` from the request arguments.
+
+    `key_columns` is the unique, indexed sort key used in cursor mode,
+    e.g. `(Attendance.date, Attendance.id)`. Its parts must be non-null:
+    wrap a nullable column in coalesce(), since NULLs never match the seek.
+    """
+    per_page = request.args.get('per_page', 10, type=int)
+    cursor_mode = 'cursor' in request.args
+    total_mode = request.args.get('total', 'none' if cursor_mode else 'exact')
+    if total_mode not in TOTAL_MODES:
+        total_mode = 'exact'
+    
+    if not cursor_mode:
+        page = request.args.get('page', 1, type=int)
+        pagination = query.paginate(
+            page=page, per_page=per_page,
+            error_out=False, count=total_mode == 'exact'
+        )
+        total = pagination.total
+        if total_mode == 'cached':
+            total = count_query(query, total_mode)
+        return Page(pagination.items, pagination.per_page, total=total, page=page)
+    
+    per_page = max(1, min(per_page, MAX_PER_PAGE))
+    total = count_query(query, total_mode)
+    
+    cursor = request.args.get('cursor')
+    if cursor:
+        query = query.filter(_seek_condition(key_columns, decode_cursor(cursor, key_columns), descending))
+    
+    order = [column.desc() if descending else column.asc() for column in key_columns]
+    # The key is selected alongside each row so expression keys encode too
+    rows = query.order_by(None).order_by(*order).add_columns(*key_columns).limit(per_page + 1).all()
+    
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        next_cursor = encode_cursor(rows[-1][1:])
+    
+    return Page([row[0] for row in rows], per_page, total=total, next_cursor=next_cursor)
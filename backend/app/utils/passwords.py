@@ -0,0 +1,57 @@
+"""
+Password hashing for bulk account creation.
+
+PBKDF2 is deliberately slow, so hashing a whole term's intake row by row
+keeps one worker busy for minutes. `hash_passwords` spreads larger batches
+over a small process pool; accounts created with a shared default password
+reuse one precomputed hash and are flagged to change it at next login.
+
+Each web worker keeps one long-lived pool, created on first use with the
+'spawn' start method (forking a threaded server process is unsafe) and shut
+down at exit. Concurrent imports in that worker share it, so the host runs
+at most PASSWORD_HASH_WORKERS hashing processes per web worker.
+"""
+
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from flask import current_app
+from werkzeug.security import generate_password_hash
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+@lru_cache(maxsize=16)
+def default_password_hash(password):
+    """Hash shared by every account created with the same default password."""
+    return generate_password_hash(password)
+
+
+def _hash_pool(workers):
+    global _pool, _pool_pid
+    with _pool_lock:
+        # A pool inherited through fork() has no live processes in the child
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+            _pool_pid = os.getpid()
+            atexit.register(_pool.shutdown, cancel_futures=True)
+        return _pool
+
+
+def hash_passwords(passwords):
+    """Hash `passwords`, in parallel for larger batches, returning the hashes in the same order."""
+    passwords = list(passwords)
+    workers = current_app.config.get('PASSWORD_HASH_WORKERS', 2)
+    threshold = current_app.config.get('PASSWORD_HASH_PARALLEL_THRESHOLD', 8)
+    
+    if workers <= 1 or len(passwords) < threshold:
+        return [generate_password_hash(password) for password in passwords]
+    
+    chunksize = max(1, len(passwords) // (workers * 4))
+    return list(_hash_pool(workers).map(generate_password_hash, passwords, chunksize=chunksize))
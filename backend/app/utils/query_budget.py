@@ -0,0 +1,125 @@
+"""
+Per-request SQL statement counting, N+1 detection and query budgets.
+
+Every statement executed while a request is being handled is recorded.
+Statements are reduced to a "shape" (literals, bind parameters and IN
+lists collapsed) so that the same query repeated once per row shows up
+as a single shape with a high repeat count, the N+1 signature.
+"""
+
+import logging
+import re
+from collections import Counter
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine.interfaces import ExecuteStyle
+
+logger = logging.getLogger(__name__)
+
+_PARAM = r"(?:\?|%s|%\(\w+\)s|:\w+|\$\d+|'(?:[^']|'')*'|-?\d+(?:\.\d+)?)"
+_IN_LIST = re.compile(r'\bIN\s*\(\s*' + _PARAM + r'(?:\s*,\s*' + _PARAM + r')*\s*\)', re.IGNORECASE)
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r'\s+')
+
+
+class QueryBudgetExceeded(Exception):
+    """Raised in 'raise' mode when a request breaks its query budget."""
+
+
+def statement_shape(statement):
+    """Return the statement with parameters and literals normalised away."""
+    shape = _IN_LIST.sub('IN (?)', statement)
+    shape = _LITERAL.sub('?', shape)
+    return _WHITESPACE.sub(' ', shape).strip()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if not has_request_context():
+        return
+    log = g.get('_query_log')
+    if log is None:
+        return
+    # An insertmanyvalues execute reaches the cursor as several batches (one per
+    # row where the driver cannot order RETURNING); the route issued it once
+    if context is not None and context.execute_style is ExecuteStyle.INSERTMANYVALUES:
+        if g.get('_query_batched') is context:
+            return
+        g._query_batched = context
+    log.append(statement)
+
+
+class QueryBudget:
+    """
+    Flask extension enforcing a per-endpoint SQL statement budget.
+
+    Configuration:
+        QUERY_BUDGET_MODE               'off', 'log' or 'raise'
+        QUERY_BUDGET_DEFAULT            budget for endpoints without an entry
+        QUERY_BUDGETS                   {'blueprint.endpoint' or 'blueprint': budget}
+        QUERY_BUDGET_REPEAT_THRESHOLD   repeats of one shape reported as N+1
+        QUERY_BUDGET_HEADER             response header carrying the count
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('QUERY_BUDGET_MODE', 'off')
+        app.config.setdefault('QUERY_BUDGET_DEFAULT', None)
+        app.config.setdefault('QUERY_BUDGETS', {})
+        app.config.setdefault('QUERY_BUDGET_REPEAT_THRESHOLD', 5)
+        app.config.setdefault('QUERY_BUDGET_HEADER', 'X-Query-Count')
+        
+        if app.config['QUERY_BUDGET_MODE'] == 'off':
+            return
+        
+        if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+            event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+
+    @staticmethod
+    def budget_for(config, endpoint, blueprint):
+        budgets = config['QUERY_BUDGETS']
+        if endpoint in budgets:
+            return budgets[endpoint]
+        if blueprint in budgets:
+            return budgets[blueprint]
+        return config['QUERY_BUDGET_DEFAULT']
+
+    def _start_request(self):
+        g._query_log = []
+
+    def _finish_request(self, response):
+        g.pop('_query_batched', None)
+        statements = g.pop('_query_log', None)
+        if statements is None:
+            return response
+        
+        config = current_app.config
+        count = len(statements)
+        response.headers[config['QUERY_BUDGET_HEADER']] = str(count)
+        
+        problems = []
+        budget = self.budget_for(config, request.endpoint, request.blueprint)
+        if budget is not None and count > budget:
+            problems.append(f'{count} statements exceed the budget of {budget}')
+        
+        threshold = config['QUERY_BUDGET_REPEAT_THRESHOLD']
+        shapes = Counter(statement_shape(statement) for statement in statements)
+        for shape, repeats in shapes.most_common():
+            if repeats < threshold:
+                break
+            problems.append(f'possible N+1: {repeats}x {shape[:200]}')
+        
+        if problems:
+            message = f'{request.method} {request.path} ({request.endpoint}): ' + '; '.join(problems)
+            if config['QUERY_BUDGET_MODE'] == 'raise':
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        
+        return response
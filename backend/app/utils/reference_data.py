@@ -0,0 +1,29 @@
+"""
+Serve rarely-changing reference sets (classes, subjects, positions...) from
+a VersionedCache, tagged with a hash of their content so clients can
+revalidate.
+"""
+
+import hashlib
+
+from flask import current_app, jsonify, request
+
+
+def reference_response(cache, key, builder):
+    """
+    JSON response for the reference set `key`, built by `builder()` on a
+    cache miss. Carries an ETag hashed from the data itself, so every
+    worker tags the same data alike, and answers 304 Not Modified when the
+    client already holds it.
+    """
+    etag, data = cache.get_or_set(key, lambda: _tagged(key, builder()),
+                                  ttl=current_app.config['REFERENCE_CACHE_TTL'])
+    response = jsonify(data)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response.make_conditional(request)
+
+
+def _tagged(key, data):
+    digest = hashlib.sha1(current_app.json.dumps(data).encode()).hexdigest()
+    return f'{key}-{digest}', data
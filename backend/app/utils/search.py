@@ -0,0 +1,171 @@
+"""
+Full-text search over students and staff, backed by SQLite FTS5.
+
+Each searchable table gets an FTS5 index (`students_fts`, `staff_fts`)
+whose rowid is the row's primary key. Triggers keep it in sync with
+inserts, updates and deletes, including Core bulk inserts and e-mail
+changes on the linked user. The index uses the trigram tokenizer, so
+every query word matches anywhere inside a value, as the LIKE filters
+did ("lice" finds Alice, "0001" finds STU000001), and the same index
+serves ranked list search and keystroke typeahead.
+
+Trigrams cannot match a word shorter than three characters. Such terms,
+searches on other databases, and searches before the index exists fall
+back to the original LIKE filters.
+"""
+
+from sqlalchemy import column, event, func, inspect, literal_column, or_, select, table
+
+# Per table: indexed columns (email comes from the linked user) and the
+# bm25 weight of each, so name and ID hits outrank parent or e-mail hits.
+SEARCH_INDEXES = {
+    'students': {
+        'columns': ('first_name', 'last_name', 'student_id', 'parent_name', 'parent_email', 'email'),
+        'weights': (10.0, 10.0, 8.0, 2.0, 1.0, 1.0),
+    },
+    'staff': {
+        'columns': ('first_name', 'last_name', 'staff_id', 'email'),
+        'weights': (10.0, 10.0, 8.0, 1.0),
+    },
+}
+
+TYPEAHEAD_MAX_LIMIT = 50
+
+# Shortest word the trigram index can look up
+MIN_MATCH_LENGTH = 3
+
+# Engine -> whether its database has the FTS tables; cleared on create/drop
+_availability = {}
+
+
+def fts_table_name(table_name):
+    return f'{table_name}_fts'
+
+
+def is_search_table(name):
+    """True for the FTS tables and the shadow tables FTS5 creates for them."""
+    return any(name == fts_table_name(t) or name.startswith(fts_table_name(t) + '_') for t in SEARCH_INDEXES)
+
+
+def _row_values(table_name, row):
+    columns = SEARCH_INDEXES[table_name]['columns']
+    return ', '.join(
+        f'(SELECT email FROM "user" WHERE id = {row}.user_id)' if name == 'email' else f'{row}.{name}'
+        for name in columns
+    )
+
+
+def search_index_ddl(table_name):
+    """CREATE statements for one table's FTS index and its sync triggers."""
+    fts = fts_table_name(table_name)
+    columns = ', '.join(SEARCH_INDEXES[table_name]['columns'])
+    insert_new = f'INSERT INTO {fts} (rowid, {columns}) VALUES (new.id, {_row_values(table_name, "new")});'
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({columns}, tokenize='trigram')",
+        f'CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table_name} BEGIN {insert_new} END',
+        f'CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE ON {table_name} BEGIN '
+        f'DELETE FROM {fts} WHERE rowid = old.id; {insert_new} END',
+        f'CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table_name} BEGIN '
+        f'DELETE FROM {fts} WHERE rowid = old.id; END',
+        f'CREATE TRIGGER IF NOT EXISTS {fts}_user_au AFTER UPDATE OF email ON "user" BEGIN '
+        f'UPDATE {fts} SET email = new.email WHERE rowid IN '
+        f'(SELECT id FROM {table_name} WHERE user_id = new.id); END',
+    ]
+
+
+def create_search_indexes(connection):
+    """Create the FTS tables and triggers (SQLite only) and fill them."""
+    if connection.dialect.name != 'sqlite':
+        return
+    for table_name in SEARCH_INDEXES:
+        for statement in search_index_ddl(table_name):
+            connection.exec_driver_sql(statement)
+    rebuild_search_indexes(connection)
+
+
+def drop_search_indexes(connection):
+    if connection.dialect.name != 'sqlite':
+        return
+    for table_name in SEARCH_INDEXES:
+        # Dropping the FTS table drops its shadow tables; the triggers on
+        # the base table would fail without it, so drop them too
+        for suffix in ('ai', 'au', 'ad', 'user_au'):
+            connection.exec_driver_sql(f'DROP TRIGGER IF EXISTS {fts_table_name(table_name)}_{suffix}')
+        connection.exec_driver_sql(f'DROP TABLE IF EXISTS {fts_table_name(table_name)}')
+
+
+def rebuild_search_indexes(connection):
+    """Repopulate the FTS tables from their base tables."""
+    for table_name, index in SEARCH_INDEXES.items():
+        fts = fts_table_name(table_name)
+        values = ', '.join('u.email' if name == 'email' else f't.{name}' for name in index['columns'])
+        connection.exec_driver_sql(f'DELETE FROM {fts}')
+        connection.exec_driver_sql(
+            f'INSERT INTO {fts} (rowid, {", ".join(index["columns"])}) '
+            f'SELECT t.id, {values} FROM {table_name} t LEFT JOIN "user" u ON u.id = t.user_id'
+        )
+
+
+def attach_search_indexes(metadata):
+    """Create/drop the search indexes along with metadata.create_all()/drop_all()."""
+    def after_create(target, connection, **kw):
+        _availability.clear()
+        create_search_indexes(connection)
+
+    def before_drop(target, connection, **kw):
+        _availability.clear()
+        drop_search_indexes(connection)
+
+    event.listen(metadata, 'after_create', after_create)
+    event.listen(metadata, 'before_drop', before_drop)
+
+
+def search_index_available(bind, table_name):
+    key = (bind, table_name)
+    if not _availability.get(key):
+        _availability[key] = bind.dialect.name == 'sqlite' and inspect(bind).has_table(fts_table_name(table_name))
+    return _availability[key]
+
+
+def match_expression(term):
+    """
+    FTS5 query matching rows that contain every word of `term` somewhere,
+    or None when a word is too short for the trigram index (or there are none).
+    """
+    words = term.split()
+    if not words or any(len(word) < MIN_MATCH_LENGTH for word in words):
+        return None
+    # Quoted strings, so punctuation in e-mails and names is matched literally
+    return ' '.join('"{}"'.format(word.replace('"', '""')) for word in words)
+
+
+def ranked_matches(table_name, expression, limit=None):
+    """Subquery of (id, rank) for rows matching `expression`; lower rank is better."""
+    fts = fts_table_name(table_name)
+    fts_table = table(fts, column('rowid'))
+    rank = func.bm25(literal_column(fts), *SEARCH_INDEXES[table_name]['weights'])
+    matches = select(fts_table.c.rowid.label('id'), rank.label('rank')).where(
+        literal_column(fts).op('MATCH')(expression)
+    )
+    if limit is not None:
+        matches = matches.order_by(rank).limit(limit)
+    return matches.subquery()
+
+
+def apply_search(query, model, term, fallback_columns, limit=None):
+    """
+    Restrict `query` to rows of `model` matching `term`, best match first.
+
+    Uses the FTS index when available and otherwise ORs `column LIKE
+    '%term%'` over `fallback_columns`. `limit` caps the matches taken
+    from the index, for typeahead.
+    """
+    table_name = model.__tablename__
+    expression = match_expression(term)
+
+    if expression is None or not search_index_available(query.session.get_bind(), table_name):
+        query = query.filter(or_(*[col.contains(term) for col in fallback_columns]))
+        return query.limit(limit) if limit is not None else query
+
+    ranked = ranked_matches(table_name, expression, limit)
+    return query.join(ranked, ranked.c.id == model.id).order_by(ranked.c.rank, model.id)
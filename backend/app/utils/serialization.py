@@ -0,0 +1,233 @@
+"""
+Response serialization.
+
+`FastJSONProvider` replaces Flask's JSON provider: it encodes with orjson
+when installed (stdlib json otherwise), writes dates/times as ISO 8601 and
+Decimals as floats natively, and answers with MessagePack instead when the
+client's Accept header prefers `application/msgpack`.
+
+`SerializerMixin` gives models a `to_dict(fields=None)` built from a
+declarative field map and compiled once per model and field set into a
+plain function, so serializing a page of rows runs no per-field dispatch.
+The same map tells list endpoints which columns and relationships a
+`?fields=` subset needs, so the query loads nothing else.
+"""
+
+import datetime
+import decimal
+import uuid
+
+from flask import current_app, has_request_context, request
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import inspect
+from sqlalchemy.orm import load_only
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional encoding
+    msgpack = None
+
+MSGPACK_MIMETYPE = 'application/msgpack'
+
+
+class InvalidFields(ValueError):
+    """A ?fields= parameter named fields the model does not serialize."""
+
+
+def _default(o):
+    """Encode the types neither orjson, msgpack nor json handle themselves."""
+    if isinstance(o, (datetime.date, datetime.time)):
+        return o.isoformat()
+    if isinstance(o, decimal.Decimal):
+        return float(o)
+    if isinstance(o, uuid.UUID):
+        return str(o)
+    return DefaultJSONProvider.default(o)
+
+
+def wants_msgpack():
+    if msgpack is None or not has_request_context():
+        return False
+    best = request.accept_mimetypes.best_match(['application/json', MSGPACK_MIMETYPE])
+    return best == MSGPACK_MIMETYPE
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    default = staticmethod(_default)
+
+    def _orjson_options(self, pretty=False):
+        options = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if pretty:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps(self, obj, **kwargs):
+        # Callers passing json.dumps options get the stdlib behaviour they asked for
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=_default, option=self._orjson_options()).decode()
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+
+        if wants_msgpack():
+            response = current_app.response_class(
+                msgpack.packb(obj, default=_default), mimetype=MSGPACK_MIMETYPE
+            )
+        elif orjson is not None:
+            pretty = (self.compact is None and current_app.debug) or self.compact is False
+            response = current_app.response_class(
+                orjson.dumps(obj, default=_default, option=self._orjson_options(pretty)),
+                mimetype=self.mimetype
+            )
+        else:
+            response = super().response(obj)
+
+        if msgpack is not None:
+            response.vary.add('Accept')
+        return response
+
+
+def _compile_serializer(model, fields, names):
+    """
+    Generate `serialize(obj) -> dict` for `names` out of `model`'s field
+    map, where each entry is `'attr'`, `'relationship.attr'`, or a tuple
+    of one of those and a conversion (only 'decimal' exists).
+    """
+    prelude, items = [], []
+    relationships = {}
+
+    for i, name in enumerate(names):
+        spec = fields[name]
+        path, conversion = spec if isinstance(spec, tuple) else (spec, None)
+        attr, _, nested = path.partition('.')
+
+        if nested:
+            # Each relationship is read once however many fields use it
+            if attr not in relationships:
+                relationships[attr] = f'_rel{len(relationships)}'
+                prelude.append(f'{relationships[attr]} = obj.{attr}')
+            local = relationships[attr]
+            expr = f'({local}.{nested} if {local} is not None else None)'
+        else:
+            expr = f'obj.{attr}'
+
+        if conversion == 'decimal':
+            # Matches the historical `float(x) if x else None` output
+            prelude.append(f'_v{i} = {expr}')
+            expr = f'(float(_v{i}) if _v{i} else None)'
+        elif conversion is not None:
+            raise ValueError(f'Unknown conversion {conversion!r} for {model.__name__}.{name}')
+
+        items.append(f'{name!r}: {expr}')
+
+    body = ''.join(f'    {line}\n' for line in prelude)
+    source = f'def serialize(obj):\n{body}    return {{{", ".join(items)}}}\n'
+    namespace = {}
+    exec(compile(source, f'<{model.__name__} serializer>', 'exec'), namespace)
+    return namespace['serialize']
+
+
+class SerializerMixin:
+    """
+    Declarative `to_dict()` for models.
+
+    Subclasses set `serialize_fields`, an ordered map of output name to
+    source (see `_compile_serializer`). Dates and Decimals are left to the
+    JSON provider; `to_dict(fields=[...])` returns just those keys.
+    """
+
+    serialize_fields = {}
+    # Non-column attributes (properties, hybrids) -> the columns they read
+    serialize_depends = {}
+
+    @classmethod
+    def serializer(cls, fields=None):
+        cache = cls.__dict__.get('_serializers')
+        if cache is None:
+            cache = {}
+            setattr(cls, '_serializers', cache)
+
+        key = tuple(fields) if fields is not None else None
+        serialize = cache.get(key)
+        if serialize is None:
+            if len(cache) >= 256:
+                # Arbitrary ?fields= combinations must not grow this forever
+                cache.clear()
+            names = list(cls.serialize_fields) if key is None else list(key)
+            unknown = [name for name in names if name not in cls.serialize_fields]
+            if unknown:
+                raise InvalidFields(f'Unknown fields for {cls.__name__}: {", ".join(unknown)}')
+            serialize = cache[key] = _compile_serializer(cls, cls.serialize_fields, names)
+        return serialize
+
+    def to_dict(self, fields=None):
+        return self.serializer(fields)(self)
+
+    @classmethod
+    def load_options(cls, fields=None, eager=(), always=()):
+        """
+        Loader options for a query whose rows are serialized with `fields`.
+
+        `eager` lists the (strategy, relationship) pairs the full output
+        needs, e.g. `(joinedload, Fee.collector)`; only those the fields
+        read are applied, each limited to the columns used. `always` names
+        extra columns to load, such as pagination keys.
+        """
+        if fields is None:
+            return [strategy(relationship) for strategy, relationship in eager]
+
+        # The primary key keeps load_only() non-empty when only relationship fields are asked for
+        columns = set(always) | {column.key for column in inspect(cls).primary_key}
+        nested = {}
+        for name in fields:
+            spec = cls.serialize_fields[name]
+            path = spec[0] if isinstance(spec, tuple) else spec
+            attr, _, nested_attr = path.partition('.')
+            if nested_attr:
+                nested.setdefault(attr, set()).add(nested_attr)
+            else:
+                columns |= _source_columns(cls, attr)
+
+        options = [load_only(*[getattr(cls, column) for column in sorted(columns)])]
+        for strategy, relationship in eager:
+            if relationship.key in nested:
+                target = relationship.property.mapper.class_
+                target_columns = set().union(*[_source_columns(target, attr) for attr in nested[relationship.key]])
+                options.append(strategy(relationship).load_only(
+                    *[getattr(target, column) for column in sorted(target_columns)]
+                ))
+        return options
+
+
+def _source_columns(model, attr):
+    if attr in inspect(model).column_attrs:
+        return {attr}
+    return set(getattr(model, 'serialize_depends', {})[attr])
+
+
+def requested_fields(model):
+    """
+    The fields named by ?fields=a,b,c for `model`, or None for all of them.
+    Raises InvalidFields for names the model does not serialize.
+    """
+    raw = request.args.get('fields')
+    if not raw:
+        return None
+    fields = list(dict.fromkeys(name.strip() for name in raw.split(',') if name.strip()))
+    unknown = [name for name in fields if name not in model.serialize_fields]
+    if unknown or not fields:
+        raise InvalidFields(f'Unknown fields for {model.__name__}: {", ".join(unknown) or raw}')
+    return fields
\ No newline at end of file
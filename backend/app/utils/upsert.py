@@ -0,0 +1,18 @@
+"""
+Dialect-aware INSERT ... ON CONFLICT support.
+"""
+
+from sqlalchemy.dialects import postgresql, sqlite
+
+
+def insert_for(session):
+    """
+    Return the `insert()` construct supporting `on_conflict_do_update` for
+    the session's database, or None when the dialect has no such clause.
+    """
+    dialect = session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        return postgresql.insert
+    if dialect == 'sqlite':
+        return sqlite.insert
+    return None
@@ -0,0 +1,305 @@
+"""
+Load and latency benchmark for the REST API.
+
+`run` builds a synthetic school (`build_school` in seed.py) in a fresh SQLite
+database, then replays each scripted workload (benchmarks/workloads.py)
+through the app's full request stack: routing, JWT auth, the query budget
+and metrics hooks, the JSON provider. For every workload and endpoint it
+reports p50/p95/p99 latency, throughput and SQL statements per request
+(the X-Query-Count header), and writes them as JSON. `compare` diffs two
+such files and flags regressions.
+
+    cd backend
+    python -m benchmarks.api_load run --students 2000 --years 1 --output before.json
+    python -m benchmarks.api_load run --students 2000 --years 1 --output after.json
+    python -m benchmarks.api_load compare before.json after.json
+
+The same --seed, --students, --years and --today give the same dataset and
+request stream, so runs on different commits are comparable. --database-url points
+at an existing database instead; it is only seeded when empty, and the
+write workloads change it, so later runs against it see different data.
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import warnings
+from datetime import date, datetime
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import func, select
+
+from app import create_app, db
+from app.models import User
+from seed import build_school
+from benchmarks.workloads import WORKLOADS, School, build_requests
+from config import Config
+
+
+def percentile(values, p):
+    """Nearest-rank percentile of an already sorted list."""
+    if not values:
+        return None
+    return values[min(len(values) - 1, int(round(p * (len(values) - 1))))]
+
+
+def summarize(samples, elapsed=None):
+    latencies = sorted(sample['ms'] for sample in samples)
+    queries = [sample['queries'] for sample in samples if sample['queries'] is not None]
+    errors = [sample for sample in samples if sample['status'] >= 400]
+    result = {
+        'requests': len(samples),
+        'errors': len(errors),
+        'latency_ms': {
+            'p50': percentile(latencies, 0.50),
+            'p95': percentile(latencies, 0.95),
+            'p99': percentile(latencies, 0.99),
+            'mean': statistics.fmean(latencies) if latencies else None,
+            'max': latencies[-1] if latencies else None,
+        },
+        'queries_per_request': {
+            'mean': statistics.fmean(queries) if queries else None,
+            'max': max(queries) if queries else None,
+        },
+    }
+    if errors:
+        result['first_error'] = f"{errors[0]['status']} {errors[0]['error']}"
+    if elapsed is not None:
+        result['elapsed_s'] = elapsed
+        result['throughput_rps'] = len(samples) / elapsed if elapsed > 0 else None
+    return result
+
+
+def replay(app, requests, token, concurrency):
+    """Send `requests` from `concurrency` threads; returns (samples, wall seconds)."""
+    header = app.config['QUERY_BUDGET_HEADER']
+    headers = {'Authorization': f'Bearer {token}'}
+    samples = []
+    lock = threading.Lock()
+
+    def worker(share):
+        client = app.test_client()
+        local = []
+        for request in share:
+            started = time.perf_counter()
+            response = client.open(request.url, method=request.method, json=request.body, headers=headers)
+            elapsed = (time.perf_counter() - started) * 1000
+            count = response.headers.get(header)
+            local.append({
+                'label': request.label,
+                'ms': elapsed,
+                'status': response.status_code,
+                'queries': int(count) if count is not None else None,
+                'error': response.get_data(as_text=True)[:200] if response.status_code >= 400 else None,
+            })
+        with lock:
+            samples.extend(local)
+
+    threads = [threading.Thread(target=worker, args=(requests[n::concurrency],)) for n in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples, time.perf_counter() - started
+
+
+def run(args):
+    url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'api_load.db')}"
+    Config.SQLALCHEMY_DATABASE_URI = url
+    if Config.QUERY_BUDGET_MODE == 'off':
+        # The X-Query-Count header only exists while budgets are checked
+        Config.QUERY_BUDGET_MODE = 'log'
+    # Over-budget warnings would flood the output; the counts are in the results
+    logging.getLogger('app.utils.query_budget').setLevel(logging.ERROR)
+    warnings.filterwarnings('ignore', message='The HMAC key')
+
+    app = create_app()
+    meta = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'database': app.config['SQLALCHEMY_DATABASE_URI'].split('://')[0],
+        'students': args.students,
+        'years': args.years,
+        'seed': args.seed,
+        'today': args.today.isoformat() if args.today else None,
+        'requests': args.requests,
+        'concurrency': args.concurrency,
+    }
+
+    with app.app_context():
+        db.create_all()
+        if db.session.execute(select(func.count()).select_from(User)).scalar():
+            print(f'Using the existing data in {url}')
+        else:
+            print(f'Building dataset: {args.students} students, {args.years} year(s) -> {url}')
+            started = time.perf_counter()
+            meta['dataset'] = build_school(args.students, args.years, args.seed, args.today)
+            meta['build_s'] = round(time.perf_counter() - started, 2)
+            print('  ' + ', '.join(f'{count} {table}' for table, count in meta['dataset'].items())
+                  + f" in {meta['build_s']}s")
+
+        school = School(args.today)
+        tokens = {
+            'admin': create_access_token(identity=str(school.admin_id)),
+            'teacher': create_access_token(identity=str(school.teacher_ids[0] if school.teacher_ids else school.admin_id)),
+        }
+        plans = {
+            name: build_requests(name, school, args.requests + args.warmup, args.seed)
+            for name in args.workloads
+        }
+        db.session.remove()
+
+    results = {'meta': meta, 'workloads': {}}
+    for name in args.workloads:
+        token = tokens[WORKLOADS[name][1]]
+        requests = plans[name]
+        if args.warmup:
+            replay(app, requests[:args.warmup], token, 1)
+        samples, elapsed = replay(app, requests[args.warmup:], token, args.concurrency)
+
+        by_label = {}
+        for sample in samples:
+            by_label.setdefault(sample['label'], []).append(sample)
+        result = summarize(samples, elapsed)
+        result['endpoints'] = {label: summarize(group) for label, group in sorted(by_label.items())}
+        results['workloads'][name] = result
+        _print_workload(name, result)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f'\nResults written to {args.output}')
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _fmt(value, digits=1):
+    return '-' if value is None else f'{value:.{digits}f}'
+
+
+def _print_workload(name, result):
+    print(f"\n{name}: {result['requests']} requests, {_fmt(result['throughput_rps'])} req/s, "
+          f"{result['errors']} errors")
+    print(f"  {'endpoint':<24} {'n':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'queries':>8}")
+    for label, endpoint in [('(all)', result)] + list(result['endpoints'].items()):
+        latency = endpoint['latency_ms']
+        print(f"  {label:<24} {endpoint['requests']:>6} {_fmt(latency['p50']):>8} {_fmt(latency['p95']):>8} "
+              f"{_fmt(latency['p99']):>8} {_fmt(endpoint['queries_per_request']['mean']):>8}")
+        if endpoint.get('first_error') and label != '(all)':
+            print(f"    {endpoint['errors']} errors, first: {endpoint['first_error']}")
+
+
+def _change(old, new):
+    if old is None or new is None:
+        return None
+    if old == 0:
+        return 0.0 if new == 0 else float('inf')
+    return (new - old) / old * 100
+
+
+def compare(args):
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+
+    for run_name, data in (('baseline', baseline), ('candidate', candidate)):
+        meta = data['meta']
+        print(f"{run_name:<10} {meta.get('commit') or '?'} {meta['created']}  "
+              f"{meta['students']} students, {meta['years']} year(s), seed {meta['seed']}, "
+              f"concurrency {meta['concurrency']}")
+    if any(baseline['meta'].get(key) != candidate['meta'].get(key)
+           for key in ('students', 'years', 'seed', 'today', 'requests', 'concurrency')):
+        print('warning: the runs used different datasets or settings')
+
+    regressions = []
+    for name, new in candidate['workloads'].items():
+        old = baseline['workloads'].get(name)
+        if old is None:
+            continue
+        rps_change = _change(old.get('throughput_rps'), new.get('throughput_rps'))
+        print(f"\n{name}: {_fmt(old.get('throughput_rps'))} -> {_fmt(new.get('throughput_rps'))} req/s "
+              f"({_fmt(rps_change, 0)}%)")
+        print(f"  {'endpoint':<24} {'p50 ms':>18} {'p95 ms':>18} {'p99 ms':>18} {'queries':>12}")
+
+        rows = [('(all)', old, new)] + [
+            (label, old['endpoints'][label], endpoint)
+            for label, endpoint in new['endpoints'].items() if label in old['endpoints']
+        ]
+        for label, before, after in rows:
+            cells = []
+            for key in ('p50', 'p95', 'p99'):
+                a, b = before['latency_ms'][key], after['latency_ms'][key]
+                cells.append(f"{_fmt(a)}->{_fmt(b)} {_fmt(_change(a, b), 0):>4}%")
+            qa, qb = before['queries_per_request']['mean'], after['queries_per_request']['mean']
+            flags = []
+            p95_change = _change(before['latency_ms']['p95'], after['latency_ms']['p95'])
+            if p95_change is not None and p95_change > args.threshold:
+                flags.append('p95')
+            if qa is not None and qb is not None and qb > qa:
+                flags.append('queries')
+            if after['errors'] > before['errors']:
+                flags.append('errors')
+            if flags:
+                regressions.append(f"{name} {label}: {', '.join(flags)}")
+            queries = f'{_fmt(qa)}->{_fmt(qb)}'
+            print(f"  {label:<24} {cells[0]:>18} {cells[1]:>18} {cells[2]:>18} "
+                  f"{queries:>12}{'  REGRESSION' if flags else ''}")
+
+    if regressions:
+        print(f'\n{len(regressions)} regression(s) (p95 over {args.threshold:g}%, more queries or errors):')
+        for regression in regressions:
+            print(f'  {regression}')
+        return 1 if args.fail_on_regression else 0
+    print('\nNo regressions.')
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='build the dataset and replay the workloads')
+    run_parser.add_argument('--students', type=int, default=2000)
+    run_parser.add_argument('--years', type=int, default=1, help='academic years of history')
+    run_parser.add_argument('--seed', type=int, default=42)
+    run_parser.add_argument('--today', type=date.fromisoformat, help='pin the dataset\'s "today" (YYYY-MM-DD)')
+    run_parser.add_argument('--requests', type=int, default=500, help='measured requests per workload')
+    run_parser.add_argument('--warmup', type=int, default=20, help='unmeasured requests per workload')
+    run_parser.add_argument('--concurrency', type=int, default=1, help='client threads')
+    run_parser.add_argument('--workloads', nargs='+', choices=list(WORKLOADS), default=list(WORKLOADS))
+    run_parser.add_argument('--database-url', help='database to use instead of a temporary SQLite file')
+    run_parser.add_argument('--output', help='write the results as JSON to this file')
+
+    compare_parser = commands.add_parser('compare', help='compare two result files')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('candidate')
+    compare_parser.add_argument('--threshold', type=float, default=10, help='p95 increase (%%) flagged')
+    compare_parser.add_argument('--fail-on-regression', action='store_true', help='exit 1 on regressions')
+
+    args = parser.parse_args()
+    if args.command == 'run':
+        run(args)
+    else:
+        sys.exit(compare(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+"""
+Concurrent write benchmark for the database engine profiles.
+
+Starts several worker processes (like gunicorn workers), each with its own
+engine built from a profile and a few threads. Every thread performs
+check-ins: a transaction that looks the student up, inserts an attendance
+row and commits. It reports commits per second, commit latency percentiles
+and "database is locked" failures for each profile.
+
+    cd backend
+    python -m benchmarks.engine_profiles --workers 4 --threads 4 --checkins 200
+    python -m benchmarks.engine_profiles --database-url postgresql://... --profiles default server
+
+SQLite runs use a fresh temporary file per profile. A server database URL
+should point at an empty scratch database: the tables are created there
+and the benchmark's attendance rows are deleted between profiles.
+"""
+
+import argparse
+import multiprocessing
+import os
+import statistics
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import create_engine, delete, insert, select
+from sqlalchemy.exc import OperationalError
+
+from app import db
+from app.models import Attendance, Student, User
+from app.utils.engine_profiles import PROFILES, engine_options, install_profile
+from config import Config
+
+SETTINGS = {key: getattr(Config, key) for key in dir(Config) if key.isupper()}
+
+
+def make_engine(url, profile):
+    engine = create_engine(url, **engine_options(profile, SETTINGS))
+    install_profile(engine, profile)
+    return engine
+
+
+def prepare(url, profile, students):
+    engine = make_engine(url, profile)
+    db.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(delete(Attendance))
+        if conn.execute(select(Student.id).limit(1)).first() is None:
+            conn.execute(insert(User), [
+                {'id': i, 'username': f'user{i}', 'email': f'user{i}@example.com',
+                 'password_hash': 'x', 'role': 'student'}
+                for i in range(1, students + 1)
+            ])
+            conn.execute(insert(Student), [
+                {'id': i, 'user_id': i, 'student_id': f'STU{i:06d}', 'first_name': f'First{i}',
+                 'last_name': f'Last{i}', 'date_of_birth': date(2010, 1, 1), 'gender': 'Other'}
+                for i in range(1, students + 1)
+            ])
+    engine.dispose()
+
+
+def run_worker(url, profile, worker, threads, checkins, start_at, results):
+    engine = make_engine(url, profile)
+    latencies, errors = [], []
+
+    def checkin(student_id):
+        # One student per thread, one day per check-in, so rows never collide
+        for day in range(checkins):
+            started = time.perf_counter()
+            try:
+                with engine.begin() as conn:
+                    conn.execute(select(Student.id).where(Student.id == student_id)).one()
+                    conn.execute(insert(Attendance).values(
+                        student_id=student_id, date=date(2020, 1, 1) + timedelta(days=day), status='present'
+                    ))
+            except OperationalError as e:
+                errors.append(str(e.orig))
+                continue
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    # Start every process's threads together
+    time.sleep(max(0, start_at - time.time()))
+    pool = [threading.Thread(target=checkin, args=(worker * threads + n + 1,)) for n in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    engine.dispose()
+    results.put((latencies, errors, time.time()))
+
+
+def run_profile(url, profile, workers, threads, checkins):
+    prepare(url, profile, workers * threads)
+    results = multiprocessing.Queue()
+    start_at = time.time() + 1
+    processes = [
+        multiprocessing.Process(target=run_worker, args=(url, profile, worker, threads, checkins, start_at, results))
+        for worker in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    collected = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    latencies = sorted(latency for worker_latencies, _, _ in collected for latency in worker_latencies)
+    errors = [error for _, worker_errors, _ in collected for error in worker_errors]
+    elapsed = max(finished for _, _, finished in collected) - start_at
+
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] if latencies else float('nan')
+
+    return {
+        'commits': len(latencies),
+        'commits_per_sec': len(latencies) / elapsed if elapsed > 0 else 0,
+        'p50_ms': statistics.median(latencies) if latencies else float('nan'),
+        'p95_ms': percentile(0.95),
+        'p99_ms': percentile(0.99),
+        'errors': len(errors),
+        'first_error': errors[0] if errors else ''
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, default=4, help='processes')
+    parser.add_argument('--threads', type=int, default=4, help='threads per process')
+    parser.add_argument('--checkins', type=int, default=100, help='check-ins per thread')
+    parser.add_argument('--database-url', help='server database to use instead of temporary SQLite files')
+    parser.add_argument('--profiles', nargs='+', choices=sorted(PROFILES))
+    args = parser.parse_args()
+
+    profiles = args.profiles or (['default', 'server'] if args.database_url else ['default', 'sqlite-wal'])
+    print(f'{args.workers} processes x {args.threads} threads x {args.checkins} check-ins')
+
+    for profile in profiles:
+        url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'engine_profiles.db')}"
+        result = run_profile(url, profile, args.workers, args.threads, args.checkins)
+        print(f"\n{profile}")
+        print(f"  {result['commits']} commits, {result['commits_per_sec']:.0f}/s, "
+              f"p50 {result['p50_ms']:.1f} ms, p95 {result['p95_ms']:.1f} ms, p99 {result['p99_ms']:.1f} ms")
+        if result['errors']:
+            print(f"  {result['errors']} failed: {result['first_error']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""
+Before/after benchmark for the hot-filter indexes (migration 0002).
+
+Builds a synthetic school (`build_school` in seed.py) in a throwaway
+SQLite database, then runs the hot lookups twice: with the model indexes
+dropped and with them created.
+For each query it prints the SQLite query plan and the median latency,
+so the switch from table scans to index seeks is visible.
+
+    cd backend
+    python -m benchmarks.index_plans --students 5000 --years 1
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import and_, case, func, select
+
+from app import create_app, db
+from app.models import Attendance, Fee, Grade
+from config import Config
+from seed import academic_years, build_school
+
+
+def hot_queries(students):
+    today = date.today()
+    last_year = academic_years(2, today)[0][0]
+    month_ago = today - timedelta(days=30)
+    attendance = Attendance.__table__
+    grades = Grade.__table__
+    fees = Fee.__table__
+    
+    return {
+        'attendance lookup (student_id, date)': select(attendance.c.id).where(
+            attendance.c.student_id == students // 2, attendance.c.date == today - timedelta(days=3)
+        ),
+        'attendance report (date BETWEEN)': select(
+            attendance.c.student_id,
+            func.count(),
+            func.sum(case((attendance.c.status == 'present', 1), else_=0))
+        ).where(attendance.c.date.between(month_ago, today)).group_by(attendance.c.student_id),
+        'grades by student term': select(grades).where(
+            grades.c.student_id == students // 2, grades.c.semester == 'Fall',
+            grades.c.academic_year == last_year
+        ),
+        'overdue fees (status, due_date)': select(func.count(), func.sum(fees.c.amount)).where(
+            fees.c.status.in_(['pending', 'partial']), fees.c.due_date < today
+        ),
+        'fees collected (payment_date)': select(func.sum(fees.c.paid_amount)).where(
+            fees.c.payment_date.between(month_ago, today)
+        ),
+        'fee list page (ORDER BY due_date, id)': select(fees).order_by(
+            fees.c.due_date.desc(), fees.c.id.desc()
+        ).limit(20),
+        'grade list seek (date_assessed, id)': select(grades).where(and_(
+            grades.c.date_assessed < today - timedelta(days=180)
+        )).order_by(grades.c.date_assessed.desc(), grades.c.id.desc()).limit(20),
+    }
+
+
+def run_queries(conn, queries, repeat):
+    results = {}
+    for name, query in queries.items():
+        sql = str(query.compile(conn, compile_kwargs={'literal_binds': True}))
+        plan = [row[-1] for row in conn.exec_driver_sql('EXPLAIN QUERY PLAN ' + sql)]
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            conn.execute(query).fetchall()
+            timings.append((time.perf_counter() - started) * 1000)
+        results[name] = (plan, statistics.median(timings))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--students', type=int, default=2000)
+    parser.add_argument('--years', type=int, default=1, help='past academic years of history')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--database', help='SQLite file to use (default: a temporary file)')
+    args = parser.parse_args()
+    
+    path = args.database or os.path.join(tempfile.mkdtemp(), 'index_plans.db')
+    Config.SQLALCHEMY_DATABASE_URI = f'sqlite:///{path}'
+    app = create_app()
+    
+    with app.app_context():
+        db.create_all()
+        engine = db.engine
+        indexes = [index for model in (Attendance, Grade, Fee) for index in model.__table__.indexes]
+        
+        print(f'Building dataset: {args.students} students, {args.years} year(s) -> {path}')
+        started = time.perf_counter()
+        build_school(args.students, args.years, indexes=False)
+        print(f'  done in {time.perf_counter() - started:.1f}s')
+        
+        queries = hot_queries(args.students)
+        with engine.connect() as conn:
+            before = run_queries(conn, queries, args.repeat)
+        
+        with engine.begin() as conn:
+            for index in indexes:
+                index.create(conn)
+            conn.exec_driver_sql('ANALYZE')
+        
+        with engine.connect() as conn:
+            after = run_queries(conn, queries, args.repeat)
+    
+    for name in queries:
+        before_plan, before_ms = before[name]
+        after_plan, after_ms = after[name]
+        print(f'\n{name}')
+        print(f'  before {before_ms:9.2f} ms  ' + ' | '.join(before_plan))
+        print(f'  after  {after_ms:9.2f} ms  ' + ' | '.join(after_plan))
+        print(f'  speedup x{before_ms / after_ms:.1f}' if after_ms else '')
+
+
+if __name__ == '__main__':
+    main()
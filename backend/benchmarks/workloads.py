@@ -0,0 +1,162 @@
+"""
+Scripted API workloads for the load benchmark.
+
+A workload turns the school in the database into a list of requests. Each
+request has a label (the endpoint it exercises, used to group the results),
+a method, a URL and an optional JSON body. The lists come from a seeded
+random generator, so two runs against the same dataset send the same
+requests.
+"""
+
+import random
+from collections import namedtuple
+from datetime import date, timedelta
+
+from sqlalchemy import select
+
+from app import db
+from app.models import Class, Fee, Grade, Staff, Student, Subject, User
+from seed import academic_years, term_of
+
+Request = namedtuple('Request', 'label method url body', defaults=(None,))
+
+
+class School:
+    """The ids and names a workload needs, read from the database once."""
+
+    def __init__(self, today=None):
+        self.today = today or date.today()
+        self.academic_year = academic_years(1, self.today)[0][0]
+        self.semester = term_of(self.today)
+
+        self.admin_id = db.session.execute(select(User.id).where(User.role == 'admin').limit(1)).scalar_one()
+        self.teacher_ids = db.session.execute(select(User.id).where(User.role == 'teacher')).scalars().all()
+        self.staff_ids = db.session.execute(select(Staff.id)).scalars().all()
+        self.subject_ids = db.session.execute(select(Subject.id)).scalars().all()
+        self.class_ids = db.session.execute(select(Class.id)).scalars().all()
+
+        self.students = db.session.execute(select(Student.id, Student.class_id, Student.last_name)).all()
+        self.class_students = {}
+        for student_id, class_id, _ in self.students:
+            self.class_students.setdefault(class_id, []).append(student_id)
+
+        # Fees a bursar would be collecting: anything with a balance
+        self.open_fees = db.session.execute(
+            select(Fee.id, Fee.student_id, Fee.balance_amount)
+            .where(Fee.status.in_(['pending', 'partial', 'overdue']))
+            .order_by(Fee.id)
+        ).all()
+        self.grade_ids = db.session.execute(select(Grade.id).order_by(Grade.id.desc()).limit(5000)).scalars().all()
+
+
+def checkin_rush(school, rng, size):
+    """Morning gate: check-ins for today, with teachers reloading their class register."""
+    requests = []
+    students = rng.sample(school.students, min(size, len(school.students)))
+    for n, (student_id, class_id, _) in enumerate(students):
+        late = rng.random() < 0.1
+        requests.append(Request('attendance.check-in', 'POST', '/api/attendance/check-in', {
+            'student_id': student_id,
+            'date': school.today.isoformat(),
+            'check_in_time': f'{8 if late else 7}:{rng.randrange(60):02d}:{rng.randrange(60):02d}',
+            'status': 'late' if late else 'present'
+        }))
+        if n % 10 == 9:
+            requests.append(Request(
+                'attendance.list', 'GET', f'/api/attendance/?date={school.today.isoformat()}&class_id={class_id}&per_page=50'
+            ))
+        if n % 25 == 24:
+            requests.append(Request('dashboard.summary', 'GET', '/api/dashboard/summary'))
+    return requests
+
+
+def reports(school, rng, size):
+    """End of term: attendance, grade and fee reports for classes and students."""
+    month_ago = (school.today - timedelta(days=30)).isoformat()
+    term = f'semester={school.semester}&academic_year={school.academic_year}'
+    builders = [
+        lambda: Request('attendance.report', 'GET', f'/api/attendance/report?start_date={month_ago}'
+                        f'&end_date={school.today.isoformat()}&class_id={rng.choice(school.class_ids)}'),
+        lambda: Request('grades.class-report', 'GET', f'/api/grades/class/{rng.choice(school.class_ids)}/report?{term}'),
+        lambda: Request('grades.student-report', 'GET', f'/api/grades/student/{rng.choice(school.students)[0]}/report'),
+        lambda: Request('fees.report', 'GET', f'/api/fees/report?start_date={month_ago}&end_date={school.today.isoformat()}'),
+        lambda: Request('fees.student-summary', 'GET', f'/api/fees/student/{rng.choice(school.students)[0]}/summary'),
+        lambda: Request('fees.overdue', 'GET', '/api/fees/overdue?per_page=50'),
+        lambda: Request('dashboard.summary', 'GET', '/api/dashboard/summary'),
+    ]
+    return [rng.choice(builders)() for _ in range(size)]
+
+
+def gradebook(school, rng, size):
+    """Teachers entering a class's marks for an assessment and correcting a few."""
+    requests = []
+    while len(requests) < size:
+        class_id = rng.choice(school.class_ids)
+        subject_id = rng.choice(school.subject_ids)
+        requests.append(Request('students.classes', 'GET', '/api/students/classes'))
+        requests.append(Request('grades.subjects', 'GET', '/api/grades/subjects'))
+        requests.append(Request('students.list', 'GET', f'/api/students/?class_id={class_id}&per_page=50'))
+        requests.append(Request('grades.bulk-create', 'POST', '/api/grades/bulk-create', {'grades': [
+            {'student_id': student_id, 'subject_id': subject_id, 'assessment_type': 'quiz',
+             'assessment_name': f'Benchmark quiz {rng.randrange(1000)}',
+             'marks_obtained': rng.randint(20, 50), 'total_marks': 50,
+             'semester': school.semester, 'academic_year': school.academic_year,
+             'date_assessed': school.today.isoformat()}
+            for student_id in school.class_students.get(class_id, [])
+        ]}))
+        for student_id in rng.sample(school.class_students.get(class_id, []), min(2, len(school.class_students.get(class_id, [])))):
+            requests.append(Request('grades.list', 'GET', f'/api/grades/?student_id={student_id}&per_page=50'))
+        if school.grade_ids:
+            requests.append(Request('grades.update', 'PUT', f'/api/grades/{rng.choice(school.grade_ids)}',
+                                    {'marks_obtained': rng.randint(40, 100), 'total_marks': 100}))
+    return requests[:size]
+
+
+def fee_collection(school, rng, size):
+    """Bursar's office on a payment day: look the student up, check the balance, take payment."""
+    requests = []
+    fees = rng.sample(school.open_fees, min(size, len(school.open_fees)))
+    last_names = {student_id: last_name for student_id, _, last_name in school.students}
+    for n, (fee_id, student_id, balance) in enumerate(fees):
+        requests.append(Request('students.search', 'GET', f'/api/students/search?q={last_names[student_id][:3]}'))
+        requests.append(Request('fees.student-summary', 'GET', f'/api/fees/student/{student_id}/summary?include_fees=true'))
+        requests.append(Request('fees.payment', 'POST', f'/api/fees/{fee_id}/payment', {
+            'payment_amount': float(balance) if rng.random() < 0.7 else round(float(balance) / 2, 2),
+            'payment_method': rng.choice(['cash', 'card', 'online', 'bank_transfer']),
+            'transaction_id': f'BENCH{n:06d}'
+        }))
+        if n % 10 == 9:
+            requests.append(Request('fees.list', 'GET', '/api/fees/?status=overdue&per_page=50'))
+    return requests[:size]
+
+
+def browse(school, rng, size):
+    """Office staff moving around the app: profiles, directories and records."""
+    builders = [
+        lambda: Request('auth.profile', 'GET', '/api/auth/profile'),
+        lambda: Request('students.list', 'GET', f'/api/students/?page={rng.randint(1, 20)}&per_page=20'),
+        lambda: Request('students.detail', 'GET', f'/api/students/{rng.choice(school.students)[0]}'),
+        lambda: Request('students.search', 'GET', f'/api/students/search?q={rng.choice(school.students)[2][:3]}'),
+        lambda: Request('staff.list', 'GET', '/api/staff/?per_page=20'),
+        lambda: Request('staff.detail', 'GET', f'/api/staff/{rng.choice(school.staff_ids)}'),
+        lambda: Request('staff.teachers', 'GET', '/api/staff/teachers'),
+        lambda: Request('staff.departments', 'GET', '/api/staff/departments'),
+        lambda: Request('attendance.list', 'GET', f'/api/attendance/?student_id={rng.choice(school.students)[0]}'),
+        lambda: Request('fees.list', 'GET', f'/api/fees/?student_id={rng.choice(school.students)[0]}'),
+    ]
+    return [rng.choice(builders)() for _ in range(size)]
+
+
+# name -> (builder, user the requests are made as)
+WORKLOADS = {
+    'checkin-rush': (checkin_rush, 'teacher'),
+    'reports': (reports, 'admin'),
+    'gradebook': (gradebook, 'teacher'),
+    'fee-collection': (fee_collection, 'admin'),
+    'browse': (browse, 'admin'),
+}
+
+
+def build_requests(name, school, size, seed):
+    builder, _ = WORKLOADS[name]
+    return builder(school, random.Random(f'{seed}:{name}'), size)
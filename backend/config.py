@@ -8,4 +8,96 @@ class Config:
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'jwt-dev-secret-key'
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///edumanage.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
-    JWT_ACCESS_TOKEN_EXPIRES = False
\ No newline at end of file
+    JWT_ACCESS_TOKEN_EXPIRES = False
+    
+    # SQL query budgets: 'off', 'log' or 'raise'. Off by default so production
+    # requests skip statement counting; DevelopmentConfig and TestingConfig turn it on
+    QUERY_BUDGET_MODE = os.environ.get('QUERY_BUDGET_MODE') or 'off'
+    QUERY_BUDGET_DEFAULT = int(os.environ.get('QUERY_BUDGET_DEFAULT') or 25)
+    QUERY_BUDGET_REPEAT_THRESHOLD = 5
+    # Each budget includes the account-state lookup every authenticated request makes
+    QUERY_BUDGETS = {
+        'students.get_students': 4,
+        'staff.get_staff': 4,
+        'attendance.get_attendance': 4,
+        'attendance.bulk_mark_attendance': 5,
+        'grades.get_grades': 4,
+        'fees.get_fees': 4,
+        'fees.get_overdue_fees': 4,
+    }
+    
+    # Seconds a `?total=cached` row count is reused by list endpoints
+    PAGINATION_COUNT_CACHE_TTL = int(os.environ.get('PAGINATION_COUNT_CACHE_TTL') or 60)
+    
+    # Processes per web worker hashing passwords during bulk account creation
+    # (1 hashes inline); batches under the threshold are always hashed inline
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS') or 2)
+    PASSWORD_HASH_PARALLEL_THRESHOLD = 8
+    
+    # Rows validated and committed together by the streaming student import
+    STUDENT_IMPORT_CHUNK_SIZE = int(os.environ.get('STUDENT_IMPORT_CHUNK_SIZE') or 1000)
+    
+    # Seconds the dashboard summary is cached; writes to its tables clear it early
+    DASHBOARD_CACHE_TTL = int(os.environ.get('DASHBOARD_CACHE_TTL') or 30)
+    
+    # Seconds reference sets (classes, subjects, positions...) stay cached per process.
+    # Writes clear only the writing worker's copy, so this bounds staleness elsewhere
+    REFERENCE_CACHE_TTL = int(os.environ.get('REFERENCE_CACHE_TTL') or 30)
+    
+    # Seconds a worker may keep serving a cached current user (and profile) that another worker changed
+    CURRENT_USER_CACHE_TTL = int(os.environ.get('CURRENT_USER_CACHE_TTL') or 60)
+    
+    # Overdue fee sweeper. LATE_FEE_POLICY is 'none', 'flat' (LATE_FEE_AMOUNT) or
+    # 'percent' (LATE_FEE_PERCENT of the fee), applied once after LATE_FEE_GRACE_DAYS
+    LATE_FEE_POLICY = os.environ.get('LATE_FEE_POLICY') or 'none'
+    LATE_FEE_AMOUNT = os.environ.get('LATE_FEE_AMOUNT') or '0'
+    LATE_FEE_PERCENT = os.environ.get('LATE_FEE_PERCENT') or '0'
+    LATE_FEE_GRACE_DAYS = int(os.environ.get('LATE_FEE_GRACE_DAYS') or 0)
+    # Seconds between in-process sweeps; 0 leaves it to `flask sweep-overdue-fees` (cron)
+    OVERDUE_SWEEP_INTERVAL = int(os.environ.get('OVERDUE_SWEEP_INTERVAL') or 0)
+    
+    # Background report jobs (?async=true): pool threads and queued jobs per process,
+    # seconds a result is kept, seconds between heartbeats from the process holding
+    # a job, and seconds without a heartbeat after which an unfinished job counts as dead
+    REPORT_JOB_WORKERS = int(os.environ.get('REPORT_JOB_WORKERS') or 2)
+    REPORT_JOB_QUEUE_LIMIT = int(os.environ.get('REPORT_JOB_QUEUE_LIMIT') or 8)
+    REPORT_JOB_RESULT_TTL = int(os.environ.get('REPORT_JOB_RESULT_TTL') or 3600)
+    REPORT_JOB_HEARTBEAT_INTERVAL = int(os.environ.get('REPORT_JOB_HEARTBEAT_INTERVAL') or 15)
+    REPORT_JOB_TIMEOUT = int(os.environ.get('REPORT_JOB_TIMEOUT') or 60)
+    # Seconds between in-process purges of expired job results; 0 leaves it to `flask purge-report-jobs`
+    REPORT_JOB_PURGE_INTERVAL = int(os.environ.get('REPORT_JOB_PURGE_INTERVAL') or 3600)
+    
+    # Rows fetched and written per chunk by the /export endpoints
+    EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE') or 1000)
+    
+    # `python -m app serve` (gunicorn). Workers default to 2 x cores + 1; with
+    # SERVER_THREADS > 1 each worker serves requests on that many threads
+    SERVER_BIND = os.environ.get('SERVER_BIND') or '0.0.0.0:5000'
+    SERVER_WORKERS = int(os.environ.get('SERVER_WORKERS') or 2 * (os.cpu_count() or 1) + 1)
+    SERVER_THREADS = int(os.environ.get('SERVER_THREADS') or 1)
+    SERVER_TIMEOUT = int(os.environ.get('SERVER_TIMEOUT') or 30)
+    # Recycle each worker after this many requests (plus up to the jitter); 0 disables
+    SERVER_MAX_REQUESTS = int(os.environ.get('SERVER_MAX_REQUESTS') or 1000)
+    SERVER_MAX_REQUESTS_JITTER = int(os.environ.get('SERVER_MAX_REQUESTS_JITTER') or 100)
+    
+    # Engine tuning (app/utils/engine_profiles.py): 'auto', 'sqlite-wal', 'server' or 'default'
+    DATABASE_PROFILE = os.environ.get('DATABASE_PROFILE') or 'auto'
+    # Connection pool of the 'server' profile, per worker process
+    DATABASE_POOL_SIZE = int(os.environ.get('DATABASE_POOL_SIZE') or 10)
+    DATABASE_MAX_OVERFLOW = int(os.environ.get('DATABASE_MAX_OVERFLOW') or 20)
+    DATABASE_POOL_RECYCLE = int(os.environ.get('DATABASE_POOL_RECYCLE') or 1800)
+    DATABASE_POOL_TIMEOUT = int(os.environ.get('DATABASE_POOL_TIMEOUT') or 30)
+    
+    # Prometheus metrics at METRICS_PATH (requires prometheus_client)
+    METRICS_ENABLED = (os.environ.get('METRICS_ENABLED') or 'true').lower() == 'true'
+    METRICS_PATH = '/api/metrics'
+
+
+class DevelopmentConfig(Config):
+    QUERY_BUDGET_MODE = os.environ.get('QUERY_BUDGET_MODE') or 'log'
+
+
+class TestingConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = os.environ.get('TEST_DATABASE_URL') or 'sqlite://'
+    QUERY_BUDGET_MODE = os.environ.get('QUERY_BUDGET_MODE') or 'raise'
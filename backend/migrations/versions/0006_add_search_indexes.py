@@ -0,0 +1,90 @@
+"""add student and staff full-text search indexes
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 04:40:12.118305
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+# The DDL is spelled out here rather than imported from app.utils.search, so
+# replaying this revision always builds the indexes as they were at 0006
+UPGRADE = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS students_fts USING fts5(first_name, last_name, student_id, "
+    "parent_name, parent_email, email, tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    'CREATE TRIGGER IF NOT EXISTS students_fts_ai AFTER INSERT ON students BEGIN '
+    'INSERT INTO students_fts (rowid, first_name, last_name, student_id, parent_name, parent_email, email) '
+    'VALUES (new.id, new.first_name, new.last_name, new.student_id, new.parent_name, new.parent_email, '
+    '(SELECT email FROM "user" WHERE id = new.user_id)); END',
+    'CREATE TRIGGER IF NOT EXISTS students_fts_au AFTER UPDATE ON students BEGIN '
+    'DELETE FROM students_fts WHERE rowid = old.id; '
+    'INSERT INTO students_fts (rowid, first_name, last_name, student_id, parent_name, parent_email, email) '
+    'VALUES (new.id, new.first_name, new.last_name, new.student_id, new.parent_name, new.parent_email, '
+    '(SELECT email FROM "user" WHERE id = new.user_id)); END',
+    'CREATE TRIGGER IF NOT EXISTS students_fts_ad AFTER DELETE ON students BEGIN '
+    'DELETE FROM students_fts WHERE rowid = old.id; END',
+    'CREATE TRIGGER IF NOT EXISTS students_fts_user_au AFTER UPDATE OF email ON "user" BEGIN '
+    'UPDATE students_fts SET email = new.email WHERE rowid IN '
+    '(SELECT id FROM students WHERE user_id = new.id); END',
+    'INSERT INTO students_fts (rowid, first_name, last_name, student_id, parent_name, parent_email, email) '
+    'SELECT t.id, t.first_name, t.last_name, t.student_id, t.parent_name, t.parent_email, u.email '
+    'FROM students t LEFT JOIN "user" u ON u.id = t.user_id',
+
+    "CREATE VIRTUAL TABLE IF NOT EXISTS staff_fts USING fts5(first_name, last_name, staff_id, email, "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    'CREATE TRIGGER IF NOT EXISTS staff_fts_ai AFTER INSERT ON staff BEGIN '
+    'INSERT INTO staff_fts (rowid, first_name, last_name, staff_id, email) '
+    'VALUES (new.id, new.first_name, new.last_name, new.staff_id, '
+    '(SELECT email FROM "user" WHERE id = new.user_id)); END',
+    'CREATE TRIGGER IF NOT EXISTS staff_fts_au AFTER UPDATE ON staff BEGIN '
+    'DELETE FROM staff_fts WHERE rowid = old.id; '
+    'INSERT INTO staff_fts (rowid, first_name, last_name, staff_id, email) '
+    'VALUES (new.id, new.first_name, new.last_name, new.staff_id, '
+    '(SELECT email FROM "user" WHERE id = new.user_id)); END',
+    'CREATE TRIGGER IF NOT EXISTS staff_fts_ad AFTER DELETE ON staff BEGIN '
+    'DELETE FROM staff_fts WHERE rowid = old.id; END',
+    'CREATE TRIGGER IF NOT EXISTS staff_fts_user_au AFTER UPDATE OF email ON "user" BEGIN '
+    'UPDATE staff_fts SET email = new.email WHERE rowid IN '
+    '(SELECT id FROM staff WHERE user_id = new.id); END',
+    'INSERT INTO staff_fts (rowid, first_name, last_name, staff_id, email) '
+    'SELECT t.id, t.first_name, t.last_name, t.staff_id, u.email '
+    'FROM staff t LEFT JOIN "user" u ON u.id = t.user_id',
+]
+
+DOWNGRADE = [
+    # Dropping an FTS table drops its shadow tables; the triggers would fail without it
+    'DROP TRIGGER IF EXISTS students_fts_ai',
+    'DROP TRIGGER IF EXISTS students_fts_au',
+    'DROP TRIGGER IF EXISTS students_fts_ad',
+    'DROP TRIGGER IF EXISTS students_fts_user_au',
+    'DROP TABLE IF EXISTS students_fts',
+    'DROP TRIGGER IF EXISTS staff_fts_ai',
+    'DROP TRIGGER IF EXISTS staff_fts_au',
+    'DROP TRIGGER IF EXISTS staff_fts_ad',
+    'DROP TRIGGER IF EXISTS staff_fts_user_au',
+    'DROP TABLE IF EXISTS staff_fts',
+]
+
+
+def upgrade():
+    # FTS5 tables and sync triggers, filled from the existing rows.
+    # SQLite only; other databases keep the LIKE search.
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for statement in UPGRADE:
+        op.execute(statement)
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for statement in DOWNGRADE:
+        op.execute(statement)
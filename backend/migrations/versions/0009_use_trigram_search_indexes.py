@@ -0,0 +1,61 @@
+"""rebuild the full-text search indexes with the trigram tokenizer
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-17 05:52:40.277614
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+
+# Word tokens only matched from the start of a word; trigrams match inside
+# names and ID numbers as the LIKE search did. The sync triggers from 0006
+# stay as they are: only the FTS tables are recreated and refilled.
+FILL = [
+    'INSERT INTO students_fts (rowid, first_name, last_name, student_id, parent_name, parent_email, email) '
+    'SELECT t.id, t.first_name, t.last_name, t.student_id, t.parent_name, t.parent_email, u.email '
+    'FROM students t LEFT JOIN "user" u ON u.id = t.user_id',
+    'INSERT INTO staff_fts (rowid, first_name, last_name, staff_id, email) '
+    'SELECT t.id, t.first_name, t.last_name, t.staff_id, u.email '
+    'FROM staff t LEFT JOIN "user" u ON u.id = t.user_id',
+]
+
+UPGRADE = [
+    'DROP TABLE IF EXISTS students_fts',
+    "CREATE VIRTUAL TABLE students_fts USING fts5(first_name, last_name, student_id, "
+    "parent_name, parent_email, email, tokenize='trigram')",
+    'DROP TABLE IF EXISTS staff_fts',
+    "CREATE VIRTUAL TABLE staff_fts USING fts5(first_name, last_name, staff_id, email, "
+    "tokenize='trigram')",
+] + FILL
+
+DOWNGRADE = [
+    'DROP TABLE IF EXISTS students_fts',
+    "CREATE VIRTUAL TABLE students_fts USING fts5(first_name, last_name, student_id, "
+    "parent_name, parent_email, email, tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    'DROP TABLE IF EXISTS staff_fts',
+    "CREATE VIRTUAL TABLE staff_fts USING fts5(first_name, last_name, staff_id, email, "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+] + FILL
+
+
+def upgrade():
+    # SQLite only, like 0006
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for statement in UPGRADE:
+        op.execute(statement)
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for statement in DOWNGRADE:
+        op.execute(statement)
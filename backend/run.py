@@ -6,9 +6,10 @@ Run script for EduManage Pro Backend
 import os
 import sys
 from app import create_app, db
+from config import DevelopmentConfig
 
 def main():
-    app = create_app()
+    app = create_app(DevelopmentConfig)
     
     # Create tables if they don't exist
     with app.app_context():
@@ -1,276 +1,392 @@
+"""
+Database seeder.
+
+    python seed.py                       # small demo school
+    python seed.py --scale 20 --seed 7   # ~20,000 students, millions of rows
+
+Drops and recreates every table, then generates a school: classes of 30
+students across grades 1-12, a teacher per class plus office staff,
+`--years` past academic years and the current one up to yesterday of
+weekday attendance, four assessments per subject and term, and each
+year's fees. `--scale` is thousands of students; the same scale, years
+and seed always produce the same data.
+
+Rows are generated in column-wise batches and written with one
+executemany per batch; each distinct password is hashed once. The demo
+logins (admin/admin123, john_teacher/teacher123, alice_student/student123)
+exist at every scale. The API benchmarks build their datasets with
+`build_school()`.
+"""
+
+import argparse
+import random
+import time
+from datetime import date, datetime, timedelta
+from datetime import time as clock
+from functools import lru_cache
+from itertools import repeat
+
+from sqlalchemy import func, insert, select
+from werkzeug.security import generate_password_hash
+
 from app import create_app, db
 from app.models import User, Student, Staff, Class, Subject, Attendance, Grade, Fee
-from datetime import datetime, date, timedelta
-from decimal import Decimal
-import random
+from app.models.attendance_summary import AttendanceSummary
+from app.models.grade_summary import GradeSummary
+
+STUDENTS_PER_SCALE = 1000
+CLASS_SIZE = 30
+BATCH_SIZE = 20000
+
+PASSWORDS = {'admin': 'admin123', 'teacher': 'teacher123', 'staff': 'staff123', 'student': 'student123'}
+
+DEMO_TEACHERS = [
+    ('john_teacher', 'john@edumanage.com', 'John', 'Smith'),
+    ('mary_teacher', 'mary@edumanage.com', 'Mary', 'Johnson'),
+    ('david_teacher', 'david@edumanage.com', 'David', 'Wilson'),
+    ('sarah_teacher', 'sarah@edumanage.com', 'Sarah', 'Brown'),
+]
+DEMO_STUDENTS = [
+    ('Alice', 'Johnson'), ('Bob', 'Smith'), ('Charlie', 'Brown'), ('Diana', 'Wilson'), ('Emily', 'Davis'),
+    ('Frank', 'Miller'), ('Grace', 'Taylor'), ('Henry', 'Anderson'), ('Ivy', 'Thomas'), ('Jack', 'Jackson'),
+    ('Kelly', 'White'), ('Liam', 'Harris'), ('Mia', 'Martin'), ('Noah', 'Thompson'), ('Olivia', 'Garcia'),
+]
+
+FIRST_NAMES = [
+    'Alice', 'Bob', 'Charlie', 'Diana', 'Emily', 'Frank', 'Grace', 'Henry', 'Ivy', 'Jack',
+    'Kelly', 'Liam', 'Mia', 'Noah', 'Olivia', 'Peter', 'Quinn', 'Rosa', 'Sam', 'Tara',
+    'Umar', 'Vera', 'Wes', 'Xena', 'Yusuf', 'Zoe', 'Amara', 'Kofi', 'Wanjiru', 'Juma'
+]
+LAST_NAMES = [
+    'Johnson', 'Smith', 'Brown', 'Wilson', 'Davis', 'Miller', 'Taylor', 'Anderson', 'Thomas',
+    'Jackson', 'White', 'Harris', 'Martin', 'Thompson', 'Garcia', 'Otieno', 'Mwangi', 'Kamau',
+    'Njoroge', 'Achieng', 'Okafor', 'Mensah', 'Nguyen', 'Patel', 'Kim', 'Silva', 'Rossi'
+]
+SUBJECTS = [
+    ('Mathematics', 'MATH101', 'Basic Mathematics', 3), ('English', 'ENG101', 'English Language Arts', 3),
+    ('Science', 'SCI101', 'General Science', 3), ('Social Studies', 'SS101', 'Social Studies', 2),
+    ('Physical Education', 'PE101', 'Physical Education', 1), ('Art', 'ART101', 'Visual Arts', 1),
+    ('Music', 'MUS101', 'Music Education', 1)
+]
+# (type, name, days into the term)
+ASSESSMENTS = [('quiz', 'Quiz 1', 20), ('assignment', 'Assignment 1', 40), ('exam', 'Midterm', 60), ('exam', 'Final', 110)]
+ATTENDANCE_STATUSES = (('present', 85), ('absent', 7), ('late', 6), ('excused', 2))
+FEE_TYPES = [('tuition', 1500), ('library', 150), ('lab', 300), ('transport', 600), ('activity', 250)]
+PAYMENT_METHODS = ['cash', 'card', 'online', 'bank_transfer']
+OFFICE_POSITIONS = [
+    ('Bursar', 'Finance'), ('Accountant', 'Finance'), ('Secretary', 'Administration'),
+    ('Librarian', 'Library'), ('Nurse', 'Health')
+]
+GRADE_LETTERS = [
+    'A+' if p >= 90 else 'A' if p >= 80 else 'B+' if p >= 70 else 'B' if p >= 60
+    else 'C' if p >= 50 else 'D' if p >= 40 else 'F'
+    for p in range(101)
+]
+
+
+def academic_years(years, today):
+    """(label, first day, last day) of the `years` academic years ending with the current one."""
+    current = today.year if today.month >= 9 else today.year - 1
+    return [
+        (f'{start}-{start + 1}', date(start, 9, 1), date(start + 1, 6, 30))
+        for start in range(current - years + 1, current + 1)
+    ]
+
+
+def term_of(day):
+    return 'Fall' if day.month >= 9 or day.month == 1 else 'Spring'
+
+
+def bulk_insert(connection, model, columns, rows):
+    """
+    Insert `rows` (tuples in `columns` order) into `model`'s table with one
+    executemany per batch; returns the row count.
+
+    Values are converted for the database column by column, through each
+    type's bind processor, cached per distinct value: dates, times and
+    amounts repeat across a batch, so each is converted once. Columns left
+    out get their default, computed once.
+    """
+    dialect = connection.dialect
+    table = model.__table__
+    compiled = insert(table).compile(dialect=dialect, column_keys=columns)
+    keys = list(compiled.positiontup) if compiled.positional else list(compiled.bind_names.values())
+
+    sources = []
+    for key in keys:
+        column = table.c[key]
+        processor = column.type.dialect_impl(dialect).bind_processor(dialect)
+        if key in columns:
+            sources.append((columns.index(key), lru_cache(maxsize=4096)(processor) if processor else None))
+        else:
+            default = column.default
+            value = None if default is None else default.arg(None) if default.is_callable else default.arg
+            sources.append((None, processor(value) if processor else value))
+
+    sql = str(compiled)
+    count = 0
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            count += _execute_batch(connection, sql, keys, compiled.positional, sources, batch)
+            batch = []
+    if batch:
+        count += _execute_batch(connection, sql, keys, compiled.positional, sources, batch)
+    return count
+
+
+def _execute_batch(connection, sql, keys, positional, sources, batch):
+    columns = list(zip(*batch))
+    values = [
+        repeat(processor) if index is None
+        else map(processor, columns[index]) if processor else columns[index]
+        for index, processor in sources
+    ]
+    if positional:
+        parameters = list(zip(*values))
+    else:
+        parameters = [dict(zip(keys, row)) for row in zip(*values)]
+    connection.exec_driver_sql(sql, parameters)
+    return len(batch)
+
+
+def build_school(students=1000, years=1, seed=42, today=None, indexes=True):
+    """
+    Fill the empty app database with a generated school; returns the row
+    count per table. Runs inside an app context.
+
+    The attendance, grade and fee indexes are dropped for the load and
+    built once at the end (sorting once beats updating them row by row);
+    `indexes=False` leaves them dropped.
+    """
+    rng = random.Random(seed)
+    today = today or date.today()
+    terms = academic_years(years + 1, today)
+    now = datetime.utcnow()
+    hashes = {role: generate_password_hash(password) for role, password in PASSWORDS.items()}
+
+    students = max(students, len(DEMO_STUDENTS))
+    class_count = -(-students // CLASS_SIZE)
+    teacher_count = max(class_count, len(DEMO_TEACHERS))
+    staff_count = 1 + teacher_count + len(OFFICE_POSITIONS)
+    # Ids are assigned here so related rows can be generated without reading them back
+    teacher_user_ids = range(2, teacher_count + 2)
+    office_user_ids = range(teacher_count + 2, staff_count + 1)
+    student_user_ids = range(staff_count + 1, staff_count + 1 + students)
+    student_ids = range(1, students + 1)
+    class_of = [(student_id - 1) // CLASS_SIZE + 1 for student_id in student_ids]
+    class_teacher = [teacher_user_ids[(class_id - 1) % teacher_count] for class_id in class_of]
+    bursar_id = office_user_ids[0]
+    counts = {}
+
+    with db.engine.begin() as connection:
+        if connection.execute(select(func.count()).select_from(User)).scalar():
+            raise RuntimeError('build_school() needs an empty database')
+
+        bulk_indexes = [index for model in (Attendance, Grade, Fee) for index in model.__table__.indexes]
+        for index in bulk_indexes:
+            index.drop(connection, checkfirst=True)
+
+        counts['classes'] = bulk_insert(
+            connection, Class,
+            ['id', 'name', 'section', 'grade_level', 'academic_year', 'capacity', 'created_at', 'updated_at'],
+            ((i, f'Grade {(i - 1) % 12 + 1}{chr(65 + (i - 1) // 12 % 26)}', chr(65 + (i - 1) // 12 % 26),
+              (i - 1) % 12 + 1, terms[-1][0], CLASS_SIZE, now, now)
+             for i in range(1, class_count + 1))
+        )
+        counts['subjects'] = bulk_insert(
+            connection, Subject, ['id', 'name', 'code', 'description', 'credits', 'created_at', 'updated_at'],
+            ((i, name, code, description, credits, now, now)
+             for i, (name, code, description, credits) in enumerate(SUBJECTS, 1))
+        )
 
-def seed_database():
+        users = [(1, 'admin', 'admin@edumanage.com', 'admin')]
+        for n, user_id in enumerate(teacher_user_ids, 1):
+            username, email = DEMO_TEACHERS[n - 1][:2] if n <= len(DEMO_TEACHERS) else (f'teacher{n}', f'teacher{n}@edumanage.com')
+            users.append((user_id, username, email, 'teacher'))
+        for n, user_id in enumerate(office_user_ids, 1):
+            users.append((user_id, f'staff{n}', f'staff{n}@edumanage.com', 'staff'))
+        for n, user_id in enumerate(student_user_ids, 1):
+            if n <= len(DEMO_STUDENTS):
+                first = DEMO_STUDENTS[n - 1][0].lower()
+                users.append((user_id, f'{first}_student', f'{first}@student.edumanage.com', 'student'))
+            else:
+                users.append((user_id, f'student{n}', f'student{n}@student.edumanage.com', 'student'))
+        counts['users'] = bulk_insert(
+            connection, User,
+            ['id', 'username', 'email', 'password_hash', 'role', 'is_active', 'must_change_password',
+             'created_at', 'updated_at'],
+            ((user_id, username, email, hashes[role], role, True, False, now, now)
+             for user_id, username, email, role in users)
+        )
+
+        def staff_row(n, user_id, staff_id, first_name, last_name, position, department, salary):
+            return (
+                n, user_id, staff_id, first_name, last_name,
+                date(rng.randint(1965, 1998), rng.randint(1, 12), rng.randint(1, 28)),
+                rng.choice(['Male', 'Female']), f'555-{rng.randint(1000, 9999)}', f'{rng.randint(100, 999)} Teacher St',
+                position, department, salary, date(2015, 1, 1), "Bachelor's Degree in Education", True, now, now
+            )
+
+        staff = [staff_row(1, 1, 'ADM001', 'System', 'Administrator', 'Principal', 'Administration', 80000)]
+        for n, user_id in enumerate(teacher_user_ids, 1):
+            subject = SUBJECTS[(n - 1) % len(SUBJECTS)][0]
+            first_name, last_name = (DEMO_TEACHERS[n - 1][2:] if n <= len(DEMO_TEACHERS)
+                                     else (rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)))
+            staff.append(staff_row(n + 1, user_id, f'TCH{n:03d}', first_name, last_name, f'{subject} Teacher', subject,
+                                   rng.randrange(40000, 60000, 500)))
+        for n, (user_id, (position, department)) in enumerate(zip(office_user_ids, OFFICE_POSITIONS), 1):
+            staff.append(staff_row(teacher_count + 1 + n, user_id, f'STF{n:03d}', rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES),
+                                   position, department, rng.randrange(30000, 50000, 500)))
+        counts['staff'] = bulk_insert(
+            connection, Staff,
+            ['id', 'user_id', 'staff_id', 'first_name', 'last_name', 'date_of_birth', 'gender', 'phone',
+             'address', 'position', 'department', 'salary', 'hire_date', 'qualification', 'is_active',
+             'created_at', 'updated_at'],
+            staff
+        )
+
+        def student_rows():
+            for student_id, user_id, class_id in zip(student_ids, student_user_ids, class_of):
+                if student_id <= len(DEMO_STUDENTS):
+                    first_name, last_name = DEMO_STUDENTS[student_id - 1]
+                else:
+                    first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+                yield (
+                    student_id, user_id, f'STU{student_id:06d}', first_name, last_name,
+                    date(today.year - 6 - (class_id - 1) % 12, rng.randint(1, 12), rng.randint(1, 28)),
+                    rng.choice(['Male', 'Female']), f'555-{rng.randint(1000, 9999)}',
+                    f'{rng.randint(100, 999)} Student Ave', class_id, f'Parent of {first_name}',
+                    f'555-{rng.randint(1000, 9999)}', f'parent{student_id}@email.com', terms[0][1], True, now, now
+                )
+
+        counts['students'] = bulk_insert(
+            connection, Student,
+            ['id', 'user_id', 'student_id', 'first_name', 'last_name', 'date_of_birth', 'gender', 'phone',
+             'address', 'class_id', 'parent_name', 'parent_phone', 'parent_email', 'admission_date',
+             'is_active', 'created_at', 'updated_at'],
+            student_rows()
+        )
+
+        statuses, weights = zip(*ATTENDANCE_STATUSES)
+        check_in_times = [clock(7, minute) for minute in range(60)] + [clock(8, minute) for minute in range(30)]
+
+        def attendance_rows():
+            # One school day at a time, all students at once
+            for _, first, last in terms:
+                day = first
+                while day <= min(last, today - timedelta(days=1)):
+                    if day.weekday() < 5:
+                        day_statuses = rng.choices(statuses, weights, k=students)
+                        times = rng.choices(check_in_times, k=students)
+                        check_ins = [None if status == 'absent' else at for status, at in zip(day_statuses, times)]
+                        yield from zip(student_ids, repeat(day), day_statuses, check_ins, class_teacher,
+                                       repeat(now), repeat(now))
+                    day += timedelta(days=1)
+
+        counts['attendance'] = bulk_insert(
+            connection, Attendance,
+            ['student_id', 'date', 'status', 'check_in_time', 'marked_by', 'created_at', 'updated_at'],
+            attendance_rows()
+        )
+
+        noise = [round(rng.gauss(0, 8)) for _ in range(1000)]
+
+        def grade_rows():
+            for label, first, _ in terms:
+                for semester, term_start in (('Fall', first), ('Spring', date(first.year + 1, 2, 1))):
+                    if term_start >= today:
+                        continue
+                    abilities = [round(rng.gauss(72, 12)) for _ in student_ids]
+                    for subject_id in range(1, len(SUBJECTS) + 1):
+                        for assessment_type, name, offset in ASSESSMENTS:
+                            assessed = term_start + timedelta(days=offset)
+                            if assessed >= today:
+                                continue
+                            marks = [max(0, min(100, ability + delta))
+                                     for ability, delta in zip(abilities, rng.choices(noise, k=students))]
+                            yield from zip(
+                                student_ids, repeat(subject_id), repeat(assessment_type), repeat(name),
+                                marks, repeat(100), marks, map(GRADE_LETTERS.__getitem__, marks),
+                                repeat(semester), repeat(label), repeat(assessed), class_teacher,
+                                repeat(now), repeat(now)
+                            )
+
+        counts['grades'] = bulk_insert(
+            connection, Grade,
+            ['student_id', 'subject_id', 'assessment_type', 'assessment_name', 'marks_obtained', 'total_marks',
+             'percentage', 'grade_letter', 'semester', 'academic_year', 'date_assessed', 'teacher_id',
+             'created_at', 'updated_at'],
+            grade_rows()
+        )
+
+        def fee_rows():
+            for label, first, _ in terms:
+                for student_id in student_ids:
+                    for fee_type, amount in FEE_TYPES:
+                        due = first + timedelta(days=rng.randrange(0, 150))
+                        paid = 0
+                        if due < today + timedelta(days=30):
+                            paid = rng.choices((amount, amount // 2, 0), (70, 10, 20))[0]
+                        if paid >= amount:
+                            status = 'paid'
+                        elif paid:
+                            status = 'partial'
+                        else:
+                            status = 'overdue' if due < today else 'pending'
+                        yield (
+                            student_id, fee_type, amount, due, paid,
+                            min(due, today) - timedelta(days=rng.randrange(0, 20)) if paid else None,
+                            rng.choice(PAYMENT_METHODS) if paid else None,
+                            f'TXN{rng.randrange(10 ** 9):09d}' if paid else None,
+                            status, term_of(due), label, 0, 0, bursar_id if paid else None, now, now
+                        )
+
+        counts['fees'] = bulk_insert(
+            connection, Fee,
+            ['student_id', 'fee_type', 'amount', 'due_date', 'paid_amount', 'payment_date', 'payment_method',
+             'transaction_id', 'status', 'semester', 'academic_year', 'late_fee', 'discount', 'collected_by',
+             'created_at', 'updated_at'],
+            fee_rows()
+        )
+
+        if indexes:
+            for index in bulk_indexes:
+                index.create(connection)
+
+    AttendanceSummary.rebuild()
+    GradeSummary.rebuild()
+    db.session.commit()
+    return counts
+
+
+def seed_database(scale=0.1, years=1, seed=42):
     app = create_app()
-    
+
     with app.app_context():
         # Drop and recreate all tables
         db.drop_all()
         db.create_all()
-        
-        print("Creating classes...")
-        # Create classes
-        classes = [
-            Class(name="Grade 1A", section="A", grade_level=1, academic_year="2023-2024"),
-            Class(name="Grade 1B", section="B", grade_level=1, academic_year="2023-2024"),
-            Class(name="Grade 2A", section="A", grade_level=2, academic_year="2023-2024"),
-            Class(name="Grade 3A", section="A", grade_level=3, academic_year="2023-2024"),
-            Class(name="Grade 4A", section="A", grade_level=4, academic_year="2023-2024"),
-            Class(name="Grade 5A", section="A", grade_level=5, academic_year="2023-2024"),
-        ]
-        
-        for cls in classes:
-            db.session.add(cls)
-        
-        db.session.commit()
-        
-        print("Creating subjects...")
-        # Create subjects
-        subjects = [
-            Subject(name="Mathematics", code="MATH101", description="Basic Mathematics", credits=3),
-            Subject(name="English", code="ENG101", description="English Language Arts", credits=3),
-            Subject(name="Science", code="SCI101", description="General Science", credits=3),
-            Subject(name="Social Studies", code="SS101", description="Social Studies", credits=2),
-            Subject(name="Physical Education", code="PE101", description="Physical Education", credits=1),
-            Subject(name="Art", code="ART101", description="Visual Arts", credits=1),
-            Subject(name="Music", code="MUS101", description="Music Education", credits=1),
-        ]
-        
-        for subject in subjects:
-            db.session.add(subject)
-        
-        db.session.commit()
-        
-        print("Creating admin user...")
-        # Create admin user
-        admin_user = User(username="admin", email="admin@edumanage.com", role="admin")
-        admin_user.set_password("admin123")
-        db.session.add(admin_user)
-        db.session.commit()
-        
-        # Create admin staff profile
-        admin_staff = Staff(
-            user_id=admin_user.id,
-            staff_id="ADM001",
-            first_name="System",
-            last_name="Administrator",
-            date_of_birth=date(1980, 1, 1),
-            gender="Other",
-            phone="555-0000",
-            address="School Campus",
-            position="Principal",
-            department="Administration",
-            salary=Decimal("80000.00"),
-            qualification="Master's in Education Administration"
-        )
-        db.session.add(admin_staff)
-        
-        print("Creating teachers...")
-        # Create teacher users and staff profiles
-        teachers_data = [
-            {
-                "username": "john_teacher", "email": "john@edumanage.com",
-                "first_name": "John", "last_name": "Smith",
-                "staff_id": "TCH001", "position": "Math Teacher", "department": "Mathematics",
-                "salary": "50000.00"
-            },
-            {
-                "username": "mary_teacher", "email": "mary@edumanage.com",
-                "first_name": "Mary", "last_name": "Johnson",
-                "staff_id": "TCH002", "position": "English Teacher", "department": "English",
-                "salary": "48000.00"
-            },
-            {
-                "username": "david_teacher", "email": "david@edumanage.com",
-                "first_name": "David", "last_name": "Wilson",
-                "staff_id": "TCH003", "position": "Science Teacher", "department": "Science",
-                "salary": "52000.00"
-            },
-            {
-                "username": "sarah_teacher", "email": "sarah@edumanage.com",
-                "first_name": "Sarah", "last_name": "Brown",
-                "staff_id": "TCH004", "position": "Social Studies Teacher", "department": "Social Studies",
-                "salary": "47000.00"
-            }
-        ]
-        
-        teacher_users = []
-        for teacher_data in teachers_data:
-            user = User(username=teacher_data["username"], email=teacher_data["email"], role="teacher")
-            user.set_password("teacher123")
-            db.session.add(user)
-            db.session.flush()
-            
-            staff = Staff(
-                user_id=user.id,
-                staff_id=teacher_data["staff_id"],
-                first_name=teacher_data["first_name"],
-                last_name=teacher_data["last_name"],
-                date_of_birth=date(1985, random.randint(1, 12), random.randint(1, 28)),
-                gender=random.choice(["Male", "Female"]),
-                phone=f"555-{random.randint(1000, 9999)}",
-                address=f"{random.randint(100, 999)} Teacher St",
-                position=teacher_data["position"],
-                department=teacher_data["department"],
-                salary=Decimal(teacher_data["salary"]),
-                qualification="Bachelor's Degree in Education",
-                emergency_contact=f"Emergency Contact {teacher_data['first_name']}",
-                emergency_phone=f"555-{random.randint(1000, 9999)}"
-            )
-            db.session.add(staff)
-            teacher_users.append(user)
-        
-        db.session.commit()
-        
-        print("Creating students...")
-        # Create student users and profiles
-        students_data = [
-            {"first_name": "Alice", "last_name": "Johnson", "class_id": 1},
-            {"first_name": "Bob", "last_name": "Smith", "class_id": 1},
-            {"first_name": "Charlie", "last_name": "Brown", "class_id": 1},
-            {"first_name": "Diana", "last_name": "Wilson", "class_id": 2},
-            {"first_name": "Emily", "last_name": "Davis", "class_id": 2},
-            {"first_name": "Frank", "last_name": "Miller", "class_id": 2},
-            {"first_name": "Grace", "last_name": "Taylor", "class_id": 3},
-            {"first_name": "Henry", "last_name": "Anderson", "class_id": 3},
-            {"first_name": "Ivy", "last_name": "Thomas", "class_id": 4},
-            {"first_name": "Jack", "last_name": "Jackson", "class_id": 4},
-            {"first_name": "Kelly", "last_name": "White", "class_id": 5},
-            {"first_name": "Liam", "last_name": "Harris", "class_id": 5},
-            {"first_name": "Mia", "last_name": "Martin", "class_id": 6},
-            {"first_name": "Noah", "last_name": "Thompson", "class_id": 6},
-            {"first_name": "Olivia", "last_name": "Garcia", "class_id": 1},
-        ]
-        
-        student_users = []
-        for i, student_data in enumerate(students_data, 1):
-            username = f"{student_data['first_name'].lower()}_student"
-            email = f"{student_data['first_name'].lower()}@student.edumanage.com"
-            
-            user = User(username=username, email=email, role="student")
-            user.set_password("student123")
-            db.session.add(user)
-            db.session.flush()
-            
-            student = Student(
-                user_id=user.id,
-                student_id=f"STU{i:03d}",
-                first_name=student_data["first_name"],
-                last_name=student_data["last_name"],
-                date_of_birth=date(2015, random.randint(1, 12), random.randint(1, 28)),
-                gender=random.choice(["Male", "Female"]),
-                phone=f"555-{random.randint(1000, 9999)}",
-                address=f"{random.randint(100, 999)} Student Ave",
-                class_id=student_data["class_id"],
-                parent_name=f"Parent of {student_data['first_name']}",
-                parent_phone=f"555-{random.randint(1000, 9999)}",
-                parent_email=f"parent_{student_data['first_name'].lower()}@email.com"
-            )
-            db.session.add(student)
-            student_users.append((user, student))
-        
-        db.session.commit()
-        
-        print("Creating attendance records...")
-        # Create sample attendance records for the last 30 days
-        students = Student.query.all()
-        for student in students:
-            for i in range(30):
-                attendance_date = date.today() - timedelta(days=i)
-                if attendance_date.weekday() < 5:  # Only weekdays
-                    status = random.choices(
-                        ['present', 'absent', 'late'],
-                        weights=[85, 10, 5]
-                    )[0]
-                    
-                    attendance = Attendance(
-                        student_id=student.id,
-                        date=attendance_date,
-                        status=status,
-                        check_in_time=datetime.now().time() if status != 'absent' else None,
-                        marked_by=teacher_users[0].id if teacher_users else admin_user.id
-                    )
-                    db.session.add(attendance)
-        
-        db.session.commit()
-        
-        print("Creating grades...")
-        # Create sample grades
-        assessment_types = ['exam', 'quiz', 'assignment', 'project']
-        for student in students:
-            for subject in subjects[:4]:  # First 4 subjects
-                for assessment_type in assessment_types:
-                    marks_obtained = random.randint(60, 100)
-                    total_marks = 100
-                    
-                    grade = Grade(
-                        student_id=student.id,
-                        subject_id=subject.id,
-                        assessment_type=assessment_type,
-                        assessment_name=f"{assessment_type.title()} 1",
-                        marks_obtained=Decimal(str(marks_obtained)),
-                        total_marks=Decimal(str(total_marks)),
-                        semester="Fall 2023",
-                        academic_year="2023-2024",
-                        teacher_id=teacher_users[0].id if teacher_users else admin_user.id,
-                        date_assessed=date.today() - timedelta(days=random.randint(1, 60))
-                    )
-                    grade.calculate_percentage()
-                    grade.calculate_grade_letter()
-                    db.session.add(grade)
-        
-        db.session.commit()
-        
-        print("Creating fee records...")
-        # Create sample fee records
-        fee_types = ['tuition', 'library', 'lab', 'transport', 'activity']
-        for student in students:
-            for fee_type in fee_types:
-                amount = random.choice([500, 750, 1000, 1500, 2000])
-                due_date = date.today() + timedelta(days=random.randint(1, 90))
-                
-                fee = Fee(
-                    student_id=student.id,
-                    fee_type=fee_type,
-                    amount=Decimal(str(amount)),
-                    due_date=due_date,
-                    semester="Fall 2023",
-                    academic_year="2023-2024"
-                )
-                
-                # Randomly pay some fees
-                if random.random() < 0.7:  # 70% chance of payment
-                    payment_amount = random.choice([
-                        amount,  # Full payment
-                        amount * 0.5,  # Partial payment
-                        amount * 0.8   # Most of payment
-                    ])
-                    fee.paid_amount = Decimal(str(payment_amount))
-                    fee.payment_date = date.today() - timedelta(days=random.randint(1, 30))
-                    fee.payment_method = random.choice(['cash', 'card', 'online', 'bank_transfer'])
-                    fee.transaction_id = f"TXN{random.randint(100000, 999999)}"
-                    fee.collected_by = admin_user.id
-                
-                fee.update_status()
-                db.session.add(fee)
-        
-        db.session.commit()
-        
-        print("Database seeded successfully!")
-        print(f"Created:")
-        print(f"  - {len(classes)} classes")
-        print(f"  - {len(subjects)} subjects")
-        print(f"  - {len(teachers_data) + 1} staff members")
-        print(f"  - {len(students_data)} students")
-        print(f"  - Sample attendance, grades, and fee records")
+
+        students = round(scale * STUDENTS_PER_SCALE)
+        print(f"Seeding {max(students, len(DEMO_STUDENTS))} students, {years} past year(s), seed {seed}...")
+        started = time.perf_counter()
+        counts = build_school(students, years, seed)
+        elapsed = time.perf_counter() - started
+
+        print(f"Database seeded in {elapsed:.1f}s ({sum(counts.values()) / elapsed:,.0f} rows/s):")
+        for table, count in counts.items():
+            print(f"  - {count:,} {table}")
         print("\nDefault login credentials:")
         print("  Admin: username=admin, password=admin123")
         print("  Teacher: username=john_teacher, password=teacher123")
         print("  Student: username=alice_student, password=student123")
 
 if __name__ == '__main__':
-    seed_database()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Reset the database and fill it with a generated school.')
+    parser.add_argument('--scale', type=float, default=0.1, help='thousands of students (default 0.1)')
+    parser.add_argument('--years', type=int, default=1, help='past academic years of history (default 1)')
+    parser.add_argument('--seed', type=int, default=42, help='random seed (default 42)')
+    args = parser.parse_args()
+    seed_database(args.scale, args.years, args.seed)
@@ -0,0 +1,85 @@
+from datetime import date
+
+import pytest
+from flask_jwt_extended import create_access_token
+
+from app import create_app, db
+from app.models.class_model import Class
+from app.models.staff import Staff
+from app.models.student import Student
+from app.models.subject import Subject
+from app.models.user import User
+from config import TestingConfig
+
+
+@pytest.fixture
+def app():
+    app = create_app(TestingConfig)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def auth_headers(user):
+    return {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'}
+
+
+@pytest.fixture
+def admin(app):
+    user = User(username='admin', email='admin@school.test', role='admin')
+    user.set_password('admin123')
+    db.session.add(user)
+    db.session.flush()
+    db.session.add(Staff(
+        user_id=user.id, staff_id='ADM001', first_name='Ada', last_name='Admin',
+        date_of_birth=date(1980, 1, 1), gender='F', position='Principal', department='Administration'
+    ))
+    db.session.commit()
+    return user
+
+
+@pytest.fixture
+def school_class(app):
+    school_class = Class(name='Grade 5', section='A', grade_level=5, academic_year='2023-2024')
+    db.session.add(school_class)
+    db.session.commit()
+    return school_class
+
+
+@pytest.fixture
+def subjects(app):
+    subjects = [
+        Subject(name='Mathematics', code='MATH', credits=4),
+        Subject(name='English', code='ENG', credits=3),
+        Subject(name='Art', code='ART', credits=1),
+    ]
+    db.session.add_all(subjects)
+    db.session.commit()
+    return subjects
+
+
+def make_student(number, school_class=None, first_name='Student', last_name=None):
+    user = User(username=f'student{number}', email=f'student{number}@school.test', role='student')
+    user.set_password('student-pass')
+    db.session.add(user)
+    db.session.flush()
+    student = Student(
+        user_id=user.id, student_id=f'STU{number:06d}', first_name=first_name,
+        last_name=last_name or f'Number{number}', date_of_birth=date(2012, 1, 1), gender='F',
+        class_id=school_class.id if school_class else None
+    )
+    db.session.add(student)
+    db.session.commit()
+    return student
+
+
+@pytest.fixture
+def students(school_class):
+    return [make_student(number, school_class) for number in range(1, 5)]
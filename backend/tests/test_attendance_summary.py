@@ -0,0 +1,98 @@
+"""
+The attendance report reads whole months from AttendanceSummary, which the
+attendance routes keep up to date incrementally; both must agree with a
+plain aggregation over the attendance rows.
+"""
+
+from datetime import date
+
+import pytest
+from sqlalchemy import case, func
+
+from app import db
+from app.models.attendance import Attendance
+from app.models.attendance_summary import SUMMARY_STATUSES, AttendanceSummary
+from conftest import auth_headers
+
+COUNTERS = ['total_days'] + [f'{status}_days' for status in SUMMARY_STATUSES]
+
+
+def raw_report(start_date, end_date):
+    rows = db.session.query(
+        Attendance.student_id,
+        func.count(Attendance.id).label('total_days'),
+        *[func.sum(case((Attendance.status == status, 1), else_=0)).label(f'{status}_days')
+          for status in SUMMARY_STATUSES]
+    ).filter(Attendance.date.between(start_date, end_date)).group_by(Attendance.student_id)
+    return {row.student_id: {name: getattr(row, name) for name in COUNTERS} for row in rows}
+
+
+def summary_rows():
+    return sorted(
+        (row.student_id, row.month, *[getattr(row, name) for name in COUNTERS])
+        for row in AttendanceSummary.query
+    )
+
+
+@pytest.fixture
+def marked(client, admin, school_class, students):
+    """Attendance written through every route that maintains the summaries, across Jan/Feb 2024."""
+    headers = auth_headers(admin)
+    first, second, third, fourth = students
+
+    def check_in(student, day, status):
+        response = client.post('/api/attendance/check-in', headers=headers, json={
+            'student_id': student.id, 'date': day, 'status': status, 'check_in_time': '08:00:00'
+        })
+        assert response.status_code == 201, response.json
+        return response.json['attendance']['id']
+
+    check_in(first, '2024-01-15', 'present')
+    check_in(first, '2024-01-31', 'late')
+    check_in(second, '2024-01-31', 'absent')
+    check_in(third, '2024-02-01', 'present')
+    late_record = check_in(fourth, '2024-02-29', 'late')
+    # Checking in again on the same day changes the status of the existing record
+    check_in(first, '2024-01-15', 'excused')
+
+    response = client.put(f'/api/attendance/{late_record}', headers=headers, json={'status': 'present'})
+    assert response.status_code == 200, response.json
+
+    # Whole class on the last day of January: overwrites two records, adds two
+    response = client.post('/api/attendance/bulk-mark', headers=headers, json={
+        'date': '2024-01-31', 'class_id': school_class.id,
+        'attendance': [{'student_id': second.id, 'status': 'excused'}, {'student_id': third.id, 'status': 'absent'}]
+    })
+    assert response.status_code == 201, response.json
+
+    # Explicit records on the first of February, one of them already marked
+    response = client.post('/api/attendance/bulk-mark', headers=headers, json={
+        'date': '2024-02-01',
+        'attendance': [{'student_id': third.id, 'status': 'late'}, {'student_id': fourth.id, 'status': 'absent'}]
+    })
+    assert response.status_code == 201, response.json
+    return headers
+
+
+@pytest.mark.parametrize('start_date, end_date', [
+    ('2024-01-01', '2024-02-29'),  # two whole months
+    ('2024-01-01', '2024-01-31'),  # one whole month
+    ('2024-01-15', '2024-02-10'),  # partial months at both ends
+    ('2024-01-31', '2024-02-01'),  # just the month boundary
+    ('2024-01-20', '2024-03-31'),  # partial, whole and empty months
+])
+def test_report_matches_raw_aggregation(client, marked, start_date, end_date):
+    response = client.get('/api/attendance/report', headers=marked,
+                          query_string={'start_date': start_date, 'end_date': end_date})
+    assert response.status_code == 200, response.json
+
+    report = {entry['student_id']: {name: entry[name] for name in COUNTERS} for entry in response.json['report']}
+    assert report == raw_report(date.fromisoformat(start_date), date.fromisoformat(end_date))
+    assert report
+
+
+def test_incremental_summaries_match_rebuild(marked):
+    incremental = summary_rows()
+    AttendanceSummary.rebuild()
+    db.session.commit()
+    assert incremental == summary_rows()
@@ -0,0 +1,47 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from app import db
+from app.models.fee import Fee
+from conftest import auth_headers
+
+TODAY = date(2024, 3, 1)
+
+
+def sweep():
+    result = Fee.sweep_overdue(today=TODAY, late_fee_policy='flat', late_fee_amount=10)
+    db.session.commit()
+    return result
+
+
+def test_late_fee_is_charged_once_and_waivers_stick(client, admin, students):
+    fee = Fee(student_id=students[0].id, fee_type='tuition', amount=Decimal('100'),
+              due_date=TODAY - timedelta(days=10), paid_amount=0, late_fee=0, discount=0)
+    db.session.add(fee)
+    db.session.commit()
+
+    assert sweep() == {'marked_overdue': 1, 'late_fees_applied': 1}
+    db.session.refresh(fee)
+    assert fee.status == 'overdue'
+    assert fee.late_fee == Decimal('10')
+
+    response = client.put(f'/api/fees/{fee.id}', headers=auth_headers(admin), json={'late_fee': 0})
+    assert response.status_code == 200, response.json
+
+    assert sweep() == {'marked_overdue': 0, 'late_fees_applied': 0}
+    db.session.refresh(fee)
+    assert fee.late_fee == 0
+
+
+def test_late_fee_set_by_staff_is_not_replaced(client, admin, students):
+    fee = Fee(student_id=students[0].id, fee_type='library', amount=Decimal('50'),
+              due_date=TODAY - timedelta(days=10), paid_amount=0, late_fee=0, discount=0)
+    db.session.add(fee)
+    db.session.commit()
+
+    response = client.put(f'/api/fees/{fee.id}', headers=auth_headers(admin), json={'late_fee': 2})
+    assert response.status_code == 200, response.json
+
+    assert sweep()['late_fees_applied'] == 0
+    db.session.refresh(fee)
+    assert fee.late_fee == Decimal('2')
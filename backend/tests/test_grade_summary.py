@@ -0,0 +1,149 @@
+"""
+Grade reports and the dashboard read GradeSummary, which the grade routes
+keep up to date incrementally; both must agree with figures computed
+directly from the grade rows.
+"""
+
+import pytest
+
+from app import db
+from app.models.grade import GRADE_POINTS, Grade
+from app.models.grade_summary import GradeSummary
+from conftest import auth_headers
+
+
+def raw_statistics(semester=None, academic_year=None, subject_id=None):
+    """Per-student assessment count, average percentage and GPA from the grades table."""
+    totals = {}
+    for grade in Grade.query:
+        if semester and grade.semester != semester:
+            continue
+        if academic_year and grade.academic_year != academic_year:
+            continue
+        if subject_id and grade.subject_id != subject_id:
+            continue
+        credits = grade.subject.credits
+        entry = totals.setdefault(grade.student_id, [0, 0.0, 0, 0.0])
+        entry[0] += 1
+        entry[1] += float(grade.percentage)
+        entry[2] += credits
+        entry[3] += GRADE_POINTS[grade.grade_letter] * credits
+    return {
+        student_id: {
+            'total_assessments': count,
+            'average_percentage': round(percentage_sum / count, 2),
+            'gpa': round(points / credit_sum, 2) if credit_sum else 0
+        }
+        for student_id, (count, percentage_sum, credit_sum, points) in totals.items()
+    }
+
+
+def summary_rows():
+    return sorted(
+        (row.student_id, row.semester, row.academic_year, row.subject_id, row.assessment_count,
+         float(row.percentage_sum), row.credit_sum, float(row.grade_points_sum))
+        for row in GradeSummary.query
+    )
+
+
+@pytest.fixture
+def graded(client, admin, school_class, subjects, students):
+    """Grades written through every route that maintains the summaries, over two terms."""
+    headers = auth_headers(admin)
+    math, english, art = subjects
+    first, second, third, fourth = students
+
+    def grade(student, subject, marks, semester='Fall', academic_year='2023-2024', **extra):
+        return {
+            'student_id': student.id, 'subject_id': subject.id, 'assessment_type': 'exam',
+            'assessment_name': f'{subject.code} exam', 'marks_obtained': marks, 'total_marks': 100,
+            'semester': semester, 'academic_year': academic_year, **extra
+        }
+
+    def create(payload):
+        response = client.post('/api/grades/', headers=headers, json=payload)
+        assert response.status_code == 201, response.json
+        return response.json['grade']['id']
+
+    create(grade(first, math, 95))
+    create(grade(first, english, 72))
+    to_move = create(grade(first, art, 58))
+    to_regrade = create(grade(second, math, 45))
+    to_delete = create(grade(second, english, 88))
+    only_grade = create(grade(fourth, art, 30, semester='Spring'))
+
+    # Regrade in place, move to another term and subject, and remove
+    for grade_id, changes in [
+        (to_regrade, {'marks_obtained': 81}),
+        (to_move, {'semester': 'Spring', 'marks_obtained': 66}),
+    ]:
+        response = client.put(f'/api/grades/{grade_id}', headers=headers, json=changes)
+        assert response.status_code == 200, response.json
+    for grade_id in (to_delete, only_grade):
+        response = client.delete(f'/api/grades/{grade_id}', headers=headers)
+        assert response.status_code == 200, response.json
+
+    response = client.post('/api/grades/bulk-create', headers=headers, json={'grades': [
+        grade(first, math, 64),
+        grade(second, english, 91, semester='Spring'),
+        grade(third, math, 39),
+        grade(third, art, 100, semester='Spring'),
+        grade(fourth, english, 77, academic_year='2024-2025'),
+        grade(fourth, english, 52, semester=None, academic_year=None),
+    ]})
+    assert response.status_code == 201, response.json
+    return headers
+
+
+FILTERS = [
+    {},
+    {'semester': 'Fall'},
+    {'semester': 'Spring', 'academic_year': '2023-2024'},
+    {'academic_year': '2024-2025'},
+]
+
+
+@pytest.mark.parametrize('filters', FILTERS)
+def test_student_reports_match_grades(client, graded, students, filters):
+    expected = raw_statistics(**filters)
+    for student in students:
+        response = client.get(f'/api/grades/student/{student.id}/report', headers=graded, query_string=filters)
+        assert response.status_code == 200, response.json
+        assert response.json['statistics'] == expected.get(
+            student.id, {'total_assessments': 0, 'average_percentage': 0, 'gpa': 0}
+        )
+
+
+@pytest.mark.parametrize('filters', FILTERS + [{'subject_id': 1}, {'subject_id': 3, 'semester': 'Spring'}])
+def test_class_report_matches_grades(client, graded, school_class, filters):
+    response = client.get(f'/api/grades/class/{school_class.id}/report', headers=graded, query_string=filters)
+    assert response.status_code == 200, response.json
+
+    report = {
+        entry['student_id']: {name: entry[name] for name in ('total_assessments', 'average_percentage', 'gpa')}
+        for entry in response.json['report']
+    }
+    assert report == raw_statistics(**filters)
+
+
+def test_dashboard_matches_grades(client, graded, students):
+    expected = raw_statistics()
+    for student in students:
+        response = client.get('/api/dashboard/summary', headers=auth_headers(student.user))
+        assert response.status_code == 200, response.json
+        assert response.json['grades']['gpa'] == expected[student.id]['gpa']
+
+    grades = Grade.query.all()
+    response = client.get('/api/dashboard/summary', headers=graded)
+    assert response.status_code == 200, response.json
+    assert response.json['grades'] == {
+        'assessments': len(grades),
+        'average_percentage': round(sum(float(grade.percentage) for grade in grades) / len(grades), 2)
+    }
+
+
+def test_incremental_summaries_match_rebuild(graded):
+    incremental = summary_rows()
+    GradeSummary.rebuild()
+    db.session.commit()
+    assert incremental == summary_rows()
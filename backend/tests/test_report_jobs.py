@@ -0,0 +1,39 @@
+from datetime import datetime, timedelta
+
+from app import db
+from app.models.report_job import ReportJob
+from conftest import auth_headers
+
+
+def test_job_lost_with_its_worker_is_failed_and_restarted(app, client, admin, school_class, monkeypatch):
+    headers = auth_headers(admin)
+    monkeypatch.setattr(app.extensions['report_jobs'], 'enqueue', lambda job_id: None)
+    url = f'/api/grades/class/{school_class.id}/report?async=true'
+
+    response = client.get(url, headers=headers)
+    assert response.status_code == 202, response.json
+    job_id = response.json['job']['id']
+
+    # Still alive: an identical submit joins it
+    response = client.get(url, headers=headers)
+    assert (response.json['job']['id'], response.json['created']) == (job_id, False)
+
+    # Created long ago but heartbeating: still alive
+    long_ago = datetime.utcnow() - timedelta(hours=2)
+    ReportJob.query.filter_by(id=job_id).update({'created_at': long_ago, 'status': 'running'})
+    db.session.commit()
+    ReportJob.heartbeat([job_id])
+    assert client.get(url, headers=headers).json['created'] is False
+
+    # No heartbeat for longer than the timeout: the worker is gone
+    stale = datetime.utcnow() - timedelta(seconds=app.config['REPORT_JOB_TIMEOUT'] + 1)
+    ReportJob.query.filter_by(id=job_id).update({'updated_at': stale})
+    db.session.commit()
+
+    response = client.get(f'/api/jobs/{job_id}', headers=headers)
+    assert response.status_code == 200, response.json
+    assert response.json['job']['status'] == 'failed'
+
+    response = client.get(url, headers=headers)
+    assert response.json['created'] is True
+    assert response.json['job']['id'] != job_id
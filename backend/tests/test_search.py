@@ -0,0 +1,40 @@
+import pytest
+
+from conftest import auth_headers, make_student
+
+
+@pytest.fixture
+def named_students(school_class):
+    return [
+        make_student(1, school_class, first_name='Alice', last_name='Smith'),
+        make_student(2, school_class, first_name='Bob', last_name='Jones'),
+        make_student(25, school_class, first_name='Malice', last_name="O'Brien"),
+    ]
+
+
+@pytest.mark.parametrize('term, expected', [
+    ('0001', ['STU000001']),                   # ID fragment
+    ('000025', ['STU000025']),
+    ('lice', ['STU000001', 'STU000025']),      # inside a name
+    ('ALICE', ['STU000001', 'STU000025']),
+    ('alice smith', ['STU000001']),            # every word must match
+    ("o'brien", ['STU000025']),
+    ('student2@', ['STU000002']),              # linked user's e-mail
+    ('bo', ['STU000002']),                     # too short for trigrams
+    ('zzz', []),
+])
+def test_search_matches_inside_words(client, admin, named_students, term, expected):
+    headers = auth_headers(admin)
+
+    response = client.get('/api/students/', headers=headers, query_string={'search': term})
+    assert response.status_code == 200, response.json
+    assert sorted(student['student_id'] for student in response.json['students']) == expected
+
+    response = client.get('/api/students/search', headers=headers, query_string={'q': term})
+    assert response.status_code == 200, response.json
+    assert sorted(row['student_id'] for row in response.json) == expected
+
+
+def test_search_ranks_name_hits_first(client, admin, named_students):
+    response = client.get('/api/students/search', headers=auth_headers(admin), query_string={'q': 'alice'})
+    assert [row['student_id'] for row in response.json][0] == 'STU000001'
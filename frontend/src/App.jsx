@@ -5,6 +5,7 @@ import Layout from './components/Layout';
 import Login from './pages/Login';
 import Dashboard from './pages/Dashboard';
 import Students from './pages/Students';
+import ChangePassword from './pages/ChangePassword';
 
 // Protected Route component
 function ProtectedRoute({ children, allowedRoles = [] }) {
@@ -22,6 +23,11 @@ function ProtectedRoute({ children, allowedRoles = [] }) {
     return <Navigate to="/login" replace />;
   }
 
+  // Accounts on a default password can do nothing else until they pick their own
+  if (user?.must_change_password) {
+    return <Navigate to="/change-password" replace />;
+  }
+
   if (allowedRoles.length > 0 && !allowedRoles.includes(user?.role)) {
     return <Navigate to="/" replace />;
   }
@@ -29,6 +35,20 @@ function ProtectedRoute({ children, allowedRoles = [] }) {
   return children;
 }
 
+function ChangePasswordRoute() {
+  const { isAuthenticated, isLoading } = useAuth();
+
+  if (isLoading) {
+    return null;
+  }
+
+  if (!isAuthenticated) {
+    return <Navigate to="/login" replace />;
+  }
+
+  return <ChangePassword />;
+}
+
 // Simple placeholder components for other pages
 function Staff() {
   return (
@@ -78,6 +98,7 @@ function AppRoutes() {
   return (
     <Routes>
       <Route path="/login" element={<Login />} />
+      <Route path="/change-password" element={<ChangePasswordRoute />} />
       <Route
         path="/"
         element={
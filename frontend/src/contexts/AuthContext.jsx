@@ -50,6 +50,11 @@ function authReducer(state, action) {
         ...state,
         isLoading: action.payload,
       };
+    case 'UPDATE_USER':
+      return {
+        ...state,
+        user: action.payload,
+      };
     case 'UPDATE_PROFILE':
       return {
         ...state,
@@ -70,9 +75,20 @@ export function AuthProvider({ children }) {
       
       if (token && userStr) {
         try {
-          const user = JSON.parse(userStr);
+          // Render straight from the stored session, then revalidate it in the background
+          const profileStr = localStorage.getItem('profile');
+          dispatch({
+            type: 'LOGIN_SUCCESS',
+            payload: {
+              user: JSON.parse(userStr),
+              profile: profileStr ? JSON.parse(profileStr) : null,
+              token,
+            },
+          });
+
           const response = await authAPI.getProfile();
-          
+          localStorage.setItem('user', JSON.stringify(response.data.user));
+          localStorage.setItem('profile', JSON.stringify(response.data.profile));
           dispatch({
             type: 'LOGIN_SUCCESS',
             payload: {
@@ -83,8 +99,13 @@ export function AuthProvider({ children }) {
           });
         } catch (error) {
           console.error('Auth initialization failed:', error);
+          // Only a rejected token ends the session; a network error keeps the stored one
+          if (!error.response || error.response.status >= 500) {
+            return;
+          }
           localStorage.removeItem('authToken');
           localStorage.removeItem('user');
+          localStorage.removeItem('profile');
           dispatch({ type: 'LOGIN_FAILURE' });
         }
       } else {
@@ -104,6 +125,7 @@ export function AuthProvider({ children }) {
       
       localStorage.setItem('authToken', access_token);
       localStorage.setItem('user', JSON.stringify(user));
+      localStorage.setItem('profile', JSON.stringify(profile));
       
       dispatch({
         type: 'LOGIN_SUCCESS',
@@ -128,18 +150,27 @@ export function AuthProvider({ children }) {
   const logout = () => {
     localStorage.removeItem('authToken');
     localStorage.removeItem('user');
+    localStorage.removeItem('profile');
     dispatch({ type: 'LOGOUT' });
   };
 
   const updateProfile = (profileData) => {
+    localStorage.setItem('profile', JSON.stringify(profileData));
     dispatch({ type: 'UPDATE_PROFILE', payload: profileData });
   };
 
+  const passwordChanged = () => {
+    const user = { ...state.user, must_change_password: false };
+    localStorage.setItem('user', JSON.stringify(user));
+    dispatch({ type: 'UPDATE_USER', payload: user });
+  };
+
   const value = {
     ...state,
     login,
     logout,
     updateProfile,
+    passwordChanged,
   };
 
   return (
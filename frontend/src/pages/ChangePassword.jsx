@@ -0,0 +1,105 @@
+import React, { useState } from 'react';
+import { useNavigate } from 'react-router-dom';
+import { useAuth } from '../contexts/AuthContext';
+import { authAPI } from '../services/api';
+
+export default function ChangePassword() {
+  const [formData, setFormData] = useState({
+    current_password: '',
+    new_password: '',
+    confirm_password: '',
+  });
+  const [error, setError] = useState('');
+  const [isLoading, setIsLoading] = useState(false);
+
+  const { user, passwordChanged } = useAuth();
+  const navigate = useNavigate();
+
+  const handleChange = (e) => {
+    setFormData({
+      ...formData,
+      [e.target.name]: e.target.value,
+    });
+    if (error) setError('');
+  };
+
+  const handleSubmit = async (e) => {
+    e.preventDefault();
+    if (formData.new_password !== formData.confirm_password) {
+      setError('New passwords do not match');
+      return;
+    }
+
+    setIsLoading(true);
+    setError('');
+
+    try {
+      await authAPI.changePassword({
+        current_password: formData.current_password,
+        new_password: formData.new_password,
+      });
+      passwordChanged();
+      navigate('/', { replace: true });
+    } catch (err) {
+      setError(err.response?.data?.error || 'Password change failed');
+    }
+
+    setIsLoading(false);
+  };
+
+  return (
+    <div className="min-h-screen flex items-center justify-center bg-gray-50 py-12 px-4 sm:px-6 lg:px-8">
+      <div className="max-w-md w-full space-y-8">
+        <div>
+          <h2 className="text-center text-2xl font-bold text-gray-900">
+            Change your password
+          </h2>
+          {user?.must_change_password && (
+            <p className="mt-2 text-center text-sm text-gray-600">
+              Your account was created with a default password. Choose your own to continue.
+            </p>
+          )}
+        </div>
+
+        <form className="mt-8 space-y-6" onSubmit={handleSubmit}>
+          <div className="space-y-4">
+            {[
+              ['current_password', 'Current password'],
+              ['new_password', 'New password'],
+              ['confirm_password', 'Confirm new password'],
+            ].map(([name, label]) => (
+              <div key={name}>
+                <label htmlFor={name} className="form-label">
+                  {label}
+                </label>
+                <input
+                  id={name}
+                  name={name}
+                  type="password"
+                  required
+                  className="form-input"
+                  value={formData[name]}
+                  onChange={handleChange}
+                />
+              </div>
+            ))}
+          </div>
+
+          {error && (
+            <div className="bg-red-50 border border-red-200 text-red-700 px-4 py-3 rounded">
+              {error}
+            </div>
+          )}
+
+          <button
+            type="submit"
+            disabled={isLoading}
+            className="group relative w-full flex justify-center py-2 px-4 border border-transparent text-sm font-medium rounded-md text-white bg-primary-600 hover:bg-primary-700 focus:outline-none focus:ring-2 focus:ring-offset-2 focus:ring-primary-500 disabled:opacity-50 disabled:cursor-not-allowed"
+          >
+            {isLoading ? 'Saving...' : 'Change password'}
+          </button>
+        </form>
+      </div>
+    </div>
+  );
+}
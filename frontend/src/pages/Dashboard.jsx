@@ -7,7 +7,7 @@ import {
   BanknotesIcon,
   ChartBarIcon,
 } from '@heroicons/react/24/outline';
-import { studentsAPI, staffAPI, attendanceAPI, feesAPI, gradesAPI } from '../services/api';
+import { dashboardAPI } from '../services/api';
 
 function StatCard({ title, value, icon: Icon, color = 'blue' }) {
   const colorClasses = {
@@ -88,39 +88,15 @@ export default function Dashboard() {
     try {
       setLoading(true);
       
-      // Fetch students data
-      const studentsResponse = await studentsAPI.getAll({ per_page: 1 });
-      const totalStudents = studentsResponse.data.total || 0;
-
-      // Fetch staff data if admin
-      let totalStaff = 0;
-      if (user?.role === 'admin') {
-        const staffResponse = await staffAPI.getAll({ per_page: 1 });
-        totalStaff = staffResponse.data.total || 0;
-      }
-
-      // Fetch attendance data
-      const today = new Date().toISOString().split('T')[0];
-      const attendanceResponse = await attendanceAPI.getAll({ 
-        date: today, 
-        status: 'present',
-        per_page: 1 
-      });
-      const presentToday = attendanceResponse.data.total || 0;
-
-      // Fetch pending fees
-      const feesResponse = await feesAPI.getAll({ 
-        status: 'pending',
-        per_page: 1 
-      });
-      const pendingFees = feesResponse.data.total || 0;
+      // All headline numbers come from one cached summary call
+      const { data } = await dashboardAPI.getSummary();
 
       setStats({
-        totalStudents,
-        totalStaff,
-        presentToday,
-        pendingFees,
-        averageGrade: 85.5, // Mock data for average grade
+        totalStudents: data.students?.active || 0,
+        totalStaff: data.staff?.active || 0,
+        presentToday: data.attendance_today?.present || 0,
+        pendingFees: data.fees?.pending_count || 0,
+        averageGrade: data.grades?.average_percentage || 0,
       });
     } catch (error) {
       console.error('Error fetching dashboard data:', error);
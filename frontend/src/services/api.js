@@ -31,7 +31,15 @@ api.interceptors.response.use(
     if (error.response?.status === 401) {
       localStorage.removeItem('authToken');
       localStorage.removeItem('user');
+      localStorage.removeItem('profile');
       window.location.href = '/login';
+    } else if (error.response?.status === 403 && error.response.data?.must_change_password) {
+      // The account still has its default password; the server allows nothing else
+      const user = JSON.parse(localStorage.getItem('user') || '{}');
+      localStorage.setItem('user', JSON.stringify({ ...user, must_change_password: true }));
+      if (window.location.pathname !== '/change-password') {
+        window.location.href = '/change-password';
+      }
     }
     return Promise.reject(error);
   }
@@ -53,7 +61,9 @@ export const studentsAPI = {
   update: (id, data) => api.put(`/students/${id}`, data),
   delete: (id) => api.delete(`/students/${id}`),
   getClasses: () => api.get('/students/classes'),
+  search: (q, limit) => api.get('/students/search', { params: { q, limit } }),
   bulkImport: (data) => api.post('/students/bulk-import', data),
+  export: (params) => api.get('/students/export', { params, responseType: 'blob' }),
 };
 
 // Staff API
@@ -66,6 +76,7 @@ export const staffAPI = {
   getPositions: () => api.get('/staff/positions'),
   getDepartments: () => api.get('/staff/departments'),
   getTeachers: () => api.get('/staff/teachers'),
+  search: (q, limit) => api.get('/staff/search', { params: { q, limit } }),
 };
 
 // Attendance API
@@ -76,6 +87,7 @@ export const attendanceAPI = {
   bulkMark: (data) => api.post('/attendance/bulk-mark', data),
   update: (id, data) => api.put(`/attendance/${id}`, data),
   getReport: (params) => api.get('/attendance/report', { params }),
+  export: (params) => api.get('/attendance/export', { params, responseType: 'blob' }),
 };
 
 // Grades API
@@ -90,6 +102,7 @@ export const gradesAPI = {
   bulkCreate: (data) => api.post('/grades/bulk-create', data),
   getStudentReport: (studentId, params) => api.get(`/grades/student/${studentId}/report`, { params }),
   getClassReport: (classId, params) => api.get(`/grades/class/${classId}/report`, { params }),
+  export: (params) => api.get('/grades/export', { params, responseType: 'blob' }),
 };
 
 // Fees API
@@ -104,6 +117,31 @@ export const feesAPI = {
   getStudentSummary: (studentId, params) => api.get(`/fees/student/${studentId}/summary`, { params }),
   getReport: (params) => api.get('/fees/report', { params }),
   getOverdue: (params) => api.get('/fees/overdue', { params }),
+  export: (params) => api.get('/fees/export', { params, responseType: 'blob' }),
 };
 
+// Dashboard API
+export const dashboardAPI = {
+  getSummary: () => api.get('/dashboard/summary'),
+};
+
+// Background report jobs
+export const jobsAPI = {
+  get: (id) => api.get(`/jobs/${id}`),
+};
+
+// Run a report endpoint as a background job and resolve with its result once done
+export async function runReportJob(request, { interval = 1000, onProgress } = {}) {
+  const { data } = await request({ async: true });
+  let job = data.job;
+  for (;;) {
+    const response = await jobsAPI.get(job.id);
+    job = response.data.job;
+    if (onProgress) onProgress(job.progress);
+    if (job.status === 'done') return response.data.result;
+    if (job.status === 'failed') throw new Error(job.error || 'Report failed');
+    await new Promise((resolve) => setTimeout(resolve, interval));
+  }
+}
+
 export default api;
\ No newline at end of file